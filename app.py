@@ -31,7 +31,8 @@ try:
         validate_roster_data,
         create_empty_roster
     )
-    from src.engine.calculator import calculate_group_metrics
+    from src.engine.matrix import calculate_matrix
+    from src.engine.session import EngineSession
     from src.engine.grading import get_cpk_grade, get_grade_color
     from src.visualizations.theme_utils import load_themes, get_unit_color_map
     from src.visualizations.charts import (
@@ -430,6 +431,16 @@ st.session_state['roster'] = active_roster
 # This 'active_roster' is what we use for the rest of the app
 edited_df = active_roster 
 
+def get_engine_session(target_stats, deduplicate, assume_half_range):
+    """Returns the EngineSession for this target and settings, kept across reruns."""
+    sessions = st.session_state.setdefault('engine_sessions', {})
+    key = repr((sorted(target_stats.items()), deduplicate, assume_half_range))
+    if key not in sessions:
+        if len(sessions) >= 8:
+            sessions.clear()  # Target / toggle churn: start over rather than grow
+        sessions[key] = EngineSession([target_stats], deduplicate, assume_half_range)
+    return sessions[key]
+
 # --- MAIN LAYOUT ---
 st.title("⚔️ Mathhammer Analysis")
 
@@ -439,7 +450,10 @@ if not edited_df.empty:
     if assume_half_range:
         st.info("📏 Half Range Mode: ACTIVE - Melta and Rapid Fire bonuses are applied")
 
-    army_results = calculate_group_metrics(edited_df, selected_target_stats, deduplicate=False, assume_half_range=assume_half_range)
+    # Incremental session: after an edit only the changed rows and units are recomputed
+    army_session = get_engine_session(selected_target_stats, deduplicate=False, assume_half_range=assume_half_range)
+    army_session.update(edited_df)
+    army_results = army_session.results()
     army_df = pd.DataFrame(army_results)
     
     if not army_df.empty:
@@ -758,55 +772,24 @@ def build_metric_data(metric_key, include_cpk=False, assume_half_range=False):
     2. df_tooltips: The text to show on hover (Active Profiles)
     3. df_cpk: (Optional) CPK values for styling purposes
     """
-    data = {}
-    tooltips = {}
-    cpk_data = {} if include_cpk else None
-
-    # Iterate through all targets (columns)
-    for t_key, t_stats in ACTIVE_TARGETS.items():
-        # Calculate stats for this target
-        # deduplicate=True ensures we see 1 Unit Efficiency (ignoring Qty)
-        group_res = calculate_group_metrics(edited_df, t_stats, deduplicate=True, assume_half_range=assume_half_range)
-
-        col_data = []
-        col_tips = []
-        col_cpk = [] if include_cpk else None
-        index_names = []
-
-        for g in group_res:
-            label = f"{g['Unit']} [{g['Group']}]"
-            index_names.append(label)
-
-            col_data.append(g[metric_key])
-
-            if include_cpk:
-                col_cpk.append(g['CPK'])
-
-            if g.get('Mode'):
-                col_tips.append(f"Active: {g['Mode']}")
-            else:
-                col_tips.append("Standard Profile")
-
-        data['Unit'] = index_names
-        tooltips['Unit'] = index_names
-
-        data[t_key] = col_data
-        tooltips[t_key] = col_tips
+    # One engine pass for every target (columns), computing only the metrics shown
+    # deduplicate=True ensures we see 1 Unit Efficiency (ignoring Qty)
+    metrics = [metric_key, 'Weapon'] + (['CPK'] if include_cpk else [])
+    matrix = calculate_matrix(edited_df, ACTIVE_TARGETS, deduplicate=True, assume_half_range=assume_half_range,
+                              metrics=metrics)
 
-        if include_cpk:
-            cpk_data['Unit'] = index_names
-            cpk_data[t_key] = col_cpk
-
-    if not data:
+    if not matrix.units:
         if include_cpk:
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
         return pd.DataFrame(), pd.DataFrame()
 
-    df_values = pd.DataFrame(data).set_index('Unit')
-    df_tips = pd.DataFrame(tooltips).set_index('Unit')
+    df_values = matrix.to_frame(metric_key).rename_axis('Unit')
+
+    tips = [[f"Active: {mode}" if mode else "Standard Profile" for mode in row] for row in matrix.modes]
+    df_tips = pd.DataFrame(tips, index=df_values.index, columns=df_values.columns)
 
     if include_cpk:
-        df_cpk = pd.DataFrame(cpk_data).set_index('Unit')
+        df_cpk = matrix.to_frame('CPK').rename_axis('Unit')
         return df_values, df_tips, df_cpk
 
     return df_values, df_tips
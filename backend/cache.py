@@ -0,0 +1,79 @@
+"""
+Result cache for the calculator API
+Repeat requests (tab switches, toggles) get their results without re-running the engine
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+def request_key(*parts) -> str:
+    """
+    Stable content hash of request parts (dicts, lists, scalars)
+
+    Dict key order does not matter, so the same payload always maps to the
+    same key no matter how the client serialized it.
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+class ResultCache:
+    """
+    Bounded LRU cache with a time-to-live
+
+    Entries older than ttl_seconds are treated as missing; once more than
+    max_entries are stored the least recently used entry is evicted.
+    Cached values are shared between requests, so callers must not mutate them.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Returns the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value) -> None:
+        """Stores value under key, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops every entry and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit / miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
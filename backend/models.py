@@ -41,8 +41,8 @@ class WeaponProfile(BaseModel):
     ProfileID: Optional[str] = None  # For exclusive weapon modes
     LoadoutGroup: Optional[str] = Field(default="Standard", alias="Loadout Group")  # Loadout grouping
     Keywords: Optional[str] = Field(default="")  # Unit keywords
-    RR_H: Optional[str] = Field(default="N", pattern="^[YN]$")  # Reroll hits
-    RR_W: Optional[str] = Field(default="N", pattern="^[YN]$")  # Reroll wounds
+    RR_H: Optional[str] = Field(default="N", pattern="^[YN1F]$")  # Reroll hits: 1 = ones, Y/F = fails
+    RR_W: Optional[str] = Field(default="N", pattern="^[YN1F]$")  # Reroll wounds: 1 = ones, Y/F = fails
 
 class TargetProfile(BaseModel):
     """Defensive target profile"""
@@ -56,6 +56,15 @@ class TargetProfile(BaseModel):
     Stealth: str = Field(default="N", pattern="^[YN]$")
     UnitSize: int = Field(default=1, ge=1)  # For Blast calculations
 
+class MetricName(str, Enum):
+    """Result columns a request can select (unit keys, Qty and Pts are always returned)"""
+    WEAPON = "Weapon"
+    KILLS = "Kills"
+    DAMAGE = "Damage"
+    CPK = "CPK"
+    TTK = "TTK"
+    CPK_GRADE = "CPK_Grade"
+
 class CalculateRequest(BaseModel):
     """Request to calculate metrics for weapons against a target"""
     weapons: List[WeaponProfile]
@@ -63,28 +72,38 @@ class CalculateRequest(BaseModel):
     assume_cover: bool = False
     assume_half_range: bool = False
     deduplicate_exclusive: bool = True
+    allocation: str = Field(default="average", pattern="^(average|exact)$")  # Kill allocation mode
+    session_id: Optional[str] = None  # Editor session: recompute only what changed since the last call
+    metrics: Optional[List[MetricName]] = None  # Result columns to compute (default: all)
 
 class MetricResult(BaseModel):
-    """Single weapon's calculated metrics"""
+    """Single weapon's calculated metrics (null where a metric was not requested)"""
     UnitID: str
     Name: str
-    Weapon: str
+    Weapon: Optional[str] = None
     Qty: int
     Pts: int
-    Kills: float
-    Damage: float
-    CPK: float  # Cost per kill
-    TTK: float  # Time to kill (activations)
-    CPK_Grade: str  # S, A, B, C, D, F
+    Kills: Optional[float] = None
+    Damage: Optional[float] = None
+    CPK: Optional[float] = None  # Cost per kill
+    TTK: Optional[float] = None  # Time to kill (activations)
+    CPK_Grade: Optional[str] = None  # S, A, B, C, D, F
     ProfileID: Optional[str] = None
 
+class CalculateDelta(BaseModel):
+    """What changed since the previous call in the same session"""
+    rows_resolved: int  # Weapon rows recomputed
+    updated: List[MetricResult]  # New or changed units
+    removed: List[List[Union[str, int]]]  # Unit keys (UnitID, Name, Loadout Group[, Qty]) that disappeared
+
 class CalculateResponse(BaseModel):
     """Response with calculated metrics"""
     metrics: List[MetricResult]
     target_name: str
     total_points: int
-    total_kills: float
-    avg_cpk: float
+    total_kills: Optional[float] = None  # Null unless Kills / CPK are computed
+    avg_cpk: Optional[float] = None
+    delta: Optional[CalculateDelta] = None  # Only set for session requests
 
 class RosterSummary(BaseModel):
     """Summary of available rosters"""
@@ -124,6 +143,44 @@ class MultiTargetRequest(BaseModel):
     targets: List[TargetProfile]
     assume_cover: bool = False
     assume_half_range: bool = False
+    allocation: str = Field(default="average", pattern="^(average|exact)$")  # Kill allocation mode
+    metrics: Optional[List[MetricName]] = None  # Result columns to compute (default: all)
+    compact: bool = False  # float32 evaluation for large libraries (see engine/kernel.py)
+
+class ScenarioRequest(BaseModel):
+    """Request to calculate metrics for every cover / half range / stealth combination"""
+    weapons: List[WeaponProfile]
+    target: TargetProfile
+    deduplicate_exclusive: bool = True
+    allocation: str = Field(default="average", pattern="^(average|exact)$")  # Kill allocation mode
+
+class SensitivityRequest(BaseModel):
+    """Request for per-unit gains from +1 A / to hit / S / AP / D against a target list"""
+    weapons: List[WeaponProfile]
+    targets: List[TargetProfile]
+    assume_cover: bool = False
+    assume_half_range: bool = False
+    deduplicate_exclusive: bool = True
+    stats: Optional[List[str]] = None  # Subset of A, BS, S, AP, D (default: all)
+
+class SweepRequest(BaseModel):
+    """Request to sweep weapon characteristics over a grid against a target list"""
+    axes: Dict[str, List[Union[int, str]]]  # e.g. {"S": [3, 4, 5], "AP": [0, -1], "D": [1, "D3", "D6"]}
+    targets: List[TargetProfile]
+    base: Optional[Dict[str, Union[int, str]]] = None  # Profile the axes are applied to (Pts = cost for CPK)
+    assume_cover: bool = False
+    assume_half_range: bool = False
+    compact: bool = False  # float32 evaluation, half the memory (see engine/sweep.py)
+
+class TopUnitsRequest(BaseModel):
+    """Request model for the K best units against one target"""
+    weapons: List[WeaponProfile]
+    target: TargetProfile
+    k: int = Field(default=10, ge=1)
+    metric: str = Field(default="CPK", pattern="^(CPK|Kills|Damage)$")  # CPK: lowest first, else highest
+    assume_cover: bool = False
+    assume_half_range: bool = False
+    deduplicate_exclusive: bool = True
 
 class ChartRequest(BaseModel):
     """Request to generate a chart"""
@@ -4,6 +4,7 @@ Wraps the existing PyHammer calculation engine
 """
 from fastapi import APIRouter, HTTPException
 from typing import List
+from collections import OrderedDict
 import pandas as pd
 import sys
 from pathlib import Path
@@ -11,15 +12,28 @@ from pathlib import Path
 # Add src to path to import existing calculator
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from engine.calculator import calculate_group_metrics
+from engine.calculator import RESULT_METRICS, calculate_group_metrics, select_metrics, trim_results
+from engine.matrix import calculate_matrix
+from engine.distributions import calculate_group_distributions
 from engine.grading import get_cpk_grade
+from engine.session import EngineSession
+from engine.scenarios import SCENARIO_FLAGS, calculate_scenarios
+from engine.sensitivity import calculate_sensitivity
+from engine.sweep import sweep_profiles
+from engine.topk import top_units
+from ..cache import ResultCache, request_key
 from ..models import (
     CalculateRequest,
     CalculateResponse,
+    CalculateDelta,
     MetricResult,
     WeaponProfile,
     TargetProfile,
-    MultiTargetRequest
+    MultiTargetRequest,
+    ScenarioRequest,
+    SensitivityRequest,
+    SweepRequest,
+    TopUnitsRequest
 )
 
 router = APIRouter()
@@ -32,6 +46,80 @@ def target_to_dict(target: TargetProfile) -> dict:
     """Convert Pydantic TargetProfile to dict for calculator"""
     return target.model_dump()
 
+# Editor sessions for /calculate, least recently used first
+MAX_SESSIONS = 64
+_sessions = OrderedDict()
+
+# Largest grid /sweep will evaluate (cells, before the target axis)
+MAX_SWEEP_CELLS = 250_000
+
+# Results of recent /calculate and /calculate-multi-target payloads
+result_cache = ResultCache(max_entries=256, ttl_seconds=600)
+
+def requested_metrics(request) -> list:
+    """Engine metrics= argument for a request (None = all metrics)"""
+    if request.metrics is None:
+        return None
+    return [m.value for m in request.metrics]
+
+def metric_result(metric: dict) -> MetricResult:
+    """Convert one calculator result dict to a MetricResult (metrics not computed stay None)"""
+    return MetricResult(
+        UnitID=metric.get('UnitID', ''),
+        Name=metric.get('Name', ''),
+        Weapon=metric.get('Weapon'),
+        Qty=metric.get('Qty', 1),
+        Pts=metric.get('Pts', 0),
+        Kills=metric.get('Kills'),
+        Damage=metric.get('Damage'),
+        CPK=metric.get('CPK'),
+        TTK=metric.get('TTK'),
+        CPK_Grade=metric.get('CPK_Grade'),
+        ProfileID=metric.get('Profile ID', None)
+    )
+
+def build_response(metrics_list: list, target_name: str) -> CalculateResponse:
+    """Convert calculator result dicts to a CalculateResponse"""
+    metric_results = []
+    total_kills = 0.0
+    total_points = 0
+
+    for metric in metrics_list:
+        result = metric_result(metric)
+        metric_results.append(result)
+        total_points += result.Pts
+        if total_kills is not None:
+            total_kills = None if result.Kills is None else total_kills + result.Kills
+
+    # Calculate average CPK (only when kills were computed)
+    avg_cpk = None
+    if total_kills is not None:
+        avg_cpk = total_points / total_kills if total_kills > 0 else 999.0
+
+    return CalculateResponse(
+        metrics=metric_results,
+        target_name=target_name,
+        total_points=total_points,
+        total_kills=total_kills,
+        avg_cpk=avg_cpk
+    )
+
+def session_key(request: CalculateRequest, target_dict: dict) -> tuple:
+    """Session store key: session id, target and settings"""
+    return (request.session_id, repr(sorted(target_dict.items())),
+            request.deduplicate_exclusive, request.assume_half_range)
+
+def get_session(request: CalculateRequest, target_dict: dict) -> EngineSession:
+    """Returns the EngineSession for this session id, target and settings"""
+    key = session_key(request, target_dict)
+    session = _sessions.pop(key, None)
+    if session is None:
+        session = EngineSession([target_dict], request.deduplicate_exclusive, request.assume_half_range)
+    _sessions[key] = session
+    while len(_sessions) > MAX_SESSIONS:
+        _sessions.popitem(last=False)
+    return session
+
 @router.post("/calculate", response_model=CalculateResponse)
 async def calculate_metrics(request: CalculateRequest):
     """
@@ -46,64 +134,65 @@ async def calculate_metrics(request: CalculateRequest):
     - assume_cover: Apply +1 armor save modifier
     - assume_half_range: Apply range-dependent bonuses (Melta, Rapid Fire)
     - deduplicate_exclusive: Apply Profile ID optimization
+    - allocation: 'average' or 'exact' (model-by-model) kill allocation
+    - metrics: Result columns to compute (default: all); the rest are null
 
     Returns:
     - metrics: Per-weapon efficiency calculations (CPK, TTK, Kills, etc.)
-    - summary statistics
+    - summary statistics (null totals when Kills is not computed)
+
+    Identical payloads are answered from the result cache.
     """
     try:
-        # Convert Pydantic models to DataFrame for calculator
         weapon_dicts = [weapon_to_dict(w) for w in request.weapons]
-        df = pd.DataFrame(weapon_dicts)
-
-        # Convert target to dict
         target_dict = target_to_dict(request.target)
+        metrics = requested_metrics(request)
+
+        cache_key = request_key('calculate', weapon_dicts, target_dict, request.assume_cover,
+                                request.assume_half_range, request.deduplicate_exclusive, request.allocation,
+                                metrics)
+        metrics_list = result_cache.get(cache_key)
+        if metrics_list is not None:
+            # The session did not see this payload, so its next delta must start over
+            if request.session_id:
+                _sessions.pop(session_key(request, target_dict), None)
+            return build_response(metrics_list, request.target.Name)
+
+        # Convert Pydantic models to DataFrame for calculator
+        df = pd.DataFrame(weapon_dicts)
 
         # Store cover setting in DataFrame for per-weapon handling
         # We'll handle cover application in the calculator per-weapon
         df['__assume_cover__'] = request.assume_cover
 
+        if request.session_id and request.allocation == 'average':
+            # Editor session: only rows and units changed since the last call are recomputed
+            session = get_session(request, target_dict)
+            delta = session.update(df)
+            metrics_list = trim_results(session.results(), metrics)
+            result_cache.put(cache_key, metrics_list)
+            response = build_response(metrics_list, request.target.Name)
+            response.delta = CalculateDelta(
+                rows_resolved=delta.rows_resolved,
+                updated=[metric_result(m) for m in trim_results(delta.updated[session.labels[0]], metrics)],
+                removed=[[k if isinstance(k, str) else int(k) for k in key]
+                         for key in delta.removed[session.labels[0]]]
+            )
+            return response
+
         # Call existing calculator function
         metrics_list = calculate_group_metrics(
             df=df,
             target_profile=target_dict,
             deduplicate=request.deduplicate_exclusive,
-            assume_half_range=request.assume_half_range
+            assume_half_range=request.assume_half_range,
+            allocation=request.allocation,
+            metrics=metrics
         )
+        result_cache.put(cache_key, metrics_list)
 
         # Convert results to Pydantic models
-        metric_results = []
-        total_kills = 0.0
-        total_points = 0
-
-        for metric in metrics_list:
-            metric_result = MetricResult(
-                UnitID=metric.get('UnitID', ''),
-                Name=metric.get('Name', ''),
-                Weapon=metric.get('Weapon', ''),
-                Qty=metric.get('Qty', 1),
-                Pts=metric.get('Pts', 0),
-                Kills=metric.get('Kills', 0.0),
-                Damage=metric.get('Damage', 0.0),
-                CPK=metric.get('CPK', 999.0),
-                TTK=metric.get('TTK', 999.0),
-                CPK_Grade=metric.get('CPK_Grade', 'F'),
-                ProfileID=metric.get('Profile ID', None)
-            )
-            metric_results.append(metric_result)
-            total_kills += metric_result.Kills
-            total_points += metric_result.Pts
-
-        # Calculate average CPK
-        avg_cpk = total_points / total_kills if total_kills > 0 else 999.0
-
-        return CalculateResponse(
-            metrics=metric_results,
-            target_name=request.target.Name,
-            total_points=total_points,
-            total_kills=total_kills,
-            avg_cpk=avg_cpk
-        )
+        return build_response(metrics_list, request.target.Name)
 
     except Exception as e:
         raise HTTPException(
@@ -116,7 +205,12 @@ async def calculate_multi_target(request: MultiTargetRequest):
     """
     Calculate metrics against multiple targets (threat matrix)
 
-    Returns a matrix of results for each weapon against each target
+    Returns a matrix of results for each weapon against each target.
+    The roster is parsed once and evaluated against all targets in a
+    single engine pass (see engine/matrix.py).
+
+    With metrics set, only those columns are computed and returned.
+    compact evaluates in float32 (within engine.kernel.COMPACT_RTOL).
     """
     # DEBUG: Log received parameters
     print(f"=== CALCULATE MULTI TARGET DEBUG ===")
@@ -129,21 +223,42 @@ async def calculate_multi_target(request: MultiTargetRequest):
     try:
         results = {}
 
-        for target in request.targets:
-            calc_request = CalculateRequest(
-                weapons=request.weapons,
-                target=target,
-                assume_cover=request.assume_cover,
-                assume_half_range=request.assume_half_range
-            )
+        weapon_dicts = [weapon_to_dict(w) for w in request.weapons]
+        target_dicts = [target_to_dict(t) for t in request.targets]
+        metrics = requested_metrics(request)
 
-            response = await calculate_metrics(calc_request)
-            results[target.Name] = response.model_dump()
+        cache_key = request_key('calculate-multi-target', weapon_dicts, target_dicts, request.assume_cover,
+                                request.assume_half_range, request.allocation, metrics, request.compact)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        return {
+        df = pd.DataFrame(weapon_dicts)
+        df['__assume_cover__'] = request.assume_cover
+
+        matrix = calculate_matrix(
+            df=df,
+            targets=target_dicts,
+            deduplicate=True,
+            assume_half_range=request.assume_half_range,
+            allocation=request.allocation,
+            metrics=metrics,
+            compact=request.compact
+        )
+
+        # Metrics that were not computed are left out of the payload
+        skipped = set(RESULT_METRICS) - select_metrics(metrics)
+        exclude = {'metrics': {'__all__': skipped}} if skipped else None
+        for col, target in enumerate(request.targets):
+            response = build_response(matrix.column_results(col), target.Name)
+            results[target.Name] = response.model_dump(exclude=exclude)
+
+        response = {
             "targets": [t.Name for t in request.targets],
             "results": results
         }
+        result_cache.put(cache_key, response)
+        return response
 
     except Exception as e:
         raise HTTPException(
@@ -151,6 +266,220 @@ async def calculate_multi_target(request: MultiTargetRequest):
             detail=f"Multi-target calculation error: {str(e)}"
         )
 
+@router.post("/calculate-scenarios")
+async def calculate_scenario_combinations(request: ScenarioRequest):
+    """
+    Calculate metrics for every combination of assume_cover, assume_half_range and target Stealth
+
+    All combinations share roster parsing and one engine pass (see
+    engine/scenarios.py), so the UI can switch toggles without another request.
+
+    Returns:
+    - scenarios: One CalculateResponse per combination, with the flag values
+    """
+    try:
+        weapon_dicts = [weapon_to_dict(w) for w in request.weapons]
+        target_dict = target_to_dict(request.target)
+
+        cache_key = request_key('calculate-scenarios', weapon_dicts, target_dict,
+                                request.deduplicate_exclusive, request.allocation)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        scenarios = calculate_scenarios(
+            df=pd.DataFrame(weapon_dicts),
+            target_profile=target_dict,
+            deduplicate=request.deduplicate_exclusive,
+            allocation=request.allocation
+        )
+
+        response = {
+            "target_name": request.target.Name,
+            "flags": list(SCENARIO_FLAGS),
+            "scenarios": [
+                {**dict(zip(SCENARIO_FLAGS, flags)), **build_response(metrics_list, request.target.Name).model_dump()}
+                for flags, metrics_list in scenarios.items()
+            ]
+        }
+        result_cache.put(cache_key, response)
+        return response
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Scenario calculation error: {str(e)}"
+        )
+
+@router.post("/sensitivity")
+async def calculate_stat_sensitivity(request: SensitivityRequest):
+    """
+    Calculate how much each unit gains from one-step stat improvements
+
+    Every perturbed copy of the roster (+1 A, +1 to hit, +1 S, +1 AP, +1 D)
+    is evaluated against every target in one engine call (see
+    engine/sensitivity.py).
+
+    Returns:
+    - units: Per unit, base Kills / Damage / CPK per target and the change
+      per stat and target (CPK change is null where either side has no kills)
+    """
+    try:
+        weapon_dicts = [weapon_to_dict(w) for w in request.weapons]
+        target_dicts = [target_to_dict(t) for t in request.targets]
+
+        cache_key = request_key('sensitivity', weapon_dicts, target_dicts, request.assume_cover,
+                                request.assume_half_range, request.deduplicate_exclusive, request.stats)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        df = pd.DataFrame(weapon_dicts)
+        df['__assume_cover__'] = request.assume_cover
+
+        table = calculate_sensitivity(
+            df=df,
+            targets=target_dicts,
+            stats=request.stats,
+            deduplicate=request.deduplicate_exclusive,
+            assume_half_range=request.assume_half_range
+        )
+
+        response = {
+            "targets": table.targets,
+            "stats": table.stats,
+            "units": table.to_records()
+        }
+        result_cache.put(cache_key, response)
+        return response
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Sensitivity error: {str(e)}"
+        )
+
+@router.post("/sweep")
+async def sweep_stat_space(request: SweepRequest):
+    """
+    Sweep weapon characteristics over a grid against a target list
+
+    Every combination of the axis values is evaluated against every target
+    in vectorized chunks (see engine/sweep.py). Sweep results are large and
+    cheap to rebuild, so they skip the result cache. compact evaluates in
+    float32 (within engine.kernel.COMPACT_RTOL).
+
+    Returns:
+    - axes, targets and Kills / Damage / CPK cubes shaped (*axis lengths, targets)
+    """
+    cells = 1
+    for values in request.axes.values():
+        cells *= len(values)
+    if cells > MAX_SWEEP_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {cells} cells (max {MAX_SWEEP_CELLS})"
+        )
+
+    try:
+        cube = sweep_profiles(
+            axes=request.axes,
+            targets=[target_to_dict(t) for t in request.targets],
+            base=request.base,
+            assume_cover=request.assume_cover,
+            assume_half_range=request.assume_half_range,
+            compact=request.compact
+        )
+        return cube.to_dict()
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Sweep error: {str(e)}"
+        )
+
+@router.post("/top-units", response_model=CalculateResponse)
+async def calculate_top_units(request: TopUnitsRequest):
+    """
+    Calculate the K best units against a target
+
+    Units that cannot make the cut are skipped using cheap upper bounds on
+    their kills (see engine/topk.py), so large datasheet libraries are not
+    fully evaluated.
+
+    Returns:
+    - metrics: Up to k units, best first by the requested metric
+    """
+    try:
+        weapon_dicts = [weapon_to_dict(w) for w in request.weapons]
+        target_dict = target_to_dict(request.target)
+
+        cache_key = request_key('top-units', weapon_dicts, target_dict, request.k, request.metric,
+                                request.assume_cover, request.assume_half_range, request.deduplicate_exclusive)
+        metrics_list = result_cache.get(cache_key)
+        if metrics_list is None:
+            df = pd.DataFrame(weapon_dicts)
+            df['__assume_cover__'] = request.assume_cover
+
+            metrics_list = top_units(
+                df=df,
+                target_profile=target_dict,
+                k=request.k,
+                metric=request.metric,
+                deduplicate=request.deduplicate_exclusive,
+                assume_half_range=request.assume_half_range
+            )
+            result_cache.put(cache_key, metrics_list)
+
+        return build_response(metrics_list, request.target.Name)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Top units error: {str(e)}"
+        )
+
+@router.post("/distribution")
+async def calculate_distribution(request: CalculateRequest):
+    """
+    Calculate full kill / damage distributions against a target
+
+    Same inputs as /calculate. Each unit gets its expected metrics plus
+    P(wipe), P(kills >= N) for N = 0..UnitSize and kill / damage percentiles
+    (see engine/distributions.py).
+    """
+    try:
+        df = pd.DataFrame([weapon_to_dict(w) for w in request.weapons])
+        df['__assume_cover__'] = request.assume_cover
+
+        results = calculate_group_distributions(
+            df=df,
+            target_profile=target_to_dict(request.target),
+            deduplicate=request.deduplicate_exclusive,
+            assume_half_range=request.assume_half_range
+        )
+
+        units = []
+        for result in results:
+            dist = result.pop('Distribution')
+            units.append({**result, **dist.summary()})
+
+        return {
+            "target_name": request.target.Name,
+            "units": units
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Distribution error: {str(e)}"
+        )
+
+@router.get("/cache")
+async def cache_stats():
+    """Result cache hit / miss counters"""
+    return result_cache.stats()
+
 @router.get("/health")
 async def calculator_health():
     """Health check for calculator engine"""
@@ -61,7 +61,7 @@ async def load_target_list_by_name(filename: str):
         targets = []
         for key, target_dict in targets_dict.items():
             # Handle 'N' values for optional fields
-            inv_val = target_dict.get('Inv', '')
+            inv_val = target_dict.get('Inv', target_dict.get('Invuln', ''))
             if inv_val == 'N':
                 inv_val = ''
 
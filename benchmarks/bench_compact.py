@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact (float32) evaluation benchmark.
+
+Runs a stat-space sweep and a large roster matrix twice, in float64 and in
+compact mode (float32 math on compact weapon encodings), and reports the
+time and the size of the result arrays for each.
+
+Compact values must match the float64 ones within kernel.COMPACT_RTOL /
+COMPACT_ATOL, and the matrix must pick the same Profile ID modes.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_compact [--units N] [--repeat N] [--seed N]
+
+Exits with status 1 if a compact result is outside the tolerance or slower.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from benchmarks.bench_resolution import best_time, make_roster
+from src.data.targets import TARGETS
+from src.engine.kernel import COMPACT_ATOL, COMPACT_RTOL
+from src.engine.matrix import calculate_matrix
+from src.engine.sweep import sweep_profiles
+
+SWEEP_AXES = {
+    'S': range(1, 17), 'AP': range(0, -6, -1), 'D': [1, 2, 3, 'D3', 'D6', 'D6+1'],
+    'A': [1, 2, 3, 'D6', '2D6'], 'BS': [2, 3, 4, 5], 'Sustained': [0, 1, 2], 'Lethal': ['N', 'Y'],
+    'Dev': ['N', 'Y'],
+}
+
+
+def max_error(double, compact):
+    """
+    Largest |compact - double| / (COMPACT_ATOL + COMPACT_RTOL * |double|)
+    over the non-NaN cells; 1 or less is within the tolerance.
+    """
+    double, compact = np.asarray(double), np.asarray(compact, dtype=np.float64)
+    cells = ~np.isnan(double)
+    if not cells.any():
+        return 0.0
+    return float(np.max(np.abs(compact[cells] - double[cells]) / (COMPACT_ATOL + COMPACT_RTOL * np.abs(double[cells]))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--units', type=int, default=5000, help='Units in the generated roster')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per path (best is reported)')
+    parser.add_argument('--seed', type=int, default=2500, help='Seed for the generated roster')
+    args = parser.parse_args()
+
+    df = make_roster(args.units, args.seed)
+    runs = {
+        'sweep': lambda compact: sweep_profiles(SWEEP_AXES, TARGETS, compact=compact),
+        'matrix': lambda compact: calculate_matrix(df, TARGETS, compact=compact),
+    }
+
+    print("=" * 88)
+    print(f"Compact benchmark: {len(TARGETS)} targets, roster of {args.units} units ({len(df)} rows), "
+          f"best of {args.repeat}")
+    print(f"Tolerance: rtol={COMPACT_RTOL:g} atol={COMPACT_ATOL:g}")
+    print("=" * 88)
+    print(f"{'Run':<10}{'float64':>12}{'compact':>12}{'Speedup':>10}{'Arrays':>18}{'Max error':>12}")
+
+    ok = True
+    for name, run in runs.items():
+        double_time, double = best_time(lambda: run(False), args.repeat)
+        compact_time, compact = best_time(lambda: run(True), args.repeat)
+        error = max(max_error(double.values[m], compact.values[m]) for m in double.values)
+        speedup = double_time / compact_time
+        double_mb = sum(v.nbytes for v in double.values.values()) / 1e6
+        compact_mb = sum(v.nbytes for v in compact.values.values()) / 1e6
+
+        print(f"{name:<10}{double_time * 1e3:>10.1f}ms{compact_time * 1e3:>10.1f}ms{speedup:>9.2f}x"
+              f"{double_mb:>8.1f} -> {compact_mb:>5.1f}MB{error:>12.3f}")
+
+        if error > 1:
+            print(f"  ❌ {name}: compact results are outside the tolerance")
+            ok = False
+        if name == 'matrix' and not np.array_equal(double.modes, compact.modes):
+            print(f"  ❌ {name}: compact matrix picked different Profile ID modes")
+            ok = False
+        if speedup < 1:
+            print(f"  ❌ {name}: compact evaluation is slower")
+            ok = False
+
+    print("=" * 88)
+    print("✅ COMPACT EVALUATION MATCHES FLOAT64 WITHIN TOLERANCE AND OUTRUNS IT" if ok else "❌ BENCHMARK FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
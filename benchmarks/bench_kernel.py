@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resolve kernel parity benchmark.
+
+Runs the frozen pre-kernel engines (benchmarks/legacy/) and the resolve
+kernel on the same generated weapon profiles and target profiles, then
+reports per-path timings and how far the numbers agree.
+
+Parity is checked on the profiles whose rules did not change when the
+engines were unified (no rerolls, Twin-Linked, custom crit thresholds or
+D3 dice; the legacy CPK engine also ignored Torrent, Blast, Stealth and
+FNP, and capped Devastating Wounds at one model each). Every other profile
+is only counted, since the legacy numbers were wrong there.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_kernel [--profiles N] [--repeat N] [--seed N]
+
+Exits with status 1 if parity fails, or if the batched or scalar (per-call
+adapter) kernel path is slower than its legacy path.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+import cpk_engine
+from benchmarks.legacy import calculator as legacy_calculator
+from benchmarks.legacy import cpk_engine as legacy_cpk_engine
+from benchmarks.legacy import math_core as legacy_math_core
+from src.data.targets import TARGETS
+from src.engine.calculator import resolve_weapon_profile, resolve_weapon_profiles
+from src.engine import math_core, tables
+from src.engine.kernel import (
+    compile_weapons, compile_targets, resolve_weapons, resolve_profile, reroll_mode, map_unique
+)
+
+TOLERANCE = 1e-9
+
+CHOICES = {
+    'A': ['1', '2', '3', '4', '6', 'D6', '2D6', 'D6+1', 'D3'],
+    'BS': [2, 3, 4, 5],
+    'S': [3, 4, 5, 6, 8, 10, 12],
+    'AP': [0, -1, -2, -3],
+    'D': ['1', '2', '3', 'D6', 'D6+1', 'D3'],
+    'Sustained': [0, 0, 0, 1, 2],
+    'Lethal': ['N', 'N', 'Y'],
+    'Dev': ['N', 'N', 'Y'],
+    'Torrent': ['N', 'N', 'N', 'Y'],
+    'Blast': ['N', 'N', 'N', 'Y'],
+    'TwinLinked': ['N', 'N', 'N', 'Y'],
+    'CritHit': [6, 6, 6, 5],
+    'CritWound': [6, 6, 6, 4],
+    'RR_H': ['N', 'N', '1', 'F'],
+    'RR_W': ['N', 'N', '1', 'F'],
+}
+
+
+def make_profiles(count, seed):
+    """Random weapon profile dicts drawn from CHOICES."""
+    rng = np.random.default_rng(seed)
+    profiles = []
+    for i in range(count):
+        profile = {key: values[rng.integers(len(values))] for key, values in CHOICES.items()}
+        profile.update({'Name': f'Weapon {i}', 'Pts': int(rng.integers(50, 250))})
+        profiles.append(profile)
+    return profiles
+
+
+def is_stable(profile):
+    """Rules unchanged between the legacy calculator and the kernel."""
+    return (reroll_mode(profile['RR_H']) == tables.REROLL_NONE
+            and reroll_mode(profile['RR_W']) == tables.REROLL_NONE
+            and profile['TwinLinked'] == 'N'
+            and profile['CritHit'] == 6 and profile['CritWound'] == 6
+            and 'D3' not in profile['A'] and 'D3' not in profile['D'])
+
+
+def is_stable_cpk(profile, target):
+    """Inputs the legacy CPK engine handled (fixed dice, no ignored keywords)."""
+    return (is_stable(profile)
+            and 'D' not in profile['A'] and 'D' not in profile['D']
+            and profile['Torrent'] == 'N' and profile['Blast'] == 'N' and profile['Dev'] == 'N'
+            and not target.get('FNP') and str(target.get('Stealth', 'N')).upper() != 'Y')
+
+
+def best_time(func, repeat):
+    """Best wall time of `repeat` runs, plus the result of the last run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(legacy, kernel, mask):
+    """Returns (max |diff| on the stable cells, stable cell count, differing unstable cells)."""
+    legacy, kernel = np.asarray(legacy, dtype=float), np.asarray(kernel, dtype=float)
+    diff = np.abs(legacy - kernel)
+    stable_max = float(diff[mask].max()) if mask.any() else 0.0
+    changed = int((diff[~mask] > TOLERANCE).sum())
+    return stable_max, int(mask.sum()), changed
+
+
+def bench_resolve(profiles, targets, repeat):
+    """legacy resolve_single_row() loop vs kernel scalar and batched paths."""
+    def legacy():
+        return [[legacy_calculator.resolve_single_row(p, t)[0] for p in profiles] for t in targets]
+
+    def scalar():
+        return [[resolve_profile(p, t)[0] for p in profiles] for t in targets]
+
+    def batched():
+        return resolve_weapons(compile_weapons(pd.DataFrame(profiles)), compile_targets(targets))[0]
+
+    mask = np.array([[is_stable(p) for p in profiles] for _ in targets])
+    return 'resolve_single_row', legacy, scalar, batched, mask
+
+
+def bench_weapon_profile(profiles, targets, repeat):
+    """legacy resolve_weapon_profile() (a pd.Series per call) vs the pandas-free versions."""
+    def legacy():
+        return [[legacy_calculator.resolve_weapon_profile(p, t)['dead_models'] for p in profiles] for t in targets]
+
+    def scalar():
+        return [[resolve_weapon_profile(p, t)['dead_models'] for p in profiles] for t in targets]
+
+    def batched():
+        return [[r['dead_models'] for r in resolve_weapon_profiles(profiles, t)] for t in targets]
+
+    mask = np.array([[is_stable(p) for p in profiles] for _ in targets])
+    return 'resolve_weapon_profile', legacy, scalar, batched, mask
+
+
+def bench_cpk(profiles, targets, repeat):
+    """legacy calculate_cpk() loop vs kernel-backed adapter and batched path."""
+    # The legacy engine calls int() on A, so it only accepts fixed attacks
+    profiles = [p for p in profiles if 'D' not in p['A']]
+    pts = np.array([p['Pts'] for p in profiles], dtype=float)
+    target_pts = np.array([t['Pts'] for t in targets], dtype=float).reshape(-1, 1)
+
+    def legacy():
+        return [[legacy_cpk_engine.calculate_cpk(p, t) for p in profiles] for t in targets]
+
+    def scalar():
+        return [[cpk_engine.calculate_cpk(p, t) for p in profiles] for t in targets]
+
+    def batched():
+        kills = resolve_weapons(compile_weapons(pd.DataFrame(profiles)), compile_targets(targets))[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(kills > 0, np.round(pts / (kills * target_pts), 2), 999.9)
+
+    mask = np.array([[is_stable_cpk(p, t) for p in profiles] for t in targets])
+    return 'calculate_cpk', legacy, scalar, batched, mask
+
+
+def bench_hit_prob(profiles, targets, repeat):
+    """legacy math_core.get_hit_prob() loop vs the adapter and a table gather, per weapon and target (Stealth = +1 BS)."""
+    bs = [p['BS'] + (str(t.get('Stealth', 'N')).upper() == 'Y') for t in targets for p in profiles]
+    rr = [p['RR_H'] for _ in targets for p in profiles]
+
+    def legacy():
+        return [legacy_math_core.get_hit_prob(b, r) for b, r in zip(bs, rr)]
+
+    def scalar():
+        return [math_core.get_hit_prob(b, r) for b, r in zip(bs, rr)]
+
+    def batched():
+        modes = map_unique(pd.Series(rr), reroll_mode, dtype=np.intp)
+        return tables.P_HIT[tables.clip_bs(np.array(bs)), 6, modes]
+
+    mask = np.array([reroll_mode(r) == tables.REROLL_NONE for r in rr])
+    return 'get_hit_prob', legacy, scalar, batched, mask
+
+
+def bench_group_metrics(profiles, targets, repeat):
+    """legacy calculate_group_metrics() (row-by-row apply) vs the kernel-backed version."""
+    from src.engine.calculator import calculate_group_metrics
+
+    roster = pd.DataFrame([dict(p, UnitID=p['Name'], Qty=1, Weapon=p['Name'], **{'Loadout Group': 'All', 'Profile ID': ''})
+                           for p in profiles])
+
+    def in_profile_order(results):
+        # Results come back sorted by unit name, not in roster order
+        kills = {r['Name']: r['Kills'] for r in results}
+        return [kills[p['Name']] for p in profiles]
+
+    def legacy():
+        return [in_profile_order(legacy_calculator.calculate_group_metrics(roster, t)) for t in targets]
+
+    def kernel():
+        return [in_profile_order(calculate_group_metrics(roster, t)) for t in targets]
+
+    mask = np.array([[is_stable(p) for p in profiles] for _ in targets])
+    return 'calculate_group_metrics', legacy, None, kernel, mask
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, default=500, help='Weapon profiles to generate')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per path (best is reported)')
+    parser.add_argument('--seed', type=int, default=40000, help='Seed for the generated profiles')
+    args = parser.parse_args()
+
+    profiles = make_profiles(args.profiles, args.seed)
+    targets = list(TARGETS.values())
+
+    print("=" * 100)
+    print(f"Resolve kernel benchmark: {len(profiles)} profiles x {len(targets)} targets, best of {args.repeat}")
+    print("=" * 100)
+    print(f"{'Path':<25}{'Legacy':>11}{'Scalar':>11}{'Batched':>11}{'Speedup':>10}"
+          f"{'Stable cells':>14}{'Max diff':>11}{'Changed':>9}")
+
+    ok = True
+    for bench in (bench_resolve, bench_weapon_profile, bench_cpk, bench_hit_prob, bench_group_metrics):
+        name, legacy, scalar, batched, mask = bench(profiles, targets, args.repeat)
+
+        legacy_time, legacy_result = best_time(legacy, args.repeat)
+        batched_time, batched_result = best_time(batched, args.repeat)
+        scalar_text, scalar_speedup = '-', None
+        # calculate_cpk() rounds to 2 decimals, so allow rounding noise there
+        tolerance = 0.01 + TOLERANCE if name == 'calculate_cpk' else 1e-6
+        if scalar is not None:
+            scalar_time, scalar_result = best_time(scalar, args.repeat)
+            scalar_text = f"{scalar_time * 1e3:.1f}ms"
+            scalar_speedup = legacy_time / scalar_time
+            # Both kernel paths must agree everywhere, not just on stable rows
+            if not np.allclose(scalar_result, batched_result, rtol=0, atol=tolerance):
+                print(f"  ❌ {name}: scalar and batched kernel paths disagree")
+                ok = False
+
+        stable_max, stable_cells, changed = compare(legacy_result, batched_result, mask)
+        speedup = legacy_time / batched_time
+        print(f"{name:<25}{legacy_time * 1e3:>9.1f}ms{scalar_text:>11}{batched_time * 1e3:>9.1f}ms"
+              f"{speedup:>9.1f}x{stable_cells:>14}{stable_max:>11.2e}{changed:>9}")
+
+        if stable_max > tolerance:
+            print(f"  ❌ {name}: kernel does not match the legacy engine on stable profiles")
+            ok = False
+        if speedup < 1:
+            print(f"  ❌ {name}: kernel is slower than the legacy path")
+            ok = False
+        if scalar_speedup is not None and scalar_speedup < 1:
+            print(f"  ❌ {name}: scalar kernel path is slower than the legacy path ({scalar_speedup:.2f}x)")
+            ok = False
+
+    print("=" * 100)
+    print("✅ KERNEL MATCHES AND OUTRUNS EVERY LEGACY PATH" if ok else "❌ BENCHMARK FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
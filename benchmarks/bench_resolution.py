@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profile ID resolution and unit aggregation benchmark.
+
+Generates a large roster (units with cumulative weapons, exclusive
+Profile ID modes, duplicate profiles and range variants), resolves it once
+with the kernel, then times the frozen row-wise resolution phase
+(benchmarks/legacy/resolution.py) against the vectorized
+aggregate_unit_metrics() on the same per-row results.
+
+Every unit result must be identical: same units in the same order, same
+active-mode labels and the same Kills / Damage / CPK / TTK / Pts.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_resolution [--units N] [--repeat N] [--seed N]
+
+Exits with status 1 if the results differ or the vectorized path is slower.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.legacy import resolution as legacy_resolution
+from src.data.targets import TARGETS
+from src.engine.calculator import prepare_roster, aggregate_unit_metrics
+from src.engine.kernel import compile_weapons, compile_targets, resolve_unique_weapons
+
+TOLERANCE = 1e-9
+NUMERIC = ('Qty', 'Pts', 'Kills', 'Damage', 'CPK', 'TTK')
+
+WEAPONS = [
+    # (Weapon, A, S, AP, D, Range, extra)
+    ('Bolt Rifle', 2, 4, -1, 1, 24, {}),
+    ('Heavy Bolter', 3, 5, -1, 2, 36, {'Sustained': 1}),
+    ('Melta Rifle', 1, 9, -4, 'D6', 12, {'Melta': 2}),
+    ('Storm Bolter', 2, 4, 0, 1, 24, {'RapidFire': 2}),
+    ('Chainsword', 4, 4, -1, 1, 'M', {}),
+    ('Power Fist', 3, 8, -2, 2, 'M', {}),
+]
+MODES = [
+    ('Plasma (Std)', 2, 7, -2, 1, 24, {}),
+    ('Plasma (Ovr)', 2, 8, -3, 2, 24, {}),
+    ('Missile (Frag)', 'D6', 4, 0, 1, 48, {'Blast': 'Y'}),
+    ('Missile (Krak)', 1, 9, -2, 'D6', 48, {}),
+]
+
+
+def make_roster(units, seed):
+    """Random roster rows: a few weapons per unit, some exclusive modes and duplicates."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(units):
+        unit = {'UnitID': f'U{i}', 'Name': f'Unit {i % (units // 2 + 1)}', 'Qty': int(rng.integers(1, 10)),
+                'Pts': int(rng.integers(50, 250)), 'Loadout Group': ['Ranged', 'Melee'][int(rng.integers(2))],
+                'Keywords': '', 'BS': int(rng.integers(2, 5))}
+        # (weapon, Profile ID): cumulative weapons, then exclusive mode groups
+        picks = [(WEAPONS[j], '') for j in rng.choice(len(WEAPONS), size=int(rng.integers(1, 4)), replace=False)]
+        if rng.random() < 0.5:
+            picks += [(mode, 'M') for mode in MODES[:2]]
+        if rng.random() < 0.3:
+            picks += [(mode, 'H') for mode in MODES[2:]]
+        if rng.random() < 0.2:
+            picks.append(picks[0])
+        for (weapon, a, s, ap, d, range_, extra), profile_id in picks:
+            row = dict(unit, Weapon=weapon, A=a, S=s, AP=ap, D=d, Range=range_, **{'Profile ID': profile_id})
+            row.update(extra)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def best_time(func, repeat):
+    """Best wall time of `repeat` runs, plus the result of the last run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def differences(legacy, vectorized):
+    """Number of unit results that differ (length mismatch counts every extra unit)."""
+    count = abs(len(legacy) - len(vectorized))
+    for old, new in zip(legacy, vectorized):
+        same = old.keys() == new.keys() and all(
+            np.isclose(old[k], new[k], rtol=0, atol=TOLERANCE) if k in NUMERIC else old[k] == new[k]
+            for k in old
+        )
+        count += not same
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--units', type=int, default=2000, help='Units to generate')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per path (best is reported)')
+    parser.add_argument('--seed', type=int, default=2100, help='Seed for the generated roster')
+    args = parser.parse_args()
+
+    df = make_roster(args.units, args.seed)
+    targets = [TARGETS[key] for key in ('GEQ', 'MEQ', 'TEQ')]
+
+    print("=" * 88)
+    print(f"Resolution benchmark: {args.units} units ({len(df)} rows) x {len(targets)} targets, best of {args.repeat}")
+    print("=" * 88)
+    print(f"{'Settings':<28}{'Units':>8}{'Row-wise':>12}{'Vectorized':>12}{'Speedup':>10}{'Differ':>9}")
+
+    ok = True
+    for half_range in (False, True):
+        temp_df = prepare_roster(df, half_range)
+        kills, damage = resolve_unique_weapons(compile_weapons(temp_df), compile_targets(targets), half_range)
+
+        for deduplicate in (True, False):
+            def legacy():
+                return [legacy_resolution.aggregate_unit_metrics(temp_df, kills[t], damage[t], target, deduplicate)
+                        for t, target in enumerate(targets)]
+
+            def vectorized():
+                return [aggregate_unit_metrics(temp_df, kills[t], damage[t], target, deduplicate)
+                        for t, target in enumerate(targets)]
+
+            legacy_time, legacy_results = best_time(legacy, args.repeat)
+            vectorized_time, vectorized_results = best_time(vectorized, args.repeat)
+            differ = sum(differences(old, new) for old, new in zip(legacy_results, vectorized_results))
+            speedup = legacy_time / vectorized_time
+
+            settings = f"half_range={half_range} dedup={deduplicate}"
+            print(f"{settings:<28}{len(vectorized_results[0]):>8}{legacy_time * 1e3:>10.1f}ms"
+                  f"{vectorized_time * 1e3:>10.1f}ms{speedup:>9.1f}x{differ:>9}")
+
+            if differ:
+                print(f"  ❌ {settings}: vectorized results differ from the row-wise resolution")
+                ok = False
+            if speedup < 1:
+                print(f"  ❌ {settings}: vectorized resolution is slower")
+                ok = False
+
+    print("=" * 88)
+    print("✅ VECTORIZED RESOLUTION MATCHES AND OUTRUNS THE ROW-WISE PATH" if ok else "❌ BENCHMARK FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
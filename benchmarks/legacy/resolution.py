@@ -0,0 +1,153 @@
+# Frozen copy of the Profile ID resolution and unit aggregation in src/engine/calculator.py
+# from before it was vectorized (row-wise apply and per-group lambdas).
+# Reference implementation for benchmarks/bench_resolution.py only - do not edit or import from app code.
+
+import pandas as pd
+from src.engine.calculator import score_kills
+from src.engine.grading import get_cpk_grade
+
+def resolve_active_rows(temp_df, row_kills, row_damage, deduplicate=True):
+    """
+    Picks the winning Profile ID modes and drops duplicate profiles.
+
+    Parameters:
+    - temp_df: Roster from prepare_roster()
+    - row_kills, row_damage: Per-row results for this target (same order as temp_df)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+
+    Returns:
+    - DataFrame of the rows that count towards each unit, with
+      final_kills / final_damage columns (Qty applied when not deduplicating)
+    """
+    temp_df = temp_df.assign(row_kills=row_kills, row_damage=row_damage)
+
+    # --- 2. RESOLUTION PHASE (Optimization) ---
+    mask_exclusive = temp_df['Profile ID'] != ''
+    df_cumulative = temp_df[~mask_exclusive].copy()
+    df_exclusive = temp_df[mask_exclusive].copy()
+    
+    if not df_exclusive.empty:
+        # Sort by Kills (primary) then Damage (secondary)
+        df_exclusive = df_exclusive.sort_values(
+            by=['row_kills', 'row_damage'], 
+            ascending=[False, False]
+        )
+        # Identify Winners
+        winners = df_exclusive.drop_duplicates(subset=['Name', 'Pts', 'Profile ID'])
+        winning_keys = set(zip(winners['Name'], winners['Pts'], winners['Profile ID'], winners['Weapon']))
+        
+        # Filter
+        df_exclusive_resolved = df_exclusive[
+            df_exclusive.apply(lambda x: (x['Name'], x['Pts'], x['Profile ID'], x['Weapon']) in winning_keys, axis=1)
+        ]
+    else:
+        df_exclusive_resolved = pd.DataFrame()
+
+    # Recombine
+    work_df = pd.concat([df_cumulative, df_exclusive_resolved], ignore_index=True)
+
+    # --- 3. AGGREGATION PHASE (The Fix) ---
+
+    # Calculate Totals
+    # Note: We do NOT multiply Pts here yet. We handle points aggregation separately below.
+    if not deduplicate:
+        work_df['final_kills'] = work_df['row_kills'] * work_df['Qty']
+        work_df['final_damage'] = work_df['row_damage'] * work_df['Qty']
+    else:
+        work_df['final_kills'] = work_df['row_kills']
+        work_df['final_damage'] = work_df['row_damage']
+
+    # Deduplication (Table View)
+    if deduplicate:
+        subset_cols = ['Name', 'Weapon', 'A', 'BS', 'S', 'AP', 'D', 'Pts', 'Keywords', 'Loadout Group']
+        # Compare parsed dice (including range bonuses) rather than the raw A/D strings
+        if '__attack_spec__' in work_df.columns:
+            subset_cols = [{'A': '__attack_spec__', 'D': '__damage_spec__'}.get(c, c) for c in subset_cols]
+        valid_subset = [c for c in subset_cols if c in work_df.columns]
+        work_df = work_df.drop_duplicates(subset=valid_subset)
+
+    return work_df
+
+def unit_group_columns(work_df, deduplicate=True):
+    """Returns the columns that identify a unit in the results table."""
+    group_cols = ['UnitID', 'Name', 'Loadout Group']
+    if 'Qty' in work_df.columns and not deduplicate:
+         group_cols.append('Qty')
+
+    return [c for c in group_cols if c in work_df.columns]
+
+def summarize_units(work_df, target_profile, deduplicate=True):
+    """
+    Aggregates the active rows from resolve_active_rows() into unit metrics.
+
+    Parameters:
+    - work_df: Active rows from resolve_active_rows()
+    - target_profile: Target stats dict (for Pts and UnitSize)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    """
+    valid_group_cols = unit_group_columns(work_df, deduplicate)
+
+    # --- POINTS AGGREGATION FIX ---
+    # We aggregate Pts using 'max' to avoid double-counting multi-profile units.
+    # e.g. Karnivore (Strike) 140pts + Karnivore (Sweep) 140pts -> MAX is 140pts.
+
+    agg_funcs = {
+        'final_kills': 'sum',
+        'final_damage': 'sum',
+        'Pts': 'max',  # <--- CRITICAL FIX: Take MAX cost of the rows in this unit
+        'Weapon': lambda x: ", ".join(sorted(set(x.dropna())))
+    }
+
+    # Only Profile ID rows name an active mode; blank out the rest once up front
+    work_df = work_df.assign(Weapon=work_df['Weapon'].where(work_df['Profile ID'] != ''))
+    grouped = work_df.groupby(valid_group_cols).agg(agg_funcs).reset_index()
+
+    results = []
+
+    for _, row in grouped.iterrows():
+        # Cost Calculation
+        unit_cost = float(row['Pts'])
+        qty = row.get('Qty', 1) if not deduplicate else 1
+        
+        # Total Cost = Unit Cost * Qty
+        # (Since we used 'max' above, unit_cost is the cost of ONE model)
+        total_cost_basis = unit_cost * qty
+        
+        total_kills = row['final_kills']
+        total_dmg = row['final_damage']
+        active_modes = row['Weapon']
+        
+        cpk, ttk = score_kills(total_kills, total_cost_basis, target_profile)
+
+        # Get letter grade for CPK
+        grade = get_cpk_grade(cpk)
+
+        results.append({
+            'UnitID': row.get('UnitID', ''),
+            'Name': row['Name'],
+            'Loadout Group': row.get('Loadout Group', 'Standard'),
+            'Weapon': active_modes,
+            'Qty': qty,
+            'Pts': int(unit_cost),
+            'Kills': total_kills,
+            'Damage': total_dmg,
+            'CPK': cpk,
+            'TTK': ttk,
+            'CPK_Grade': grade,
+            'Profile ID': None
+        })
+
+    return results
+
+def aggregate_unit_metrics(temp_df, row_kills, row_damage, target_profile, deduplicate=True):
+    """
+    Resolves Profile ID modes and aggregates per-row results into unit metrics.
+
+    Parameters:
+    - temp_df: Roster from prepare_roster()
+    - row_kills, row_damage: Per-row results for this target (same order as temp_df)
+    - target_profile: Target stats dict (for Pts and UnitSize)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    """
+    work_df = resolve_active_rows(temp_df, row_kills, row_damage, deduplicate)
+    return summarize_units(work_df, target_profile, deduplicate)
@@ -12,6 +12,34 @@ const client = axios.create({
   },
 })
 
+// One editor session per tab, so the backend only recomputes what changed.
+// Created on first use: crypto.randomUUID only exists in secure contexts
+// (https / localhost), not when the dev server is opened by LAN IP.
+let sessionId = null
+
+const newSessionId = () => {
+  const cryptoApi = globalThis.crypto
+  if (cryptoApi?.randomUUID) {
+    return cryptoApi.randomUUID()
+  }
+  const bytes = new Uint8Array(16)
+  if (cryptoApi?.getRandomValues) {
+    cryptoApi.getRandomValues(bytes)
+  } else {
+    for (let i = 0; i < bytes.length; i++) {
+      bytes[i] = Math.floor(Math.random() * 256)
+    }
+  }
+  return Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('')
+}
+
+const getSessionId = () => {
+  if (sessionId === null) {
+    sessionId = newSessionId()
+  }
+  return sessionId
+}
+
 // Calculator API
 export const calculator = {
   calculate: async (weapons, target, assumeCover = false, assumeHalfRange = false) => {
@@ -21,16 +49,58 @@ export const calculator = {
       assume_cover: assumeCover,
       assume_half_range: assumeHalfRange,
       deduplicate_exclusive: true,
+      session_id: getSessionId(),
+    })
+    return response.data
+  },
+
+  calculateScenarios: async (weapons, target) => {
+    const response = await client.post('/api/calculator/calculate-scenarios', {
+      weapons,
+      target,
+      deduplicate_exclusive: true,
+    })
+    return response.data
+  },
+
+  calculateSensitivity: async (weapons, targets, assumeCover = false, assumeHalfRange = false) => {
+    const response = await client.post('/api/calculator/sensitivity', {
+      weapons,
+      targets,
+      assume_cover: assumeCover,
+      assume_half_range: assumeHalfRange,
+    })
+    return response.data
+  },
+
+  sweep: async (axes, targets, base = null, assumeCover = false) => {
+    const response = await client.post('/api/calculator/sweep', {
+      axes,
+      targets,
+      base,
+      assume_cover: assumeCover,
+    })
+    return response.data
+  },
+
+  topUnits: async (weapons, target, k = 10, metric = 'CPK', assumeCover = false) => {
+    const response = await client.post('/api/calculator/top-units', {
+      weapons,
+      target,
+      k,
+      metric,
+      assume_cover: assumeCover,
     })
     return response.data
   },
 
-  calculateMultiTarget: async (weapons, targets, assumeCover = false, assumeHalfRange = false) => {
+  calculateMultiTarget: async (weapons, targets, assumeCover = false, assumeHalfRange = false, metrics = null) => {
     const response = await client.post('/api/calculator/calculate-multi-target', {
       weapons,
       targets,
       assume_cover: assumeCover,
       assume_half_range: assumeHalfRange,
+      metrics,
     })
     return response.data
   },
@@ -11,6 +11,8 @@ import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
+from src.engine.roster import compile_roster
+
 # Get the directory where THIS file (roster_manager.py) is located (src/data)
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -100,6 +102,12 @@ def validate_roster_data(roster_df: pd.DataFrame) -> Tuple[bool, str]:
                 except (ValueError, TypeError):
                     return False, f"Column '{col}' contains non-numeric values"
 
+    # Attacks and Damage must be dice expressions (e.g. 3, D6, 2D3+1); the
+    # compiled roster is cached, so the engine reuses it for this roster
+    for col, values in compile_roster(roster_df).invalid_dice().items():
+        if values:
+            return False, f"Column '{col}' contains invalid dice expressions: {', '.join(map(str, values))}"
+
     return True, ""
 
 
@@ -0,0 +1,165 @@
+# src/engine/allocation.py
+
+"""
+Model-by-Model Damage Allocation
+
+Dynamic programming over the state (models killed, wounds on the current
+model), with an absorbing 'unit wiped' state at the end. One damage event
+moves probability mass between states:
+
+- Normal damage stops at the current model: excess damage is wasted.
+- Mortal wounds (Devastating Wounds) carry over to the next model.
+- Feel No Pain is rolled per point of damage before allocation.
+
+Transition matrices only depend on the damage dice, W, FNP and UnitSize,
+so they are built once and cached per (damage distribution, W, FNP,
+UnitSize) key and shared by every weapon that rolls the same damage.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+from .dice import DiceSpec, compile_spec
+
+# Maximum number of (damage, W, FNP, UnitSize) tables kept in the cache
+CACHE_SIZE = 4096
+
+
+def _freeze(arr):
+    arr.setflags(write=False)
+    return arr
+
+
+def fnp_thinned(pmf, p_fnp_fail):
+    """
+    Applies Feel No Pain to each point of damage (binomial thinning).
+
+    Args:
+        pmf: pmf[d] = P(damage == d) before FNP
+        p_fnp_fail: Probability that a point of damage gets through
+
+    Returns:
+        np.ndarray pmf of damage after FNP
+    """
+    if p_fnp_fail >= 1.0:
+        return np.asarray(pmf, dtype=float)
+
+    out = np.zeros(len(pmf))
+    for d, p in enumerate(pmf):
+        if p == 0:
+            continue
+        for k in range(d + 1):
+            out[k] += p * math.comb(d, k) * p_fnp_fail ** k * (1 - p_fnp_fail) ** (d - k)
+    return out
+
+
+def _event_matrix(damage_pmf, unit_size, model_w, spill):
+    """Transition matrix for one damage event drawn from damage_pmf."""
+    n_states = unit_size * model_w + 1
+    wiped = n_states - 1
+    matrix = np.zeros((n_states, n_states))
+    matrix[wiped, wiped] = 1.0
+
+    for kills in range(unit_size):
+        for taken in range(model_w):
+            state = kills * model_w + taken
+            for dmg, p in enumerate(damage_pmf):
+                if p == 0:
+                    continue
+                if spill:
+                    total = taken + dmg
+                    new_kills, new_taken = kills + total // model_w, total % model_w
+                elif taken + dmg >= model_w:
+                    new_kills, new_taken = kills + 1, 0
+                else:
+                    new_kills, new_taken = kills, taken + dmg
+                target = wiped if new_kills >= unit_size else new_kills * model_w + new_taken
+                matrix[state, target] += p
+    return matrix
+
+
+class AllocationTable:
+    """
+    Cached allocation tables for one (damage, W, FNP, UnitSize) combination.
+
+    Attributes:
+        damage_pmf: Damage per unsaved wound after Feel No Pain
+        normal: Transition matrix for one normal unsaved wound
+        mortal: Transition matrix for one mortal wound (damage spills over)
+        unit_size, model_w: Target shape
+    """
+    __slots__ = ('damage_pmf', 'normal', 'mortal', 'unit_size', 'model_w')
+
+    def __init__(self, damage_pmf, normal, mortal, unit_size, model_w):
+        self.damage_pmf = damage_pmf
+        self.normal = normal
+        self.mortal = mortal
+        self.unit_size = unit_size
+        self.model_w = model_w
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def allocation_table(damage_spec, model_w, p_fnp_fail, unit_size):
+    """
+    Builds (and caches) the allocation tables for one damage profile.
+
+    Args:
+        damage_spec: DiceSpec of the weapon's damage (None = no damage)
+        model_w: Wounds per model
+        p_fnp_fail: Probability a point of damage gets through Feel No Pain (1.0 = no FNP)
+        unit_size: Models in the target unit
+
+    Returns:
+        AllocationTable
+    """
+    damage = damage_spec.pmf if isinstance(damage_spec, DiceSpec) else np.ones(1)
+    damage = fnp_thinned(damage, p_fnp_fail)
+
+    return AllocationTable(
+        _freeze(damage),
+        _freeze(_event_matrix(damage, unit_size, model_w, spill=False)),
+        _freeze(_event_matrix(damage, unit_size, model_w, spill=True)),
+        unit_size,
+        model_w,
+    )
+
+
+def start_state(unit_size, model_w):
+    """State vector of an undamaged unit."""
+    state = np.zeros(unit_size * model_w + 1)
+    state[0] = 1.0
+    return state
+
+
+def kills_pmf(state, unit_size, model_w):
+    """Collapses a state vector to kills_pmf[k] = P(exactly k models killed)."""
+    alive = state[:-1].reshape(unit_size, model_w).sum(axis=-1)
+    return np.append(alive, state[-1])
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _capped_mean(spec, model_w):
+    values, probs = spec.distribution
+    return float(np.dot(np.minimum(values, model_w), probs))
+
+
+def expected_capped_damage(spec, model_w):
+    """
+    Exact E[min(damage, W)]: average damage one wound does to a single model.
+
+    Args:
+        spec: DiceSpec (or legacy parse_dice() dict) of the damage
+        model_w: Wounds per model
+
+    Returns:
+        float
+    """
+    if isinstance(spec, dict):
+        spec = compile_spec(spec['count'], spec['faces'], spec['modifier'])
+    return _capped_mean(spec, model_w)
+
+
+def cache_info():
+    """Returns LRU statistics for the allocation table cache."""
+    return allocation_table.cache_info()
@@ -1,41 +1,20 @@
 import numpy as np
 import pandas as pd
-import re
+from .dice import compile_dice, parse_int, format_number
 from .grading import get_cpk_grade
+from .kernel import (
+    compile_weapons, compile_weapon, compile_target, resolve_unique_weapons, resolve_weapon, resolve_profile,
+    map_unique, map_unique_pairs, column_or_default
+)
 
-# --- HELPER FUNCTIONS (Kept your existing parsing logic) ---
+# --- HELPER FUNCTIONS (Parsing is compiled & cached in dice.py) ---
 
 def safe_int(val, default=0):
-    try:
-        if pd.isna(val) or val == '': return default
-        s_val = str(val)
-        match = re.search(r'-?\d+', s_val)
-        if match: return int(match.group())
-        return default
-    except (ValueError, TypeError):
-        return default
+    return parse_int(val, default)
 
 def parse_d6_value(val):
-    if pd.isna(val) or val == '': return 0.0
-    val = str(val).upper().strip()
-    if 'D' not in val:
-        try: return float(val)
-        except ValueError: return 0.0
-    try:
-        if '+' in val:
-            parts = val.split('+')
-            dice_part = parts[0]
-            flat_part = float(parts[1])
-        else:
-            dice_part = val
-            flat_part = 0.0
-
-        if dice_part == 'D6': num_dice = 1
-        elif dice_part.endswith('D6'): num_dice = float(dice_part.replace('D6', ''))
-        else: num_dice = 0
-        return (num_dice * 3.5) + flat_part
-    except Exception:
-        return 0.0
+    spec = compile_dice(val)
+    return float(spec.mean) if spec is not None else 0.0
 
 def apply_blast_modifier(attack_string, unit_size, has_blast):
     """
@@ -43,7 +22,7 @@ def apply_blast_modifier(attack_string, unit_size, has_blast):
 
     Blast Rules:
     - 5 or fewer models: No change
-    - 6-10 models: Use minimum value (e.g., D6 = 6, 2D6 = 2)
+    - 6-10 models: Use minimum value (e.g., D6 = 1, 2D6 = 2)
     - 11+ models: Use maximum value (e.g., D6 = 6, D6+3 = 9, 2D6 = 12)
 
     Args:
@@ -57,238 +36,149 @@ def apply_blast_modifier(attack_string, unit_size, has_blast):
     if not has_blast or unit_size <= 5:
         return attack_string
 
-    attack_str = str(attack_string).upper().strip()
+    spec = compile_dice(attack_string)
 
-    # Fixed attacks (no dice) - no change
-    if 'D' not in attack_str:
+    # Fixed attacks (no dice) or unparseable values - no change
+    if spec is None or spec.is_fixed:
         return attack_string
 
-    # Parse the attack characteristic
-    try:
-        flat_part = 0
-        if '+' in attack_str:
-            parts = attack_str.split('+')
-            dice_part = parts[0]
-            flat_part = int(parts[1])
-        else:
-            dice_part = attack_str
-
-        # Determine number of dice
-        if dice_part == 'D6':
-            num_dice = 1
-        elif dice_part.endswith('D6'):
-            num_dice = int(dice_part.replace('D6', ''))
-        else:
-            num_dice = 0
-
-        # Apply Blast modifier
-        if unit_size >= 11:
-            # Maximum: each D6 = 6
-            max_value = (num_dice * 6) + flat_part
-            return str(max_value)
-        elif unit_size >= 6:
-            # Minimum: each D6 = 1, but total attacks = num_dice (not num_dice * 1)
-            # Actually, "minimum" means the lowest possible roll, which is num_dice
-            min_value = num_dice + flat_part
-            return str(min_value)
-        else:
-            return attack_string
-
-    except Exception:
-        # If parsing fails, return original
-        return attack_string
+    if unit_size >= 11:
+        # Maximum: every die rolls its highest face
+        return format_number(spec.max)
+    else:
+        # Minimum: every die rolls a 1, so total attacks = num_dice + flat
+        return format_number(spec.min)
 
 # --- CORE MATH ENGINE ---
 
 def resolve_single_row(row, defender, assume_half_range=False):
     """
     Calculates damage for a single row (one weapon profile).
-    Returns a dict with 'dead_models' and 'total_damage'.
+    Returns a tuple (dead_models, total_damage).
+
+    Thin adapter over the scalar kernel path (kernel.resolve_profile).
 
     Parameters:
     - row: Weapon profile data
     - defender: Target profile dict
     - assume_half_range: If False, apply stealth modifier to hit rolls (default False)
     """
-    # 1. Parse Attacker Stats from the Series (row)
-    # Apply Blast modifier BEFORE parsing attacks
-    blast = str(row.get('Blast', 'N')).upper() == 'Y'
-    unit_size = safe_int(defender.get('UnitSize', 10), default=10)
-    attack_value = apply_blast_modifier(row.get('A', 0), unit_size, blast)
-
-    attacks = parse_d6_value(attack_value)
-    damage = parse_d6_value(row.get('D', 1))
-    bs = safe_int(row.get('BS', 4), default=4)
-    s = safe_int(row.get('S', 4), default=4)
-    ap = safe_int(row.get('AP', 0), default=0)
-
-    sustained_val = safe_int(row.get('Sustained', 0))
-    lethal = str(row.get('Lethal', 'N')).upper() == 'Y'
-    dev = str(row.get('Dev', 'N')).upper() == 'Y'
-    torrent = str(row.get('Torrent', 'N')).upper() == 'Y'
-    twin_linked = str(row.get('TwinLinked', 'N')).upper() == 'Y'
-    crit_hit_thresh = safe_int(row.get('CritHit', 6), default=6)
-    crit_wound_thresh = safe_int(row.get('CritWound', 6), default=6)
-
-    # Check for Stealth on defender
-    stealth = str(defender.get('Stealth', 'N')).upper() == 'Y'
-
-    # 2. Hit Phase
-    p_crit_hit = max(0, (7 - crit_hit_thresh) / 6.0)
-
-    # Torrent = Auto-hit (ignores BS)
-    if torrent:
-        p_hit_standard = 1.0  # All attacks hit
-        hits = attacks
-    else:
-        # Apply stealth modifier if assume_half_range is False
-        effective_bs = bs
-        if not assume_half_range and stealth:
-            effective_bs = bs + 1  # -1 to hit = +1 to BS requirement
-
-        p_hit_standard = max(0, (7 - effective_bs) / 6.0)
-        hits = attacks * p_hit_standard
-
-    auto_wounds = 0
-
-    if lethal:
-        auto_wounds = attacks * p_crit_hit
-        hits = max(0, hits - auto_wounds)
-
-    if sustained_val > 0:
-        hits += (attacks * p_crit_hit * sustained_val)
-
-    # 3. Wound Phase
-    t = safe_int(defender.get('T', 4), default=4)
-    if s >= 2 * t: w_roll = 2
-    elif s > t:    w_roll = 3
-    elif s == t:   w_roll = 4
-    elif s > t/2:  w_roll = 5
-    else:          w_roll = 6
-
-    p_wound_base = (7 - w_roll) / 6.0
-    p_crit_wound = max(0, (7 - crit_wound_thresh) / 6.0)
-
-    # Twin-Linked = Reroll wound rolls (treat as reroll all failures)
-    if twin_linked:
-        p_wound_with_reroll = p_wound_base + ((1 - p_wound_base) * p_wound_base)
-        p_wound_final = max(p_wound_with_reroll, p_crit_wound)
-    else:
-        p_wound_final = max(p_wound_base, p_crit_wound)
-
-    successful_wounds = hits * p_wound_final
-    
-    mortal_wounds = 0
-    if dev:
-        dev_procs = hits * p_crit_wound
-        mortal_wounds = dev_procs * damage
-        successful_wounds = max(0, successful_wounds - dev_procs)
-
-    successful_wounds += auto_wounds
-
-    # 4. Save Phase
-    sv = safe_int(defender.get('Sv'), default=7)
-    inv = safe_int(defender.get('Inv'), default=0)
-
-    # Apply cover modifier per-weapon
-    # Cover improves armor save by 1 (but not invuln) unless weapon ignores cover or is melee
-    assume_cover = row.get('__assume_cover__', False)
-    if assume_cover:
-        ignores_cover = str(row.get('IgnoresCover', 'N')).upper() == 'Y'
-        is_melee = str(row.get('Range', '')).upper() == 'M'
-
-        if not ignores_cover and not is_melee and sv > 2:
-            # Improve armor save by 1 (lower number = better save)
-            sv = sv - 1
-            # DEBUG: Uncomment to see per-weapon cover application
-            # print(f"  Applied cover to {row.get('Weapon')}: save improved to {sv}+")
-
-    modified_sv = sv - ap
-    final_save = modified_sv
-    if inv > 0:
-        final_save = min(modified_sv, inv)
-        
-    if final_save > 6: p_fail = 1.0
-    else:
-        p_save = min((7 - final_save) / 6.0, 5/6.0)
-        p_fail = 1.0 - p_save
-        
-    damage_dealing_wounds = successful_wounds * p_fail
-
-    # 5. Feel No Pain (FNP) - Apply to all damage-dealing wounds
-    fnp_val = defender.get('FNP', '')
-    if fnp_val and fnp_val != '':
-        fnp_save = safe_int(fnp_val, default=7)
-        if fnp_save <= 6:
-            # FNP works like a save - you roll to PREVENT damage
-            # P(prevent damage) = probability to roll fnp_save or higher
-            p_fnp_pass = (7 - fnp_save) / 6.0
-            # P(damage gets through) = probability to fail the FNP roll
-            p_fnp_fail = 1.0 - p_fnp_pass
-            # FNP reduces damage-dealing wounds
-            damage_dealing_wounds = damage_dealing_wounds * p_fnp_fail
-            # Mortal wounds also affected by FNP
-            mortal_wounds = mortal_wounds * p_fnp_fail
-
-    # 6. Damage Allocation
-    model_w = safe_int(defender.get('W', 1), default=1)
-    if model_w <= 0: model_w = 1
-
-    damage_per_shot = float(damage)
-    kill_efficiency_normal = min(1.0, damage_per_shot / model_w)
-
-    dead_from_shots = damage_dealing_wounds * kill_efficiency_normal
-    dead_from_mortals = mortal_wounds / model_w
-
-    total_dead = dead_from_shots + dead_from_mortals
-    total_raw_dmg = (damage_dealing_wounds * damage) + mortal_wounds
-
-    return total_dead, total_raw_dmg
+    return resolve_profile(row, defender, assume_half_range)
 
 def resolve_weapon_profile(attacker, defender, assume_half_range=False):
     """
     Wrapper function for MCP server compatibility.
     Takes attacker dict and defender dict, returns results dict.
 
+    Runs on the scalar kernel path, so no pandas objects are built.
+
     Args:
         attacker: Dict with keys like 'Pts', 'A', 'BS', 'S', 'AP', 'D',
                   'Sustained', 'Lethal', 'Dev', 'RR_H', 'RR_W'
+                  (or a WeaponProfile from kernel.compile_weapon())
         defender: Target profile dict from targets.py
         assume_half_range: If False, apply stealth modifier to hit rolls (default False)
 
     Returns:
         Dict with 'dead_models' and 'total_damage'
     """
-    # Convert attacker dict to a pandas Series to match resolve_single_row expectations
-    import pandas as pd
-    attacker_series = pd.Series(attacker)
+    dead_models, total_damage = resolve_profile(attacker, defender, assume_half_range)
 
-    # Call the core calculator
-    dead_models, total_damage = resolve_single_row(attacker_series, defender, assume_half_range)
-
-    # Return as dict for MCP server
     return {
         'dead_models': dead_models,
         'total_damage': total_damage
     }
 
+def resolve_weapon_profiles(attackers, defender, assume_half_range=False):
+    """
+    Batched resolve_weapon_profile(): many attackers against one defender.
+    The defender is parsed once and shared by every attacker.
+
+    Args:
+        attackers: List of attacker dicts (or WeaponProfile objects)
+        defender: Target profile dict from targets.py
+        assume_half_range: If False, apply stealth modifier to hit rolls (default False)
+
+    Returns:
+        List of dicts with 'dead_models' and 'total_damage', in attacker order
+    """
+    target = compile_target(defender)
+    results = []
+    for attacker in attackers:
+        dead_models, total_damage = resolve_weapon(compile_weapon(attacker), target, assume_half_range)
+        results.append({'dead_models': dead_models, 'total_damage': total_damage})
+    return results
+
 # --- MAIN AGGREGATOR ---
 
-def calculate_group_metrics(df, target_profile, deduplicate=True, assume_half_range=False):
+def _melta_bonus(val):
     """
-    Calculates metrics with "Profile ID" Optimization & Correct Point Scoring.
+    Parses a Melta value: 'Y' (legacy = +1) or a number like 2 or '4'.
+    Returns the flat damage bonus at half range, or None if the weapon has no Melta.
+    """
+    if pd.isna(val): return None
+    text = str(val).upper().strip()
+    if text in ('N', '', '0'): return None
+    if text == 'Y': return 1
+    try:
+        bonus = int(float(text))
+    except ValueError:
+        return 1  # Unknown value: default to +1 flat damage
+    return bonus if bonus > 0 else None
+
+def _rapid_fire_bonus(val):
+    """
+    Parses a Rapid Fire value: 'Y' (legacy = double attacks) or a number like 1 or '2'.
+    Returns RAPID_FIRE_DOUBLE, the bonus attacks at half range, or None if absent.
+    """
+    if pd.isna(val): return None
+    text = str(val).upper().strip()
+    if text in ('N', '', '0'): return None
+    if text == 'Y': return RAPID_FIRE_DOUBLE
+    try:
+        bonus = int(float(text))
+    except ValueError:
+        return 0
+    return bonus if bonus > 0 else None
+
+# Legacy 'Y' Rapid Fire doubles the attack characteristic instead of adding X
+RAPID_FIRE_DOUBLE = 'double'
+
+def _with_attack_bonus(spec, bonus):
+    if spec is None or bonus is None: return spec
+    if bonus == RAPID_FIRE_DOUBLE: return spec.scaled(2)
+    return spec.offset(bonus)
+
+def _with_damage_bonus(spec, bonus):
+    if spec is None or bonus is None: return spec
+    return spec.offset(bonus)
+
+def prepare_roster(df, assume_half_range=False):
+    """
+    Sanitizes a roster and expands Melta/Rapid Fire weapons into their
+    range variant. The result does not depend on the target, so it can be
+    computed once and evaluated against any number of target profiles.
+
+    Parsed attack and damage dice are stored as DiceSpecs in the hidden
+    '__attack_spec__' / '__damage_spec__' columns. Range bonuses are applied
+    to those specs as numeric offsets; the 'A' and 'D' strings are untouched.
 
     Parameters:
     - df: DataFrame with weapon data
-    - target_profile: Target stats dict
-    - deduplicate: Whether to apply Profile ID optimization (default True)
     - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+
+    Returns:
+    - Expanded copy of df, ready for compile_weapons()
     """
-    if df.empty:
-        return []
+    # --- RANGE-DEPENDENT WEAPONS (Melta, Rapid Fire) ---
+    melta = map_unique(column_or_default(df, 'Melta', 'N'), _melta_bonus, dtype=object)
+    rapid_fire = map_unique(column_or_default(df, 'RapidFire', 'N'), _rapid_fire_bonus, dtype=object)
+    is_range = (melta != None) | (rapid_fire != None)  # noqa: E711 (elementwise)
 
-    # --- 1. PRE-CALCULATE DAMAGE ---
-    temp_df = df.copy()
+    # Range variants go after the normal rows (one take = one copy of the roster)
+    order = np.concatenate([np.flatnonzero(~is_range), np.flatnonzero(is_range)])
+    temp_df = df.take(order).reset_index(drop=True)
+    melta, rapid_fire, is_range = melta[order], rapid_fire[order], is_range[order]
 
     # Sanitize
     if 'Qty' not in temp_df.columns: temp_df['Qty'] = 1
@@ -301,172 +191,143 @@ def calculate_group_metrics(df, target_profile, deduplicate=True, assume_half_ra
     if 'UnitID' not in temp_df.columns: temp_df['UnitID'] = ''
     if 'Loadout Group' not in temp_df.columns: temp_df['Loadout Group'] = 'Standard'
 
-    # --- RANGE-DEPENDENT WEAPONS (Melta, Rapid Fire) ---
-    # Duplicate rows for weapons with range-dependent rules
-    range_variants = []
-    rows_to_remove = []
-
-    for idx, row in temp_df.iterrows():
-        # Parse Melta value: 'Y' (legacy) or number like '2' or '4'
-        melta_val = str(row.get('Melta', 'N')).upper()
-        has_melta = melta_val not in ['N', '', '0']
-        melta_damage = 1  # Default to +1 flat damage for legacy 'Y' or '1'
-        if has_melta and melta_val.isdigit():
-            melta_damage = int(melta_val)
-        elif has_melta and melta_val == 'Y':
-            melta_damage = 1  # Legacy support: Melta Y = +1 damage
-
-        # Parse Rapid Fire value: 'Y' (legacy = double) or number like '1' or '2'
-        rapid_fire_val = str(row.get('RapidFire', 'N')).upper()
-        has_rapid_fire = rapid_fire_val not in ['N', '', '0']
-        rapid_fire_bonus = 0
-        if has_rapid_fire and rapid_fire_val.isdigit():
-            rapid_fire_bonus = int(rapid_fire_val)
-        elif has_rapid_fire and rapid_fire_val == 'Y':
-            # Legacy 'Y' means double attacks (add 100% of base attacks)
-            rapid_fire_bonus = None  # Will double attacks instead
-
-        if has_melta or has_rapid_fire:
-            # Preserve user's Profile ID if they set one, otherwise use 'Range'
-            # This ensures range variants compete with user-defined modes (e.g., Flamer vs Melta)
-            original_profile_id = row.get('Profile ID', '')
-            if not original_profile_id or original_profile_id == '':
-                profile_id_to_use = 'Range'
-            else:
-                profile_id_to_use = original_profile_id
-
-            # Create appropriate variant based on assume_half_range setting
-            if not assume_half_range:
-                # Create FAR variant (no bonuses) - weapons NOT at half range
-                far_row = row.copy()
-                far_row['Weapon'] = row['Weapon']
-                far_row['Profile ID'] = profile_id_to_use
-                # Clear the Melta/RapidFire flags to prevent recursion
-                far_row['Melta'] = 'N'
-                far_row['RapidFire'] = 'N'
-                range_variants.append(far_row)
-                rows_to_remove.append(idx)
-            else:
-                # Create CLOSE variant (with bonuses) - weapons AT half range
-                close_row = row.copy()
-                close_row['Weapon'] = row['Weapon']
-                close_row['Profile ID'] = profile_id_to_use
-                # Clear the flags to prevent recursion
-                close_row['Melta'] = 'N'
-                close_row['RapidFire'] = 'N'
-
-                # Apply Rapid Fire bonus: Add extra attacks at half range
-                if has_rapid_fire:
-                    current_attacks = str(close_row.get('A', '1'))
-    
-                    if rapid_fire_bonus is None:
-                        # Legacy 'Y' mode: double attacks
-                        if 'D6' in current_attacks.upper():
-                            # Handle dice notation
-                            if '+' in current_attacks:
-                                parts = current_attacks.split('+')
-                                dice_part = parts[0].upper()
-                                flat = int(parts[1])
-                                if dice_part == 'D6':
-                                    close_row['A'] = f'2D6+{flat * 2}'
-                                elif dice_part.endswith('D6'):
-                                    num = int(dice_part.replace('D6', ''))
-                                    close_row['A'] = f'{num * 2}D6+{flat * 2}'
-                            else:
-                                if current_attacks.upper() == 'D6':
-                                    close_row['A'] = '2D6'
-                                elif current_attacks.upper().endswith('D6'):
-                                    num = int(current_attacks.upper().replace('D6', ''))
-                                    close_row['A'] = f'{num * 2}D6'
-                        else:
-                            # Fixed attacks - just double
-                            try:
-                                attacks = int(current_attacks)
-                                close_row['A'] = str(attacks * 2)
-                            except:
-                                close_row['A'] = current_attacks
-                    else:
-                        # New numeric mode: add specific bonus attacks
-                        if 'D6' in current_attacks.upper():
-                            # Handle dice notation
-                            if '+' in current_attacks:
-                                parts = current_attacks.split('+')
-                                dice_part = parts[0].upper()
-                                flat = int(parts[1])
-                                close_row['A'] = f'{dice_part}+{flat + rapid_fire_bonus}'
-                            else:
-                                # Just dice, add flat bonus
-                                close_row['A'] = f'{current_attacks}+{rapid_fire_bonus}'
-                        else:
-                            # Fixed attacks - add bonus
-                            try:
-                                attacks = int(current_attacks)
-                                close_row['A'] = str(attacks + rapid_fire_bonus)
-                            except:
-                                close_row['A'] = f'{current_attacks}+{rapid_fire_bonus}'
-    
-                # Apply Melta bonus: Add X flat damage at half range
-                if has_melta:
-                    current_damage = str(close_row.get('D', '1'))
-                    # Add flat damage (where melta_damage = flat damage to add)
-                    if 'D6' in current_damage.upper():
-                        if '+' in current_damage:
-                            parts = current_damage.split('+')
-                            dice_part = parts[0].upper()
-                            flat = int(parts[1])
-                            # Add melta_damage to the flat portion
-                            close_row['D'] = f'{dice_part}+{flat + melta_damage}'
-                        else:
-                            # Just dice, add flat damage
-                            close_row['D'] = f'{current_damage}+{melta_damage}'
-                    else:
-                        # Fixed damage - add flat melta damage
-                        try:
-                            dmg = int(current_damage)
-                            close_row['D'] = str(dmg + melta_damage)
-                        except:
-                            close_row['D'] = f'{current_damage}+{melta_damage}'
-    
-                range_variants.append(close_row)
-                rows_to_remove.append(idx)
+    attack_specs = map_unique(column_or_default(temp_df, 'A', 0), compile_dice, dtype=object)
+    damage_specs = map_unique(column_or_default(temp_df, 'D', 1), compile_dice, dtype=object)
 
-    # Remove original rows that were split
-    if rows_to_remove:
-        temp_df = temp_df.drop(rows_to_remove)
+    if is_range.any():
+        # Preserve user's Profile ID if they set one, otherwise use 'Range'
+        # This ensures range variants compete with user-defined modes (e.g., Flamer vs Melta)
+        profile_ids = temp_df['Profile ID'].to_numpy(dtype=object)
+        temp_df['Profile ID'] = np.where(is_range & (profile_ids == ''), 'Range', profile_ids)
 
-    # Add range variants
-    if range_variants:
-        temp_df = pd.concat([temp_df, pd.DataFrame(range_variants)], ignore_index=True)
+        # Clear the Melta/RapidFire flags so the roster is not expanded twice
+        for col in ('Melta', 'RapidFire'):
+            if col in temp_df.columns:
+                temp_df[col] = np.where(is_range, 'N', temp_df[col].to_numpy(dtype=object))
 
-    # Run Math
-    metrics = temp_df.apply(lambda row: resolve_single_row(row, target_profile, assume_half_range), axis=1, result_type='expand')
-    temp_df['row_kills'] = metrics[0]
-    temp_df['row_damage'] = metrics[1]
-    
-    # --- 2. RESOLUTION PHASE (Optimization) ---
-    mask_exclusive = temp_df['Profile ID'] != ''
-    df_cumulative = temp_df[~mask_exclusive].copy()
-    df_exclusive = temp_df[mask_exclusive].copy()
-    
-    if not df_exclusive.empty:
-        # Sort by Kills (primary) then Damage (secondary)
-        df_exclusive = df_exclusive.sort_values(
-            by=['row_kills', 'row_damage'], 
-            ascending=[False, False]
-        )
-        # Identify Winners
-        winners = df_exclusive.drop_duplicates(subset=['Name', 'Pts', 'Profile ID'])
-        winning_keys = set(zip(winners['Name'], winners['Pts'], winners['Profile ID'], winners['Weapon']))
-        
-        # Filter
-        df_exclusive_resolved = df_exclusive[
-            df_exclusive.apply(lambda x: (x['Name'], x['Pts'], x['Profile ID'], x['Weapon']) in winning_keys, axis=1)
-        ]
-    else:
-        df_exclusive_resolved = pd.DataFrame()
+        if assume_half_range:
+            # CLOSE variant: Rapid Fire adds attacks, Melta adds flat damage
+            attack_specs = map_unique_pairs(attack_specs, rapid_fire, _with_attack_bonus)
+            damage_specs = map_unique_pairs(damage_specs, melta, _with_damage_bonus)
+        # FAR variant (not at half range): no bonuses
+
+    temp_df['__attack_spec__'] = attack_specs
+    temp_df['__damage_spec__'] = damage_specs
+
+    return temp_df
+
+# Columns that make two active rows the same profile when deduplicating
+# (A / D are compared as parsed dice when prepare_roster() added them)
+PROFILE_COLUMNS = ['Name', 'Weapon', 'A', 'BS', 'S', 'AP', 'D', 'Pts', 'Keywords', 'Loadout Group']
+
+
+def _key_codes(temp_df, cols):
+    """int64 code per row for its combination of cols values (NaN is a value, as in drop_duplicates)."""
+    codes = np.zeros(len(temp_df), dtype=np.int64)
+    for col in cols:
+        col_codes, uniques = pd.factorize(temp_df[col], use_na_sentinel=False)
+        # Re-factorize so the combined codes stay below len(temp_df)
+        codes = pd.factorize(codes * len(uniques) + col_codes)[0]
+    return codes
+
+
+def unit_codes(temp_df, deduplicate=True):
+    """
+    int64 result-group code per row of temp_df, numbered in the sorted order
+    summarize_units() reports units in (-1 for rows with a NaN key, which
+    belong to no unit).
+    """
+    group_cols = unit_group_columns(temp_df, deduplicate)
+    codes = temp_df.groupby(group_cols).ngroup().to_numpy()
+    missing = temp_df[group_cols].isna().any(axis=1).to_numpy()
+    return np.where(missing, -1, codes).astype(np.int64)
+
+
+def roster_codes(temp_df, deduplicate=True):
+    """
+    Integer codes for the keys resolve_active_rows() and summarize_units()
+    group a roster by. They depend only on the roster, so callers that
+    aggregate one roster against many targets compute them once (see
+    CompiledRoster.codes()).
+
+    Returns:
+    - dict of per-row arrays:
+        exclusive: True for Profile ID (mode) rows
+        name:      unit Name code
+        mode:      (Name, Pts, Profile ID) code
+        winner:    (Name, Pts, Profile ID, Weapon) code
+        profile:   PROFILE_COLUMNS code (deduplicate only)
+        unit:      unit_codes()
+    """
+    codes = {
+        'exclusive': (temp_df['Profile ID'] != '').to_numpy(),
+        'name': pd.factorize(temp_df['Name'], use_na_sentinel=False)[0],
+        'mode': _key_codes(temp_df, ['Name', 'Pts', 'Profile ID']),
+        'winner': _key_codes(temp_df, ['Name', 'Pts', 'Profile ID', 'Weapon']),
+        'unit': unit_codes(temp_df, deduplicate),
+    }
+    if deduplicate:
+        subset_cols = PROFILE_COLUMNS
+        # Compare parsed dice (including range bonuses) rather than the raw A/D strings
+        if '__attack_spec__' in temp_df.columns:
+            subset_cols = [{'A': '__attack_spec__', 'D': '__damage_spec__'}.get(c, c) for c in subset_cols]
+        codes['profile'] = _key_codes(temp_df, [c for c in subset_cols if c in temp_df.columns])
+    return codes
+
+
+def subset_codes(codes, mask):
+    """roster_codes() for the rows of temp_df[mask] (unit codes keep their relative order)."""
+    return {key: col[mask] for key, col in codes.items()}
+
+
+def _active_rows(codes, row_kills, row_damage, deduplicate):
+    """Positions of the rows resolve_active_rows() keeps, in its output order."""
+    exclusive = codes['exclusive']
+    cumulative = np.flatnonzero(~exclusive)
+    modes = np.flatnonzero(exclusive)
+
+    if len(modes):
+        # Sort by Kills (primary) then Damage (secondary), best first; ties keep roster order
+        modes = modes[np.lexsort((-row_damage[modes], -row_kills[modes]))]
+        # Winners: first row of each mode group after the sort
+        _, first = np.unique(codes['mode'][modes], return_index=True)
+        # Keep every row of the winning weapon
+        modes = modes[np.isin(codes['winner'][modes], codes['winner'][modes[first]])]
+
+    rows = np.concatenate([cumulative, modes])
+    if deduplicate:
+        # Deduplication (Table View): first row of each profile
+        _, first = np.unique(codes['profile'][rows], return_index=True)
+        rows = rows[np.sort(first)]
+    return rows
+
+
+def resolve_active_rows(temp_df, row_kills, row_damage, deduplicate=True, codes=None):
+    """
+    Picks the winning Profile ID modes and drops duplicate profiles.
+
+    Parameters:
+    - temp_df: Roster from prepare_roster()
+    - row_kills, row_damage: Per-row results for this target (same order as temp_df)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - codes: roster_codes(temp_df, deduplicate), if the caller has them
 
-    # Recombine
-    work_df = pd.concat([df_cumulative, df_exclusive_resolved], ignore_index=True)
+    Returns:
+    - DataFrame of the rows that count towards each unit, with
+      final_kills / final_damage columns (Qty applied when not deduplicating)
+      and their __unit__ code
+    """
+    if codes is None:
+        codes = roster_codes(temp_df, deduplicate)
+    row_kills = np.asarray(row_kills, dtype=float)
+    row_damage = np.asarray(row_damage, dtype=float)
+
+    # --- 2. RESOLUTION PHASE (Optimization) ---
+    rows = _active_rows(codes, row_kills, row_damage, deduplicate)
+    work_df = temp_df.iloc[rows].reset_index(drop=True)
+    work_df['row_kills'] = row_kills[rows]
+    work_df['row_damage'] = row_damage[rows]
+    work_df['__unit__'] = codes['unit'][rows]
 
     # --- 3. AGGREGATION PHASE (The Fix) ---
 
@@ -479,39 +340,94 @@ def calculate_group_metrics(df, target_profile, deduplicate=True, assume_half_ra
         work_df['final_kills'] = work_df['row_kills']
         work_df['final_damage'] = work_df['row_damage']
 
-    # Deduplication (Table View)
-    if deduplicate:
-        subset_cols = ['Name', 'Weapon', 'A', 'BS', 'S', 'AP', 'D', 'Pts', 'Keywords', 'Loadout Group']
-        valid_subset = [c for c in subset_cols if c in work_df.columns]
-        work_df = work_df.drop_duplicates(subset=valid_subset)
+    return work_df
+
+# Result columns a caller can select with metrics= ('Weapon' is the active
+# Profile ID modes label). Unit keys, Qty, Pts and Profile ID are always returned.
+RESULT_METRICS = ('Weapon', 'Kills', 'Damage', 'CPK', 'TTK', 'CPK_Grade')
+
+
+def select_metrics(metrics=None):
+    """
+    Validates a metrics= selector.
 
-    # Grouping Config
+    Parameters:
+    - metrics: Iterable of RESULT_METRICS names, a single name, or None (all)
+
+    Returns:
+    - frozenset of selected names
+    """
+    if metrics is None:
+        return frozenset(RESULT_METRICS)
+    selected = frozenset([metrics] if isinstance(metrics, str) else metrics)
+    unknown = selected.difference(RESULT_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)} (expected any of {list(RESULT_METRICS)})")
+    return selected
+
+
+def trim_results(results, metrics=None):
+    """Copies of result dicts without the RESULT_METRICS columns metrics did not select."""
+    skipped = set(RESULT_METRICS) - select_metrics(metrics)
+    return [{k: v for k, v in r.items() if k not in skipped} for r in results]
+
+
+def unit_group_columns(work_df, deduplicate=True):
+    """Returns the columns that identify a unit in the results table."""
     group_cols = ['UnitID', 'Name', 'Loadout Group']
     if 'Qty' in work_df.columns and not deduplicate:
          group_cols.append('Qty')
 
-    valid_group_cols = [c for c in group_cols if c in work_df.columns]
+    return [c for c in group_cols if c in work_df.columns]
+
+def summarize_units(work_df, target_profile, deduplicate=True, metrics=None):
+    """
+    Aggregates the active rows from resolve_active_rows() into unit metrics.
+
+    Parameters:
+    - work_df: Active rows from resolve_active_rows() (grouped by __unit__ code)
+    - target_profile: Target stats dict (for Pts and UnitSize)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - metrics: RESULT_METRICS to compute (default: all); sums, mode labels
+               and grades nobody asked for are skipped
+    """
+    metrics = select_metrics(metrics)
+    scored = not metrics.isdisjoint(('CPK', 'TTK', 'CPK_Grade'))
+    valid_group_cols = unit_group_columns(work_df, deduplicate)
+
+    # Group on the integer unit codes (rows with a NaN key have none)
+    if '__unit__' in work_df.columns:
+        unit = work_df['__unit__'].to_numpy()
+    else:
+        unit = unit_codes(work_df, deduplicate)
+    keep = unit >= 0
+    if not keep.all():
+        work_df, unit = work_df[keep], unit[keep]
 
     # --- POINTS AGGREGATION FIX ---
     # We aggregate Pts using 'max' to avoid double-counting multi-profile units.
     # e.g. Karnivore (Strike) 140pts + Karnivore (Sweep) 140pts -> MAX is 140pts.
 
     agg_funcs = {
-        'final_kills': 'sum',
-        'final_damage': 'sum',
         'Pts': 'max',  # <--- CRITICAL FIX: Take MAX cost of the rows in this unit
-        'Weapon': lambda x: ", ".join(sorted(set(
-            work_df.loc[x.index, 'Weapon'][work_df.loc[x.index, 'Profile ID'] != '']
-        )))
     }
+    if 'Kills' in metrics or scored:
+        agg_funcs['final_kills'] = 'sum'
+    if 'Damage' in metrics:
+        agg_funcs['final_damage'] = 'sum'
+    grouped = work_df[list(agg_funcs)].groupby(unit).agg(agg_funcs)
+
+    # Unit keys from each unit's first row (codes are in sorted key order)
+    _, first, rank = np.unique(unit, return_index=True, return_inverse=True)
+    keys = work_df[valid_group_cols].iloc[first]
+    grouped = pd.concat([keys.reset_index(drop=True), grouped.reset_index(drop=True)], axis=1)
 
-    grouped = work_df.groupby(valid_group_cols).agg(agg_funcs).reset_index()
+    if 'Weapon' in metrics:
+        grouped['Weapon'] = _mode_labels(work_df, rank, len(grouped))
 
     results = []
-    target_pts = target_profile.get('Pts', 1)
-    target_size = target_profile.get('UnitSize', 10)
 
-    for _, row in grouped.iterrows():
+    for row in grouped.to_dict('records'):
         # Cost Calculation
         unit_cost = float(row['Pts'])
         qty = row.get('Qty', 1) if not deduplicate else 1
@@ -519,32 +435,123 @@ def calculate_group_metrics(df, target_profile, deduplicate=True, assume_half_ra
         # Total Cost = Unit Cost * Qty
         # (Since we used 'max' above, unit_cost is the cost of ONE model)
         total_cost_basis = unit_cost * qty
-        
-        total_kills = row['final_kills']
-        total_dmg = row['final_damage']
-        active_modes = row['Weapon']
-        
-        kv_points = total_kills * target_pts
-        
-        # CPK = Total Points Spent / Total Points Killed
-        cpk = total_cost_basis / kv_points if kv_points > 0 else 999.0 
-        ttk = target_size / total_kills if total_kills > 0 else 999.0
 
-        # Get letter grade for CPK
-        grade = get_cpk_grade(cpk)
-
-        results.append({
+        result = {
             'UnitID': row.get('UnitID', ''),
             'Name': row['Name'],
-            'Weapon': active_modes,
-            'Qty': qty,
-            'Pts': int(unit_cost),
-            'Kills': total_kills,
-            'Damage': total_dmg,
-            'CPK': cpk,
-            'TTK': ttk,
-            'CPK_Grade': grade,
-            'Profile ID': None
-        })
-
-    return results
\ No newline at end of file
+            'Loadout Group': row.get('Loadout Group', 'Standard'),
+        }
+        if 'Weapon' in metrics:
+            result['Weapon'] = row['Weapon']
+        result['Qty'] = qty
+        result['Pts'] = int(unit_cost)
+        if 'Kills' in metrics:
+            result['Kills'] = row['final_kills']
+        if 'Damage' in metrics:
+            result['Damage'] = row['final_damage']
+
+        if scored:
+            cpk, ttk = score_kills(row['final_kills'], total_cost_basis, target_profile)
+            if 'CPK' in metrics:
+                result['CPK'] = cpk
+            if 'TTK' in metrics:
+                result['TTK'] = ttk
+            if 'CPK_Grade' in metrics:
+                # Get letter grade for CPK
+                result['CPK_Grade'] = get_cpk_grade(cpk)
+
+        result['Profile ID'] = None
+        results.append(result)
+
+    return results
+
+def _mode_labels(work_df, rank, n_units):
+    """
+    Active-mode label per unit (rank: unit position of each row; '' for units without Profile ID modes).
+    """
+    # Only Profile ID rows name a mode. Code the distinct (unit, weapon)
+    # pairs with weapons in sorted order, so the sorted pair codes run by
+    # unit then weapon, and join each unit's run of weapon names.
+    modes = ((work_df['Profile ID'] != '') & work_df['Weapon'].notna()).to_numpy()
+    weapon_codes, weapons = pd.factorize(work_df['Weapon'].to_numpy()[modes], sort=True)
+    n_weapons = max(len(weapons), 1)
+    pairs = np.unique(rank[modes] * n_weapons + weapon_codes)
+    unit_pos = pairs // n_weapons
+    weapons = np.asarray(weapons, dtype=object)[pairs % n_weapons]
+    starts = np.flatnonzero(np.diff(unit_pos, prepend=-1))
+
+    labels = np.full(n_units, '', dtype=object)
+    if len(starts):
+        labels[unit_pos[starts]] = [', '.join(run) for run in np.split(weapons, starts[1:])]
+    return labels
+
+def score_kills(total_kills, total_cost_basis, target_profile):
+    """
+    Returns (CPK, TTK) for a unit's kills against a target.
+
+    CPK = Total Points Spent / Total Points Killed; both are 999.0 with no kills.
+    """
+    target_pts = target_profile.get('Pts', 1)
+    target_size = target_profile.get('UnitSize', 10)
+
+    kv_points = total_kills * target_pts
+    
+    cpk = total_cost_basis / kv_points if kv_points > 0 else 999.0 
+    ttk = target_size / total_kills if total_kills > 0 else 999.0
+    return cpk, ttk
+
+def aggregate_unit_metrics(temp_df, row_kills, row_damage, target_profile, deduplicate=True, metrics=None,
+                           codes=None):
+    """
+    Resolves Profile ID modes and aggregates per-row results into unit metrics.
+
+    Parameters:
+    - temp_df: Roster from prepare_roster()
+    - row_kills, row_damage: Per-row results for this target (same order as temp_df)
+    - target_profile: Target stats dict (for Pts and UnitSize)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - metrics: RESULT_METRICS to compute (default: all)
+    - codes: roster_codes(temp_df, deduplicate), if the caller has them
+    """
+    work_df = resolve_active_rows(temp_df, row_kills, row_damage, deduplicate, codes)
+    return summarize_units(work_df, target_profile, deduplicate, metrics)
+
+def calculate_group_metrics(df, target_profile, deduplicate=True, assume_half_range=False, allocation='average',
+                            metrics=None):
+    """
+    Calculates metrics with "Profile ID" Optimization & Correct Point Scoring.
+
+    Parameters:
+    - df: DataFrame with weapon data (or a CompiledRoster, see roster.py)
+    - target_profile: Target stats dict
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+    - allocation: 'average' spreads each wound as min(1, D/W) kills (default);
+                  'exact' allocates damage model by model (see allocation.py)
+    - metrics: RESULT_METRICS to return, e.g. ['Kills'] (default: all). Unit
+               keys, Qty, Pts and Profile ID are always included.
+    """
+    metrics = select_metrics(metrics)
+    if df.empty:
+        return []
+
+    if allocation != 'average':
+        from .distributions import calculate_group_distributions
+        results = calculate_group_distributions(df, target_profile, deduplicate, assume_half_range, allocation)
+        for r in results:
+            del r['Distribution']
+        return trim_results(results, metrics)
+
+    # --- 1. PRE-CALCULATE DAMAGE ---
+    # Parsed once per roster content and reused across calls (see roster.py)
+    from .roster import compile_roster
+    roster = compile_roster(df)
+    temp_df = roster.prepared(assume_half_range)
+
+    # Run Math (vectorized - see kernel.py; each distinct profile is resolved once)
+    row_kills, row_damage = resolve_unique_weapons(
+        roster.weapons(assume_half_range), compile_target(target_profile), assume_half_range
+    )
+
+    return aggregate_unit_metrics(temp_df, row_kills, row_damage, target_profile, deduplicate, metrics,
+                                  roster.codes(assume_half_range, deduplicate))
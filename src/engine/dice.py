@@ -0,0 +1,202 @@
+# src/engine/dice.py
+
+"""
+Dice Expression Compiler
+
+One grammar for every dice characteristic in the app:
+
+    NdX+M   e.g. 'D6', '2D6', 'D6+2', '2D3+1', 'd6-1', '3', '2.5'
+
+Expressions compile to an immutable, hashable DiceSpec that knows its
+mean, minimum, maximum and full probability distribution. Compiled specs
+are memoized in a bounded LRU cache, so the same 'D6+2' seen thousands of
+times per request is parsed once.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+# Maximum number of distinct expressions kept in each parse cache
+CACHE_SIZE = 4096
+
+_DICE_RE = re.compile(r'^(\d*)D(\d+)(?:([+-])(\d+(?:\.\d+)?))?$')
+_INT_RE = re.compile(r'-?\d+')
+
+
+@dataclass(frozen=True)
+class DiceSpec:
+    """
+    Compiled dice expression: count dice of `faces` sides plus a flat modifier.
+
+    Fixed values (no dice) have count=0 and faces=0.
+    """
+    count: int
+    faces: int
+    modifier: float = 0
+
+    @property
+    def is_fixed(self):
+        return self.count == 0
+
+    @property
+    def mean(self):
+        return self.count * (self.faces + 1) / 2.0 + self.modifier
+
+    @property
+    def min(self):
+        return self.count + self.modifier
+
+    @property
+    def max(self):
+        return self.count * self.faces + self.modifier
+
+    @cached_property
+    def distribution(self):
+        """
+        Returns (values, probabilities) as read-only NumPy arrays covering
+        every possible total from min to max.
+        """
+        probs = np.ones(1)
+        face_probs = np.full(self.faces, 1.0 / self.faces) if self.faces else None
+        for _ in range(self.count):
+            probs = np.convolve(probs, face_probs)
+
+        values = np.arange(len(probs)) + self.min
+        values.setflags(write=False)
+        probs.setflags(write=False)
+        return values, probs
+
+    @cached_property
+    def pmf(self):
+        """
+        Returns a read-only array where pmf[v] = P(total == v) for v in 0..max.
+        Totals below zero are clamped to zero. Only defined for whole-number
+        modifiers.
+        """
+        values, probs = self.distribution
+        totals = np.maximum(values, 0).astype(int)
+        pmf = np.bincount(totals, weights=probs, minlength=int(max(self.max, 0)) + 1)
+        pmf.setflags(write=False)
+        return pmf
+
+    def offset(self, flat):
+        """Returns a new spec with `flat` added to the modifier (e.g. Melta, Rapid Fire X)."""
+        return compile_spec(self.count, self.faces, self.modifier + flat)
+
+    def scaled(self, factor):
+        """Returns a new spec with dice count and modifier multiplied (legacy Rapid Fire doubling)."""
+        return compile_spec(self.count * factor, self.faces, self.modifier * factor)
+
+    def to_dict(self):
+        """Returns the legacy {'count', 'faces', 'modifier', 'is_fixed'} dict."""
+        if self.is_fixed:
+            return {'count': 0, 'faces': 0, 'modifier': float(self.modifier), 'is_fixed': True}
+        return {'count': self.count, 'faces': self.faces, 'modifier': self.modifier, 'is_fixed': False}
+
+    def __str__(self):
+        flat = format_number(self.modifier)
+        if self.is_fixed:
+            return flat
+        dice = f"{self.count if self.count > 1 else ''}D{self.faces}"
+        if self.modifier > 0:
+            return f"{dice}+{flat}"
+        if self.modifier < 0:
+            return f"{dice}{flat}"
+        return dice
+
+
+def format_number(value):
+    """Formats 3.0 as '3' and 2.5 as '2.5'."""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_spec(count, faces, modifier):
+    """Interns a DiceSpec so equal specs share one object (and its distribution)."""
+    if isinstance(modifier, float) and modifier.is_integer():
+        modifier = int(modifier)
+    if count == 0 or faces == 0:
+        return DiceSpec(0, 0, modifier)
+    return DiceSpec(count, faces, modifier)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile_text(text):
+    text = text.upper().replace(' ', '')
+    if not text:
+        return None
+
+    if 'D' not in text:
+        try:
+            value = float(text)
+        except ValueError:
+            return None
+        if not math.isfinite(value):
+            return None
+        return compile_spec(0, 0, value)
+
+    match = _DICE_RE.match(text)
+    if not match:
+        return None
+
+    count_str, faces_str, sign, flat_str = match.groups()
+    count = int(count_str) if count_str else 1
+    faces = int(faces_str)
+    flat = float(flat_str) if flat_str else 0
+    if sign == '-':
+        flat = -flat
+    if faces <= 0:
+        return None
+    return compile_spec(count, faces, flat)
+
+
+def compile_dice(val):
+    """
+    Compiles a dice characteristic ('D6+2', '2D3', 4, '3.5') into a DiceSpec.
+
+    Args:
+        val: Raw characteristic (str, int, float, or NaN)
+
+    Returns:
+        DiceSpec, or None if val is blank or not a dice expression
+    """
+    if val is None or (isinstance(val, float) and math.isnan(val)):
+        return None
+    return _compile_text(str(val))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _first_int(text):
+    match = _INT_RE.search(text)
+    return int(match.group()) if match else None
+
+
+def parse_int(val, default=0):
+    """
+    Extracts the first integer from a stat value ('3+' -> 3, '-1' -> -1).
+
+    Args:
+        val: Raw stat value
+        default: Returned for blank or non-numeric values
+
+    Returns:
+        int
+    """
+    if type(val) is int:
+        return val
+    if val is None or val == '' or (isinstance(val, float) and math.isnan(val)):
+        return default
+    result = _first_int(str(val))
+    return default if result is None else result
+
+
+def cache_info():
+    """Returns LRU statistics for the expression and integer caches."""
+    return {
+        'dice': _compile_text.cache_info(),
+        'int': _first_int.cache_info(),
+    }
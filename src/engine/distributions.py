@@ -0,0 +1,390 @@
+# src/engine/distributions.py
+
+"""
+Exact Kill / Damage Distributions
+
+The kernel only returns expected values. This module builds the full
+probability mass function of damage dealt and models killed, so callers
+can ask "what is the chance to wipe the unit?" or "P(kills >= 3)".
+
+Each attack is a small outcome distribution (miss / hit / critical hit ->
+wound rolls -> saves -> per-point Feel No Pain -> variable damage). Attacks
+are combined with FFT convolution for damage, and with a Markov chain over
+(models killed, wounds on the current model) for kills, so damage carries
+over correctly between models: normal wounds never spill, mortal wounds
+(Devastating Wounds) do.
+
+Per-roll odds come from kernel.stage_probabilities(), so mean damage always
+matches the expected-value engine. Weapon outcomes are cached per
+(weapon profile, target) key; the allocation tables they are built from
+come from allocation.py.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from .allocation import allocation_table, kills_pmf, start_state
+from .calculator import resolve_active_rows, score_kills, summarize_units
+from .dice import DiceSpec, compile_spec
+from .grading import get_cpk_grade
+from .kernel import compile_weapons, compile_target, resolve_unique_weapons, stage_probabilities
+
+# Maximum number of (weapon profile, target) outcomes kept in the cache
+CACHE_SIZE = 4096
+
+_POINT_ZERO = np.ones(1)
+
+
+def _freeze(arr):
+    arr.setflags(write=False)
+    return arr
+
+
+def _mix(*weighted):
+    """Returns sum(w * pmf) over (w, pmf) pairs, padding to the longest pmf."""
+    size = max(len(pmf) for _, pmf in weighted)
+    out = np.zeros(size)
+    for w, pmf in weighted:
+        out[:len(pmf)] += w * pmf
+    return out
+
+
+def _power(pmf, n):
+    out = _POINT_ZERO
+    for _ in range(n):
+        out = np.convolve(out, pmf)
+    return out
+
+
+def _sum_of_random_count(count_pmf, pmf):
+    """
+    PMF of X_1 + ... + X_N where N ~ count_pmf and X_i ~ pmf (i.i.d.).
+
+    Uses the generating function sum_n P(N=n) * F^n evaluated with one FFT.
+    """
+    max_n = len(count_pmf) - 1
+    size = max_n * (len(pmf) - 1) + 1
+    if size <= 1:
+        return _POINT_ZERO.copy()
+
+    n_fft = 1 << (size - 1).bit_length()
+    f = np.fft.rfft(pmf, n_fft)
+    total = np.zeros_like(f)
+    f_n = np.ones_like(f)
+    for p in count_pmf:
+        total += p * f_n
+        f_n = f_n * f
+
+    out = np.fft.irfft(total, n_fft)[:size]
+    out = np.clip(out, 0.0, None)
+    return out / out.sum()
+
+
+def _matrix_sum_of_powers(count_pmf, matrix):
+    """Returns sum_n P(N=n) * matrix^n."""
+    out = np.zeros_like(matrix)
+    power = np.eye(len(matrix))
+    for p in count_pmf:
+        out += p * power
+        power = power @ matrix
+    return out
+
+
+class WeaponOutcome:
+    """
+    Outcome of one weapon profile firing at one target.
+
+    Attributes:
+        damage_pmf: damage_pmf[d] = P(total damage == d)
+        transition: State transition matrix over (kills, wounds on current model)
+        unit_size, model_w: Target shape the transition matrix was built for
+    """
+    __slots__ = ('damage_pmf', 'transition', 'unit_size', 'model_w')
+
+    def __init__(self, damage_pmf, transition, unit_size, model_w):
+        self.damage_pmf = damage_pmf
+        self.transition = transition
+        self.unit_size = unit_size
+        self.model_w = model_w
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def weapon_outcome(attack_spec, damage_spec, p_hit, p_crit_hit, p_wound, p_crit_wound,
+                   p_fail, p_fnp_fail, lethal, dev, sustained, unit_size, model_w):
+    """
+    Builds (and caches) the outcome of one weapon profile against one target.
+
+    The arguments are the per-roll odds from kernel.stage_probabilities()
+    plus the parsed dice, so every (weapon profile, target) pair that rolls
+    the same dice shares one entry.
+
+    Returns:
+        WeaponOutcome
+    """
+    count_pmf = attack_spec.pmf if attack_spec is not None else _POINT_ZERO
+    table = allocation_table(damage_spec, model_w, p_fnp_fail, unit_size)
+    damage = table.damage_pmf
+
+    # Per-attack categories: (probability, auto-wounds, wound rolls)
+    if lethal:
+        categories = [(p_crit_hit, 1, sustained), (max(0.0, p_hit - p_crit_hit), 0, 1)]
+    else:
+        categories = [
+            (min(p_crit_hit, p_hit), 0, 1 + sustained),
+            (max(0.0, p_crit_hit - p_hit), 0, sustained),
+            (max(0.0, p_hit - p_crit_hit), 0, 1),
+        ]
+    categories = [c for c in categories if c[0] > 0]
+
+    # Per wound roll: mortal wounds (Dev) skip the save, normal wounds must fail it
+    p_mortal = p_crit_wound if dev else 0.0
+    p_normal = (p_wound - p_crit_wound if dev else p_wound) * p_fail
+
+    auto_pmf = _mix((1 - p_fail, _POINT_ZERO), (p_fail, damage))
+    roll_pmf = _mix((1 - p_normal - p_mortal, _POINT_ZERO), (p_normal + p_mortal, damage))
+
+    p_miss = 1.0 - sum(p for p, _, _ in categories)
+    attack_pmf = _mix((p_miss, _POINT_ZERO), *[
+        (p, np.convolve(_power(auto_pmf, autos), _power(roll_pmf, rolls)))
+        for p, autos, rolls in categories
+    ])
+    damage_pmf = _sum_of_random_count(count_pmf, attack_pmf)
+
+    # Kills: same events, allocated model by model
+    normal, mortal = table.normal, table.mortal
+    identity = np.eye(len(normal))
+
+    auto_step = (1 - p_fail) * identity + p_fail * normal
+    roll_step = (1 - p_normal - p_mortal) * identity + p_normal * normal + p_mortal * mortal
+
+    attack_step = p_miss * identity
+    for p, autos, rolls in categories:
+        attack_step = attack_step + p * (
+            np.linalg.matrix_power(auto_step, autos) @ np.linalg.matrix_power(roll_step, rolls)
+        )
+    transition = _matrix_sum_of_powers(count_pmf, attack_step)
+
+    return WeaponOutcome(_freeze(damage_pmf), _freeze(transition), unit_size, model_w)
+
+
+class OutcomeDistribution:
+    """
+    Joint result of one or more weapons firing at one target unit.
+
+    Attributes:
+        state: Probability of each (kills, wounds on current model) state,
+               with the last entry being 'unit wiped'
+        damage_pmf: damage_pmf[d] = P(total damage == d)
+        unit_size, model_w: Target shape
+    """
+
+    def __init__(self, state, damage_pmf, unit_size, model_w):
+        self.state = state
+        self.damage_pmf = damage_pmf
+        self.unit_size = unit_size
+        self.model_w = model_w
+
+    @classmethod
+    def start(cls, unit_size, model_w):
+        """No damage dealt yet."""
+        return cls(start_state(unit_size, model_w), _POINT_ZERO, unit_size, model_w)
+
+    def then(self, outcome, times=1):
+        """Returns the distribution after `outcome` is resolved `times` more times."""
+        state, damage_pmf = self.state, self.damage_pmf
+        for _ in range(times):
+            state = state @ outcome.transition
+            damage_pmf = np.convolve(damage_pmf, outcome.damage_pmf)
+        return OutcomeDistribution(state, damage_pmf, self.unit_size, self.model_w)
+
+    @property
+    def kills_pmf(self):
+        """kills_pmf[k] = P(exactly k models killed), k = 0..unit_size"""
+        return kills_pmf(self.state, self.unit_size, self.model_w)
+
+    @property
+    def mean_kills(self):
+        return float(np.dot(np.arange(self.unit_size + 1), self.kills_pmf))
+
+    @property
+    def mean_damage(self):
+        return float(np.dot(np.arange(len(self.damage_pmf)), self.damage_pmf))
+
+    def prob_kills_at_least(self, n):
+        """P(models killed >= n)"""
+        if n <= 0:
+            return 1.0
+        return float(self.kills_pmf[n:].sum())
+
+    def prob_damage_at_least(self, n):
+        """P(damage dealt >= n)"""
+        if n <= 0:
+            return 1.0
+        return float(self.damage_pmf[n:].sum())
+
+    def prob_wipe(self):
+        """P(every model in the unit is killed)"""
+        return float(self.state[-1])
+
+    def kills_percentile(self, q):
+        """Smallest kill count k with P(kills <= k) >= q (q in 0..1)."""
+        return _percentile(self.kills_pmf, q)
+
+    def damage_percentile(self, q):
+        """Smallest damage d with P(damage <= d) >= q (q in 0..1)."""
+        return _percentile(self.damage_pmf, q)
+
+    def summary(self, percentiles=(0.1, 0.5, 0.9)):
+        """Returns a JSON-friendly dict for the API and charts."""
+        return {
+            'Mean_Kills': self.mean_kills,
+            'Mean_Damage': self.mean_damage,
+            'P_Wipe': self.prob_wipe(),
+            'P_Kills_At_Least': [self.prob_kills_at_least(n) for n in range(self.unit_size + 1)],
+            'Kills_Percentiles': {str(q): self.kills_percentile(q) for q in percentiles},
+            'Damage_Percentiles': {str(q): self.damage_percentile(q) for q in percentiles},
+        }
+
+
+def _percentile(pmf, q):
+    cdf = np.cumsum(pmf)
+    return int(min(np.searchsorted(cdf, q - 1e-12), len(pmf) - 1))
+
+
+def _attack_spec(spec, blast_mode):
+    """Blast fixes the attacks at the dice minimum (mode 1) or maximum (mode 2)."""
+    if not isinstance(spec, DiceSpec):
+        return None
+    if blast_mode == 2:
+        return compile_spec(0, 0, spec.max)
+    if blast_mode == 1:
+        return compile_spec(0, 0, spec.min)
+    return spec
+
+
+def compile_outcomes(weapons, target, assume_half_range=False):
+    """
+    Returns one cached WeaponOutcome per roster row against a single target.
+
+    Args:
+        weapons: Dict of arrays from compile_weapons()
+        target: CompiledTarget from compile_target()
+        assume_half_range: If False, apply stealth modifier to hit rolls (default False)
+    """
+    p = {k: np.broadcast_to(v, weapons['bs'].shape) for k, v in
+         stage_probabilities(weapons, target, assume_half_range).items()}
+    unit_size = max(1, int(target['unit_size']))
+    model_w = int(target['w'])
+
+    return [
+        weapon_outcome(
+            _attack_spec(weapons['a_spec'][i], p['blast_mode'][i]),
+            weapons['d_spec'][i] if isinstance(weapons['d_spec'][i], DiceSpec) else None,
+            float(p['p_hit'][i]), float(p['p_crit_hit'][i]),
+            float(p['p_wound'][i]), float(p['p_crit_wound'][i]),
+            float(p['p_fail'][i]), float(p['p_fnp_fail'][i]),
+            bool(weapons['lethal'][i]), bool(weapons['dev'][i]), int(weapons['sustained'][i]),
+            unit_size, model_w,
+        )
+        for i in range(len(weapons['bs']))
+    ]
+
+
+def _mean_kills(outcome):
+    state = start_state(outcome.unit_size, outcome.model_w) @ outcome.transition
+    return float(np.dot(np.arange(outcome.unit_size + 1), kills_pmf(state, outcome.unit_size, outcome.model_w)))
+
+
+def resolve_distribution(attacker, defender, assume_half_range=False):
+    """
+    Full kill / damage distribution of one weapon profile against one target.
+
+    Args:
+        attacker: Weapon dict (same keys as a roster row)
+        defender: Target profile dict from targets.py
+        assume_half_range: If False, apply stealth modifier to hit rolls (default False)
+
+    Returns:
+        OutcomeDistribution
+    """
+    target = compile_target(defender)
+    outcome = compile_outcomes(compile_weapons(pd.DataFrame([attacker])), target, assume_half_range)[0]
+    return OutcomeDistribution.start(outcome.unit_size, outcome.model_w).then(outcome)
+
+
+def calculate_group_distributions(df, target_profile, deduplicate=True, assume_half_range=False,
+                                  allocation='average'):
+    """
+    calculate_group_metrics() with the full distribution of every unit.
+
+    Profile ID modes and duplicates are resolved exactly as in
+    calculate_group_metrics(); every active weapon row of a unit is then
+    combined into one distribution (Qty times when not deduplicating).
+
+    Parameters:
+    - df: DataFrame with weapon data
+    - target_profile: Target stats dict
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+    - allocation: 'average' keeps the engine's Kills; 'exact' picks Profile ID
+                  modes and reports Kills / CPK / TTK from model-by-model allocation
+
+    Returns:
+    - List of calculate_group_metrics() result dicts, each with an extra
+      'Distribution' key holding an OutcomeDistribution
+    """
+    if df.empty:
+        return []
+
+    from .roster import compile_roster
+    roster = compile_roster(df)
+    return unit_distributions(roster.prepared(assume_half_range), roster.weapons(assume_half_range),
+                              target_profile, deduplicate, assume_half_range, allocation,
+                              roster.codes(assume_half_range, deduplicate))
+
+
+def unit_distributions(temp_df, weapons, target_profile, deduplicate=True, assume_half_range=False,
+                       allocation='average', codes=None):
+    """
+    calculate_group_distributions() for an already prepared and compiled roster.
+
+    Parameters:
+    - temp_df: Roster from prepare_roster()
+    - weapons: compile_weapons(temp_df)
+    - target_profile, deduplicate, assume_half_range, allocation: see calculate_group_distributions()
+    - codes: roster_codes(temp_df, deduplicate), if the caller has them
+    """
+    if allocation not in ('average', 'exact'):
+        raise ValueError(f"Unknown allocation mode: {allocation!r}")
+
+    target = compile_target(target_profile)
+    row_kills, row_damage = resolve_unique_weapons(weapons, target, assume_half_range)
+    outcomes = compile_outcomes(weapons, target, assume_half_range)
+    if allocation == 'exact':
+        row_kills = np.array([_mean_kills(outcome) for outcome in outcomes], dtype=float)
+
+    work_df = resolve_active_rows(temp_df.assign(__row__=np.arange(len(temp_df))),
+                                  row_kills, row_damage, deduplicate, codes)
+    results = summarize_units(work_df, target_profile, deduplicate)
+
+    # summarize_units() groups by the same unit codes, so groups line up with results
+    groups = work_df[work_df['__unit__'] >= 0].groupby('__unit__')
+    unit_size, model_w = max(1, int(target['unit_size'])), int(target['w'])
+    for result, (_, rows) in zip(results, groups):
+        dist = OutcomeDistribution.start(unit_size, model_w)
+        for row, qty in zip(rows['__row__'], rows['Qty']):
+            dist = dist.then(outcomes[row], 1 if deduplicate else int(qty))
+        result['Distribution'] = dist
+
+        if allocation == 'exact':
+            result['Kills'] = dist.mean_kills
+            result['CPK'], result['TTK'] = score_kills(dist.mean_kills, result['Pts'] * result['Qty'], target_profile)
+            result['CPK_Grade'] = get_cpk_grade(result['CPK'])
+
+    return results
+
+
+def cache_info():
+    """Returns LRU statistics for the weapon outcome cache."""
+    return weapon_outcome.cache_info()
@@ -0,0 +1,763 @@
+# src/engine/kernel.py
+
+"""
+Resolve Kernel
+
+The one expected-value damage engine. Every caller (calculator.py,
+math_core.py, cpk_engine.py, the backend, the MCP server and the
+Streamlit app) ends up here, so they all agree on the numbers.
+
+Two paths share the same tables (tables.py) and the same formulas:
+- Batched: compile_weapons() / compile_targets() parse each distinct
+  roster value once, then resolve_weapons() runs the hit, wound, save,
+  FNP and damage-allocation math for the whole roster as NumPy arrays.
+  resolve_unique_weapons() does the same for each distinct profile only
+  (unique_weapons()) and scatters the results back to the rows.
+- Scalar: compile_weapon() / compile_target() and resolve_weapon() do the
+  same for one profile in plain Python, skipping NumPy's per-call overhead.
+  Weapon dicts and targets are cached by content, so adapters that take a
+  dict per call (resolve_profile(), cpk_engine.calculate_cpk()) parse each
+  distinct profile once.
+
+Targets are compiled once per distinct profile into a cached CompiledTarget
+(save curve over every AP value, FNP factor, Stealth modifier), so both
+paths read constants instead of re-parsing the target for each weapon.
+
+The batched path runs in float64. Large sweeps and matrices, which are
+limited by memory rather than precision, can store their weapons in
+compact encodings (compact_weapons()): those evaluate in float32 on
+float32 tables, and the results are float32 arrays within COMPACT_RTOL /
+COMPACT_ATOL of the float64 ones.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from . import tables
+from .dice import DiceSpec, compile_dice, parse_int
+
+
+# --- COLUMN PARSING ---
+
+def map_unique(series, func, dtype=float):
+    """
+    Applies func once per distinct value in series and scatters the results
+    back to every row. Roster columns hold a handful of distinct values
+    ('3+', 'D6', 'Y'...), so this is far cheaper than a per-row apply.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    values = np.array([func(u) for u in uniques], dtype=dtype)
+    return values[codes] if len(values) else np.empty(0, dtype=dtype)
+
+
+def map_unique_pairs(left, right, func):
+    """
+    Applies func(l, r) once per distinct (left, right) pair and scatters the
+    results back to every row. Both inputs are 1-d arrays of hashable values.
+    """
+    left_codes, left_uniques = pd.factorize(pd.Series(left, dtype=object), use_na_sentinel=False)
+    right_codes, right_uniques = pd.factorize(pd.Series(right, dtype=object), use_na_sentinel=False)
+
+    keys = left_codes * max(len(right_uniques), 1) + right_codes
+    pairs, inverse = np.unique(keys, return_inverse=True)
+
+    n_right = max(len(right_uniques), 1)
+    values = np.empty(len(pairs), dtype=object)
+    for i, key in enumerate(pairs):
+        values[i] = func(_none_if_nan(left_uniques[key // n_right]), _none_if_nan(right_uniques[key % n_right]))
+    return values[inverse]
+
+
+def _none_if_nan(val):
+    """factorize() reports None as NaN; turn it back into None."""
+    return None if isinstance(val, float) and np.isnan(val) else val
+
+
+def column_or_default(df, name, default):
+    """Returns df[name], or a constant Series when the column is missing."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def _spec_value(spec, field):
+    """Returns the spec itself or its mean/min/max (None / 0 if it didn't parse)."""
+    if not isinstance(spec, DiceSpec):
+        return None if field == 'spec' else 0.0
+    return spec if field == 'spec' else getattr(spec, field)
+
+
+# Common RR_H / RR_W spellings, looked up before the general parse
+_REROLL_MODES = {
+    '1': tables.REROLL_ONES, 'Y': tables.REROLL_FAILS, 'F': tables.REROLL_FAILS,
+    'y': tables.REROLL_FAILS, 'f': tables.REROLL_FAILS, 'N': tables.REROLL_NONE,
+    'n': tables.REROLL_NONE, '': tables.REROLL_NONE,
+}
+
+
+def reroll_mode(val):
+    """
+    Parses an RR_H / RR_W value into a tables.py reroll index:
+    '1' = reroll 1s, 'Y' / 'F' = reroll failed rolls, anything else = none.
+    """
+    if type(val) is str and val in _REROLL_MODES:
+        return _REROLL_MODES[val]
+    text = str(val).strip().upper()
+    if text == '1':
+        return tables.REROLL_ONES
+    if text in ('Y', 'F'):
+        return tables.REROLL_FAILS
+    return tables.REROLL_NONE
+
+
+def _is_yes(val):
+    return str(val).upper() == 'Y'
+
+
+def _is_set(val):
+    try:
+        return bool(val) and not pd.isna(val)
+    except (TypeError, ValueError):
+        return bool(val)
+
+
+# Stands in for an unparseable A / D value (0 attacks, 0 damage)
+_NO_DICE = DiceSpec(0, 0, 0.0)
+
+
+def compile_weapons(df):
+    """
+    Parses the math-relevant roster columns into NumPy arrays.
+
+    Args:
+        df: Roster DataFrame (one row per weapon profile)
+
+    Returns:
+        Dict of column name -> np.ndarray, one entry per row of df
+    """
+    def stat(name, default):
+        return map_unique(column_or_default(df, name, default), lambda v: parse_int(v, default=default), dtype=np.int64)
+
+    def flag(name):
+        return map_unique(column_or_default(df, name, 'N'), _is_yes, dtype=bool)
+
+    def dice(name, default, field):
+        # prepare_roster() stores parsed (and range-adjusted) specs; raw rosters get compiled here
+        spec_col = {'A': '__attack_spec__', 'D': '__damage_spec__'}[name]
+        dtype = object if field == 'spec' else float
+        if spec_col in df.columns:
+            return map_unique(df[spec_col], lambda spec: _spec_value(spec, field), dtype=dtype)
+        return map_unique(column_or_default(df, name, default), lambda v: _spec_value(compile_dice(v), field), dtype=dtype)
+
+    return {
+        # Blast swaps the attack characteristic for its minimum (6-10 models)
+        # or maximum (11+ models) value, so keep all three.
+        'a_mean': dice('A', 0, 'mean'),
+        'a_min': dice('A', 0, 'min'),
+        'a_max': dice('A', 0, 'max'),
+        'd_mean': dice('D', 1, 'mean'),
+        'a_spec': dice('A', 0, 'spec'),
+        'd_spec': dice('D', 1, 'spec'),
+        'bs': stat('BS', 4),
+        's': stat('S', 4),
+        'ap': stat('AP', 0),
+        'sustained': stat('Sustained', 0),
+        'crit_hit': stat('CritHit', 6),
+        'crit_wound': stat('CritWound', 6),
+        'lethal': flag('Lethal'),
+        'dev': flag('Dev'),
+        'torrent': flag('Torrent'),
+        'twin_linked': flag('TwinLinked'),
+        'reroll_hit': map_unique(column_or_default(df, 'RR_H', 'N'), reroll_mode, dtype=np.intp),
+        'reroll_wound': map_unique(column_or_default(df, 'RR_W', 'N'), reroll_mode, dtype=np.intp),
+        'blast': flag('Blast'),
+        'ignores_cover': flag('IgnoresCover'),
+        'melee': map_unique(column_or_default(df, 'Range', ''), lambda v: str(v).upper() == 'M', dtype=bool),
+        'cover': map_unique(column_or_default(df, '__assume_cover__', False), _is_set, dtype=bool),
+    }
+
+
+class WeaponProfile:
+    """
+    One compiled weapon profile: the scalar counterpart of a
+    compile_weapons() row, with the same field names as attributes.
+
+    Build it once with compile_weapon() and reuse it; resolve_weapon()
+    then reads plain attributes instead of re-parsing strings.
+    """
+    __slots__ = (
+        'a_mean', 'a_min', 'a_max', 'd_mean', 'a_spec', 'd_spec',
+        'bs', 's', 'ap', 'sustained', 'crit_hit', 'crit_wound',
+        'lethal', 'dev', 'torrent', 'twin_linked', 'reroll_hit', 'reroll_wound',
+        'blast', 'ignores_cover', 'melee', 'cover',
+    )
+
+    def __init__(self, a_mean, a_min, a_max, d_mean, a_spec, d_spec,
+                 bs, s, ap, sustained, crit_hit, crit_wound,
+                 lethal, dev, torrent, twin_linked, reroll_hit, reroll_wound,
+                 blast, ignores_cover, melee, cover):
+        self.a_mean, self.a_min, self.a_max, self.d_mean = a_mean, a_min, a_max, d_mean
+        self.a_spec, self.d_spec = a_spec, d_spec
+        self.bs, self.s, self.ap, self.sustained = bs, s, ap, sustained
+        self.crit_hit, self.crit_wound = crit_hit, crit_wound
+        self.lethal, self.dev, self.torrent, self.twin_linked = lethal, dev, torrent, twin_linked
+        self.reroll_hit, self.reroll_wound = reroll_hit, reroll_wound
+        self.blast, self.ignores_cover, self.melee, self.cover = blast, ignores_cover, melee, cover
+
+    def __repr__(self):
+        return f"WeaponProfile(A={self.a_spec}, BS={self.bs}, S={self.s}, AP={self.ap}, D={self.d_spec})"
+
+
+@lru_cache(maxsize=4096)
+def _compile_weapon_items(items):
+    return _build_weapon(dict(items))
+
+
+def compile_weapon(attacker):
+    """
+    Scalar compile_weapons(): parses one weapon profile into plain numbers.
+
+    Dicts with the same content share one cached WeaponProfile, so treat
+    the result as read-only.
+
+    Args:
+        attacker: Weapon profile dict, a roster row (anything with .get),
+                  or an already compiled WeaponProfile (returned as is)
+
+    Returns:
+        WeaponProfile
+    """
+    if isinstance(attacker, WeaponProfile):
+        return attacker
+    if type(attacker) is dict:
+        try:
+            return _compile_weapon_items(tuple(attacker.items()))
+        except TypeError:
+            # Unhashable values: compile without caching
+            pass
+    return _build_weapon(attacker)
+
+
+def _build_weapon(attacker):
+    get = attacker.get
+
+    a_spec = get('__attack_spec__')
+    if a_spec is None:
+        a_spec = compile_dice(get('A', 0))
+    d_spec = get('__damage_spec__')
+    if d_spec is None:
+        d_spec = compile_dice(get('D', 1))
+    if not isinstance(a_spec, DiceSpec):
+        a_spec = _NO_DICE
+    if not isinstance(d_spec, DiceSpec):
+        d_spec = _NO_DICE
+
+    return WeaponProfile(
+        a_mean=a_spec.mean,
+        a_min=a_spec.min,
+        a_max=a_spec.max,
+        d_mean=d_spec.mean,
+        a_spec=None if a_spec is _NO_DICE else a_spec,
+        d_spec=None if d_spec is _NO_DICE else d_spec,
+        bs=parse_int(get('BS', 4), 4),
+        s=parse_int(get('S', 4), 4),
+        ap=parse_int(get('AP', 0), 0),
+        sustained=parse_int(get('Sustained', 0), 0),
+        crit_hit=parse_int(get('CritHit', 6), 6),
+        crit_wound=parse_int(get('CritWound', 6), 6),
+        lethal=_is_yes(get('Lethal', 'N')),
+        dev=_is_yes(get('Dev', 'N')),
+        torrent=_is_yes(get('Torrent', 'N')),
+        twin_linked=_is_yes(get('TwinLinked', 'N')),
+        reroll_hit=reroll_mode(get('RR_H', 'N')),
+        reroll_wound=reroll_mode(get('RR_W', 'N')),
+        blast=_is_yes(get('Blast', 'N')),
+        ignores_cover=_is_yes(get('IgnoresCover', 'N')),
+        melee=str(get('Range', '')).upper() == 'M',
+        cover=_is_set(get('__assume_cover__', False)),
+    )
+
+
+# Scalar CompiledTarget fields, and the per-target curves indexed [AP index, in cover]
+TARGET_FIELDS = ('unit_size', 'stealth', 't', 'sv', 'inv', 'fnp', 'w', 'stealth_penalty', 'p_fnp_fail')
+CURVE_FIELDS = ('save_curve', 'fail_curve')
+
+# Blank spellings of "no Invuln / FNP" in target configs
+_NO_SAVE = ('', 'N', '-', 'NONE')
+
+
+class CompiledTarget:
+    """
+    One compiled target profile: the numbers every weapon evaluation reads,
+    normalized once.
+
+    Besides the parsed stats it holds the target's save curve over every AP
+    value, with and without cover (save_curve: D6 roll needed, fail_curve:
+    P(failed save); both indexed [tables.ap_index(ap), in_cover]), the FNP
+    pass factor and the Stealth hit modifier.
+
+    Fields are also readable as target['field'], like the compile_targets()
+    dict. Compiled targets are cached and shared, so treat them as read-only.
+    """
+    __slots__ = TARGET_FIELDS + CURVE_FIELDS + ('fail_list',)
+
+    def __init__(self, unit_size, stealth, t, sv, inv, fnp, w):
+        self.unit_size, self.stealth, self.t, self.w = unit_size, stealth, t, w
+        self.sv, self.inv, self.fnp = sv, inv, fnp
+        self.stealth_penalty = 1 if stealth else 0
+        self.p_fnp_fail = float(tables.P_FNP_FAIL[_clip(fnp, 0, tables.MAX_SV)])
+        save_idx = (_clip(sv, 0, tables.MAX_SV), slice(None), _clip(inv, 0, tables.MAX_SV))
+        self.save_curve = tables.SAVE_TARGET[save_idx]
+        self.fail_curve = tables.P_FAIL_SAVE[save_idx]
+        # fail_curve as nested lists, for resolve_weapon()
+        self.fail_list = self.fail_curve.tolist()
+
+    def __getitem__(self, field):
+        return getattr(self, field)
+
+    def __repr__(self):
+        return (f"CompiledTarget(T={self.t}, W={self.w}, Sv={self.sv}, Inv={self.inv}, FNP={self.fnp}, "
+                f"UnitSize={self.unit_size}, Stealth={self.stealth})")
+
+
+def _save_value(defender, keys, default):
+    """First non-blank save among keys ('Inv' / 'Invuln'...), parsed; default if none."""
+    for key in keys:
+        val = defender.get(key)
+        if val is None or (isinstance(val, float) and np.isnan(val)):
+            continue
+        if str(val).strip().upper() in _NO_SAVE:
+            continue
+        return parse_int(val, default=default)
+    return default
+
+
+def _build_target(defender):
+    model_w = parse_int(defender.get('W', 1), default=1)
+    if model_w <= 0: model_w = 1
+
+    stealth = defender.get('Stealth', 'N')
+    # FNP only rolls 2+ to 6+; 0, 1 or 7+ mean no FNP, like a blank value
+    fnp = _save_value(defender, ('FNP',), default=7)
+    return CompiledTarget(
+        unit_size=parse_int(defender.get('UnitSize', 10), default=10),
+        stealth=stealth is True or _is_yes(stealth),
+        t=parse_int(defender.get('T', 4), default=4),
+        sv=parse_int(defender.get('Sv'), default=7),
+        inv=_save_value(defender, ('Inv', 'Invuln'), default=0),
+        fnp=fnp if 2 <= fnp <= 6 else 7,
+        w=model_w,
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile_target_items(items):
+    return _build_target(dict(items))
+
+
+def compile_target(defender):
+    """
+    Parses a target profile dict into the numbers the kernel needs.
+
+    'Inv' and 'Invuln' are both read; 'N', '' and '-' mean no Invuln / FNP,
+    and so does an FNP outside 2+ to 6+ (e.g. 0).
+    Profiles with the same content share one cached CompiledTarget, so a
+    target list is parsed once, not once per weapon row.
+
+    Args:
+        defender: Target profile dict from targets.py (or a CompiledTarget,
+                  returned as is)
+
+    Returns:
+        CompiledTarget
+    """
+    if isinstance(defender, CompiledTarget):
+        return defender
+    try:
+        return _compile_target_items(tuple(defender.items()))
+    except TypeError:
+        # Unhashable values: compile without caching
+        return _build_target(defender)
+
+
+def compile_targets(defenders):
+    """
+    Compiles a list of target profiles into column vectors of shape
+    (len(defenders), 1), which broadcast against the weapon arrays. The
+    save curves are stacked to (len(defenders), AP values, 2).
+
+    Args:
+        defenders: List of target profile dicts (or CompiledTargets)
+
+    Returns:
+        Dict of field -> np.ndarray
+    """
+    compiled = [compile_target(d) for d in defenders]
+    columns = {f: np.array([getattr(c, f) for c in compiled]).reshape(-1, 1) for f in TARGET_FIELDS}
+    for f, table in zip(CURVE_FIELDS, (tables.SAVE_TARGET, tables.P_FAIL_SAVE)):
+        curves = np.array([getattr(c, f) for c in compiled], dtype=table.dtype)
+        columns[f] = curves.reshape(-1, 2 * tables.MAX_AP + 1, 2)
+    return columns
+
+
+# --- COMPACT EVALUATION ---
+
+# Float dtype of compact weapons and of their results
+COMPACT_FLOAT = np.float32
+
+# Compact results match float64 ones: np.allclose(compact, double, rtol=COMPACT_RTOL, atol=COMPACT_ATOL)
+COMPACT_RTOL = 1e-5
+COMPACT_ATOL = 1e-6
+
+# compile_weapons() integer fields and their compact encodings: stats that
+# can be modified or negative as int16, crit thresholds and reroll modes as uint8
+COMPACT_INT_FIELDS = {
+    'bs': np.int16, 's': np.int16, 'ap': np.int16, 'sustained': np.int16,
+    'crit_hit': np.uint8, 'crit_wound': np.uint8, 'reroll_hit': np.uint8, 'reroll_wound': np.uint8,
+}
+
+# compile_weapons() average dice values, stored in the compact float dtype
+DICE_MEAN_FIELDS = ('a_mean', 'a_min', 'a_max', 'd_mean')
+
+
+def compact_weapons(weapons):
+    """
+    compile_weapons() arrays in compact encodings.
+
+    Dice means become COMPACT_FLOAT and COMPACT_INT_FIELDS int16 / uint8 (clipped to
+    the encoding's range, far outside what the tables distinguish). Fields
+    that are already as narrow, like a CompiledRoster's int8 stats, are kept.
+
+    Args:
+        weapons: Dict of arrays from compile_weapons()
+
+    Returns:
+        Dict of field -> np.ndarray (unchanged fields are shared, not copied)
+    """
+    compact = {}
+    for field, col in weapons.items():
+        encoding = COMPACT_INT_FIELDS.get(field)
+        if field in DICE_MEAN_FIELDS:
+            col = col.astype(COMPACT_FLOAT, copy=False)
+        elif encoding is not None and col.dtype.itemsize > np.dtype(encoding).itemsize:
+            info = np.iinfo(encoding)
+            col = np.clip(col, info.min, info.max).astype(encoding)
+        compact[field] = col
+    return compact
+
+
+def weapons_dtype(weapons):
+    """Float dtype a weapons dict evaluates in: COMPACT_FLOAT for compact_weapons() arrays, else float64."""
+    return np.dtype(COMPACT_FLOAT) if weapons['d_mean'].dtype == COMPACT_FLOAT else np.dtype(np.float64)
+
+
+def _operand(value, dtype):
+    """Target constant in dtype: column vectors are cast, Python scalars already adapt."""
+    return value.astype(dtype, copy=False) if isinstance(value, np.ndarray) else value
+
+
+# --- PROFILE HASH-CONSING ---
+
+# Compiled fields that decide a weapon's math (a_mean / a_min / a_max /
+# d_mean follow from the dice specs)
+PROFILE_FIELDS = (
+    'a_spec', 'd_spec', 'bs', 's', 'ap', 'sustained', 'crit_hit', 'crit_wound',
+    'lethal', 'dev', 'torrent', 'twin_linked', 'reroll_hit', 'reroll_wound',
+    'blast', 'ignores_cover', 'melee', 'cover',
+)
+
+
+def unique_weapons(weapons):
+    """
+    Collapses compiled weapon rows with identical PROFILE_FIELDS into one
+    canonical profile each (dice specs are interned, so equal dice compare
+    equal).
+
+    Args:
+        weapons: Dict of arrays from compile_weapons()
+
+    Returns:
+        Tuple (unique, inverse): unique is a compile_weapons() dict with one
+        entry per distinct profile, and unique[f][inverse] == weapons[f]
+    """
+    n_rows = len(weapons['bs'])
+    if n_rows == 0:
+        return weapons, np.empty(0, dtype=np.intp)
+
+    columns = []
+    for field in PROFILE_FIELDS:
+        col = weapons[field]
+        if col.dtype == object:
+            col = pd.factorize(col, use_na_sentinel=False)[0]
+        columns.append(col.astype(np.int64))
+
+    _, first, inverse = np.unique(np.stack(columns, axis=1), axis=0, return_index=True, return_inverse=True)
+    unique = {field: col[first] for field, col in weapons.items()}
+    return unique, inverse.reshape(-1)
+
+
+# --- CORE MATH ---
+
+def stage_probabilities(weapons, target, assume_half_range=False):
+    """
+    Per-roll probabilities of every stage of the attack sequence.
+
+    Shared by the expected-value kernel (resolve_weapons) and the exact
+    distribution engine so both agree on hit / wound / save / FNP odds.
+
+    Args:
+        weapons: Dict of arrays from compile_weapons() (or compact_weapons():
+                 probabilities are then COMPACT_FLOAT)
+        target: CompiledTarget from compile_target(), or dict from compile_targets()
+        assume_half_range: If False, apply stealth modifier to hit rolls (default False)
+
+    Returns:
+        Dict of arrays:
+        - attacks: average attacks after Blast
+        - blast_mode: 0 = roll attacks, 1 = Blast minimum, 2 = Blast maximum
+        - p_hit: P(hit) per attack (1.0 for Torrent), including RR_H
+        - p_crit_hit: P(critical hit) per attack, including RR_H
+        - p_wound: P(wound) per hit, including RR_W, Twin-Linked and Anti-X
+        - p_crit_wound: P(critical wound) per hit, including RR_W / Twin-Linked
+        - p_fail: P(failed save) per wound
+        - p_fnp_fail: P(damage gets through Feel No Pain)
+        - hit_target, wound_target, save_target, fnp_target: D6 roll needed
+          at each stage (save/FNP targets above 6 mean no roll)
+        - hit_reroll, wound_reroll: tables.py reroll index per stage
+    """
+    dtype = weapons_dtype(weapons)
+    probabilities = tables.probability_tables(dtype)
+    unit_size = target['unit_size']
+    blast = weapons['blast']
+
+    # 1. Attacks (Blast modifies the characteristic before it is averaged)
+    blast_mode = np.where(blast & (unit_size >= 11), 2, np.where(blast & (unit_size >= 6), 1, 0))
+    attacks = np.where(
+        blast_mode == 2, weapons['a_max'],
+        np.where(blast_mode == 1, weapons['a_min'], weapons['a_mean'])
+    ).astype(dtype, copy=False)
+
+    # 2. Hit Phase (probabilities gathered from tables.py)
+    # -1 to hit = +1 to BS requirement
+    stealth_penalty = 0 if assume_half_range else target['stealth_penalty']
+    effective_bs = weapons['bs'] + stealth_penalty
+
+    # Torrent = Auto-hit (ignores BS), so there is nothing to reroll
+    hit_reroll = np.where(weapons['torrent'], tables.REROLL_NONE, weapons['reroll_hit'])
+    hit_idx = (tables.clip_bs(effective_bs), tables.clip_crit(weapons['crit_hit']), hit_reroll)
+    p_crit_hit = probabilities['P_CRIT_HIT'][hit_idx]
+    p_hit = np.where(weapons['torrent'], 1.0, probabilities['P_HIT'][hit_idx])
+
+    # 3. Wound Phase
+    s_idx = tables.clip_stat(weapons['s'])
+    t_idx = tables.clip_stat(target['t'])
+    crit_wound_idx = tables.clip_crit(weapons['crit_wound'])
+    w_roll = tables.WOUND_TARGET[s_idx, t_idx]
+
+    # Twin-Linked = Reroll wound rolls (treat as reroll all failures)
+    # Rerolled dice can still score critical wounds
+    wound_reroll = np.where(weapons['twin_linked'], tables.REROLL_FAILS, weapons['reroll_wound'])
+    p_wound = probabilities['P_WOUND'][s_idx, t_idx, crit_wound_idx, wound_reroll]
+    p_crit_wound = probabilities['P_CRIT_WOUND'][s_idx, t_idx, crit_wound_idx, wound_reroll]
+
+    # 4. Save Phase
+    # Cover improves armor save by 1 (but not invuln) unless weapon ignores cover or is melee
+    # Each target's curves are indexed [AP, in cover]; a leading target axis broadcasts
+    in_cover = (weapons['cover'] & ~weapons['ignores_cover'] & ~weapons['melee']).astype(np.intp)
+    save_idx = (Ellipsis, tables.ap_index(weapons['ap']), in_cover)
+    final_save = target['save_curve'][save_idx]
+    p_fail = target['fail_curve'].astype(dtype, copy=False)[save_idx]
+
+    # 5. Feel No Pain (FNP)
+    fnp_save = target['fnp']
+    p_fnp_fail = _operand(target['p_fnp_fail'], dtype)
+
+    return {
+        'attacks': attacks,
+        'blast_mode': blast_mode,
+        'p_hit': p_hit,
+        'p_crit_hit': p_crit_hit,
+        'p_wound': p_wound,
+        'p_crit_wound': p_crit_wound,
+        'p_fail': p_fail,
+        'p_fnp_fail': p_fnp_fail,
+        'hit_target': effective_bs,
+        'hit_reroll': hit_reroll,
+        'wound_reroll': wound_reroll,
+        'wound_target': w_roll,
+        'save_target': final_save,
+        'fnp_target': fnp_save,
+    }
+
+
+def resolve_weapons(weapons, target, assume_half_range=False):
+    """
+    Vectorized resolve_single_row() for a whole roster.
+
+    Target fields may be scalars (compile_target) or column vectors
+    (compile_targets); in the second case NumPy broadcasting evaluates
+    every weapon against every target in one pass.
+
+    Args:
+        weapons: Dict of arrays from compile_weapons(), or compact_weapons()
+                 for float32 evaluation
+        target: CompiledTarget from compile_target(), or dict from compile_targets()
+        assume_half_range: If False, apply stealth modifier to hit rolls (default False)
+
+    Returns:
+        Tuple of np.ndarray (kills, damage) in weapons_dtype(weapons), shaped
+        (rows,) for a single target or (targets, rows) for a compiled target list
+    """
+    dtype = weapons_dtype(weapons)
+    p = stage_probabilities(weapons, target, assume_half_range)
+    attacks = p['attacks']
+    p_crit_hit = p['p_crit_hit']
+    damage = weapons['d_mean']
+
+    # 1. Hits
+    hits = attacks * p['p_hit']
+
+    lethal = weapons['lethal']
+    auto_wounds = np.where(lethal, attacks * p_crit_hit, 0.0)
+    hits = np.where(lethal, np.maximum(0, hits - auto_wounds), hits)
+
+    sustained = weapons['sustained']
+    hits = np.where(sustained > 0, hits + (attacks * p_crit_hit * sustained), hits)
+
+    # 2. Wounds
+    successful_wounds = hits * p['p_wound']
+
+    dev = weapons['dev']
+    dev_procs = hits * p['p_crit_wound']
+    mortal_wounds = np.where(dev, dev_procs * damage, 0.0)
+    successful_wounds = np.where(dev, np.maximum(0, successful_wounds - dev_procs), successful_wounds)
+
+    successful_wounds = successful_wounds + auto_wounds
+
+    # 3. Saves
+    damage_dealing_wounds = successful_wounds * p['p_fail']
+
+    # 4. Feel No Pain (FNP) - Apply to all damage-dealing wounds and mortals
+    damage_dealing_wounds = damage_dealing_wounds * p['p_fnp_fail']
+    mortal_wounds = mortal_wounds * p['p_fnp_fail']
+
+    # 5. Damage Allocation
+    model_w = _operand(target['w'], dtype)
+    kill_efficiency_normal = np.minimum(1.0, damage / model_w)
+
+    dead_from_shots = damage_dealing_wounds * kill_efficiency_normal
+    dead_from_mortals = mortal_wounds / model_w
+
+    total_dead = dead_from_shots + dead_from_mortals
+    total_raw_dmg = (damage_dealing_wounds * damage) + mortal_wounds
+
+    return total_dead, total_raw_dmg
+
+
+def resolve_unique_weapons(weapons, target, assume_half_range=False):
+    """
+    resolve_weapons() that evaluates each distinct profile once and
+    scatters the results back to every row, so repeated profiles (bolt
+    rifles on every squad) cost nothing extra.
+
+    Args / Returns: as resolve_weapons()
+    """
+    unique, inverse = unique_weapons(weapons)
+    kills, damage = resolve_weapons(unique, target, assume_half_range)
+    return kills[..., inverse], damage[..., inverse]
+
+
+def _clip(value, low, high):
+    return low if value < low else high if value > high else value
+
+
+def resolve_weapon(weapon, target, assume_half_range=False):
+    """
+    Scalar resolve_weapons() for one weapon against one target.
+
+    Same table lookups and formulas as the batched path, written with
+    plain Python numbers so a single profile costs a few microseconds.
+
+    Args:
+        weapon: WeaponProfile from compile_weapon()
+        target: CompiledTarget from compile_target()
+        assume_half_range: If False, apply stealth modifier to hit rolls (default False)
+
+    Returns:
+        Tuple of floats (kills, damage)
+    """
+    # 1. Attacks (Blast modifies the characteristic before it is averaged)
+    unit_size = target.unit_size
+    if weapon.blast and unit_size >= 11:
+        attacks = weapon.a_max
+    elif weapon.blast and unit_size >= 6:
+        attacks = weapon.a_min
+    else:
+        attacks = weapon.a_mean
+    damage = weapon.d_mean
+
+    # 2. Hit Phase
+    effective_bs = weapon.bs
+    if not assume_half_range:
+        effective_bs += target.stealth_penalty
+
+    torrent = weapon.torrent
+    hit_reroll = tables.REROLL_NONE if torrent else weapon.reroll_hit
+    bs, crit_hit = _clip(effective_bs, 0, tables.MAX_BS), _clip(weapon.crit_hit, 0, tables.MAX_CRIT)
+    p_crit_hit = tables.P_CRIT_HIT_LIST[bs][crit_hit][hit_reroll]
+    hits = attacks if torrent else attacks * tables.P_HIT_LIST[bs][crit_hit][hit_reroll]
+
+    auto_wounds = 0.0
+    if weapon.lethal:
+        auto_wounds = attacks * p_crit_hit
+        hits = max(0.0, hits - auto_wounds)
+
+    if weapon.sustained > 0:
+        hits += attacks * p_crit_hit * weapon.sustained
+
+    # 3. Wound Phase
+    wound_reroll = tables.REROLL_FAILS if weapon.twin_linked else weapon.reroll_wound
+    s, t = _clip(weapon.s, 0, tables.MAX_STAT), _clip(target.t, 0, tables.MAX_STAT)
+    crit_wound = _clip(weapon.crit_wound, 0, tables.MAX_CRIT)
+    successful_wounds = hits * tables.P_WOUND_LIST[s][t][crit_wound][wound_reroll]
+
+    mortal_wounds = 0.0
+    if weapon.dev:
+        dev_procs = hits * tables.P_CRIT_WOUND_LIST[s][t][crit_wound][wound_reroll]
+        mortal_wounds = dev_procs * damage
+        successful_wounds = max(0.0, successful_wounds - dev_procs)
+
+    successful_wounds += auto_wounds
+
+    # 4. Saves
+    in_cover = weapon.cover and not weapon.ignores_cover and not weapon.melee
+    ap_idx = _clip(weapon.ap, -tables.MAX_AP, tables.MAX_AP) + tables.AP_OFFSET
+    damage_dealing_wounds = successful_wounds * target.fail_list[ap_idx][int(in_cover)]
+
+    # 5. Feel No Pain (FNP)
+    p_fnp_fail = target.p_fnp_fail
+    damage_dealing_wounds *= p_fnp_fail
+    mortal_wounds *= p_fnp_fail
+
+    # 6. Damage Allocation
+    model_w = target.w
+    total_dead = damage_dealing_wounds * min(1.0, damage / model_w) + mortal_wounds / model_w
+    total_raw_dmg = damage_dealing_wounds * damage + mortal_wounds
+
+    return total_dead, total_raw_dmg
+
+
+def resolve_profile(attacker, defender, assume_half_range=False):
+    """
+    Expected (kills, damage) of one weapon profile dict against one target dict.
+
+    Args:
+        attacker: Weapon profile dict, roster row or WeaponProfile
+        defender: Target profile dict from targets.py
+        assume_half_range: If False, apply stealth modifier to hit rolls (default False)
+
+    Returns:
+        Tuple of floats (kills, damage)
+    """
+    return resolve_weapon(compile_weapon(attacker), compile_target(defender), assume_half_range)
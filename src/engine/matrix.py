@@ -0,0 +1,212 @@
+# src/engine/matrix.py
+
+"""
+Weapons x Targets Matrix Evaluation
+
+calculate_matrix() evaluates a roster against a whole target list in one
+pass: the roster is sanitized, range-expanded and parsed once, then the
+kernel broadcasts it against every target profile at the same time.
+
+The result is a dense units x targets table of Kills / Damage / CPK / TTK
+that the dashboard, API and charts slice instead of calling
+calculate_group_metrics() once per target.
+
+For datasheet libraries, compact=True runs the kernel in float32 on
+compact weapon encodings (kernel.compact_weapons()) and stores float32
+tables, within kernel.COMPACT_RTOL / COMPACT_ATOL of the float64 results.
+"""
+
+import numpy as np
+import pandas as pd
+from .calculator import aggregate_unit_metrics, select_metrics
+from .distributions import unit_distributions
+from .grading import get_cpk_grade
+from .kernel import COMPACT_FLOAT, compact_weapons, compile_targets, resolve_unique_weapons
+from .parallel import should_shard, sharded_unit_metrics
+from .roster import compile_roster
+
+METRICS = ('Kills', 'Damage', 'CPK', 'TTK', 'Pts')
+UNIT_KEYS = ('UnitID', 'Name', 'Loadout Group', 'Qty')
+
+
+class MetricMatrix:
+    """
+    Dense units x targets results.
+
+    Attributes:
+        units: List of unit key dicts ('UnitID', 'Name', 'Loadout Group', 'Qty')
+        targets: List of target labels (dict keys, or profile names for lists)
+        profiles: List of target profile dicts, same order as targets
+        values: Dict of metric -> np.ndarray shaped (len(units), len(targets)),
+                for the selected metrics (Pts always; CPK also for CPK_Grade).
+                Cells are NaN where a unit has no result against a target.
+                float64, or float32 for compact matrices.
+        modes: np.ndarray of active weapon-mode strings, same shape ('' unless
+               'Weapon' is selected)
+        metrics: Selected calculator.RESULT_METRICS
+    """
+
+    def __init__(self, units, targets, profiles, values, modes, metrics=None):
+        self.units = units
+        self.targets = targets
+        self.profiles = profiles
+        self.values = values
+        self.modes = modes
+        self.metrics = select_metrics(metrics)
+
+    def __getitem__(self, metric):
+        return self.values[metric]
+
+    def unit_labels(self):
+        """Returns display labels like 'Name [Loadout Group]' for each unit row."""
+        return [f"{u['Name']} [{u['Loadout Group']}]" for u in self.units]
+
+    def to_frame(self, metric):
+        """
+        Returns one metric as a DataFrame (index: unit labels, columns: targets).
+        """
+        return pd.DataFrame(self.values[metric], index=self.unit_labels(), columns=self.targets)
+
+    def target_index(self, target):
+        """Returns the column index for a target label."""
+        return self.targets.index(target)
+
+    def target_results(self, target):
+        """
+        Returns the results for one target label in calculate_group_metrics() format.
+        """
+        return self.column_results(self.target_index(target))
+
+    def column_results(self, col):
+        """
+        Returns the results for target column col in calculate_group_metrics() format.
+        """
+        results = []
+        metrics = self.metrics
+
+        for row, unit in enumerate(self.units):
+            pts = self.values['Pts'][row, col]
+            if np.isnan(pts):
+                continue
+
+            result = {
+                'UnitID': unit['UnitID'],
+                'Name': unit['Name'],
+                'Loadout Group': unit['Loadout Group'],
+            }
+            if 'Weapon' in metrics:
+                result['Weapon'] = self.modes[row, col]
+            result['Qty'] = unit['Qty']
+            result['Pts'] = int(pts)
+            for m in ('Kills', 'Damage', 'CPK', 'TTK'):
+                if m in metrics:
+                    result[m] = self.values[m][row, col]
+            if 'CPK_Grade' in metrics:
+                result['CPK_Grade'] = get_cpk_grade(self.values['CPK'][row, col])
+            result['Profile ID'] = None
+            results.append(result)
+
+        return results
+
+
+def _normalize_targets(targets):
+    """Accepts a {key: profile} dict or a list of profiles; returns (labels, profiles)."""
+    if isinstance(targets, dict):
+        return list(targets.keys()), list(targets.values())
+
+    profiles = list(targets)
+    labels = [p.get('Name', str(i)) for i, p in enumerate(profiles)]
+    return labels, profiles
+
+
+def calculate_matrix(df, targets, deduplicate=True, assume_half_range=False, assume_cover=False,
+                     allocation='average', workers=1, metrics=None, compact=False):
+    """
+    Evaluates a roster against every target in one pass.
+
+    Parameters:
+    - df: DataFrame with weapon data (or a CompiledRoster)
+    - targets: Dict of {label: target profile} or list of target profiles
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+    - assume_cover: If True, targets get +1 armor save vs ranged weapons (default False)
+    - allocation: 'average' (default) or 'exact' model-by-model kills, see calculate_group_metrics()
+    - workers: Processes to shard 'average' evaluation over (1 = in-process, None = one per CPU);
+               inputs below parallel.PARALLEL_MIN_CELLS rows x targets always run in-process
+    - metrics: calculator.RESULT_METRICS to compute, e.g. ['CPK'] for a chart
+               (default: all); only those arrays (and Pts) are built
+    - compact: If True, evaluate in float32 with compact stat encodings and
+               return float32 arrays (default False). Near-tied Profile ID
+               modes may resolve to the other mode.
+
+    Returns:
+    - MetricMatrix with units x targets arrays of the selected Kills, Damage, CPK, TTK and Pts
+    """
+    labels, profiles = _normalize_targets(targets)
+    metrics = select_metrics(metrics)
+    # CPK_Grade is graded from CPK when results are read back
+    needed = (metrics | {'CPK'}) if 'CPK_Grade' in metrics else metrics
+    kept = [m for m in METRICS if m == 'Pts' or m in needed]
+    unit_metrics = needed - {'CPK_Grade'}
+    dtype = COMPACT_FLOAT if compact else np.float64
+
+    if df.empty or not profiles:
+        empty = np.empty((0, len(profiles)), dtype=dtype)
+        return MetricMatrix([], labels, profiles, {m: empty for m in kept}, empty.astype(object), metrics)
+
+    # Parse and expand once per roster content (the compiled roster is shared: never mutate it)
+    roster = compile_roster(df)
+    temp_df = roster.prepared(assume_half_range)
+    weapons = roster.weapons(assume_half_range)
+    codes = roster.codes(assume_half_range, deduplicate)
+    if assume_cover:
+        weapons = dict(weapons, cover=np.ones(len(temp_df), dtype=bool))
+    if compact:
+        weapons = compact_weapons(weapons)
+
+    # One kernel call for every (target, distinct profile) pair -> arrays shaped (targets, rows)
+    if allocation == 'average' and should_shard(len(temp_df), len(profiles), workers):
+        # Shards of targets x unit Names across a process pool (see parallel.py)
+        per_target = sharded_unit_metrics(temp_df, weapons, profiles, deduplicate, assume_half_range, workers,
+                                          unit_metrics)
+    elif allocation == 'average':
+        row_kills, row_damage = resolve_unique_weapons(weapons, compile_targets(profiles), assume_half_range)
+
+        # Resolve Profile IDs and aggregate per target
+        per_target = [
+            aggregate_unit_metrics(temp_df, row_kills[i], row_damage[i], profile, deduplicate, unit_metrics, codes)
+            for i, profile in enumerate(profiles)
+        ]
+    else:
+        # Model-by-model allocation needs each unit's weapons chained per target
+        per_target = [
+            unit_distributions(temp_df, weapons, profile, deduplicate, assume_half_range, allocation, codes)
+            for profile in profiles
+        ]
+
+    # Union of units across targets, in the same sorted order groupby uses
+    unit_keys = {}
+    for results in per_target:
+        for r in results:
+            unit_keys.setdefault((r['UnitID'], r['Name'], r['Loadout Group'], r['Qty']), None)
+
+    keys_df = pd.DataFrame(list(unit_keys), columns=UNIT_KEYS)
+    if not keys_df.empty:
+        keys_df = keys_df.sort_values(by=list(UNIT_KEYS), kind='stable')
+    units = keys_df.to_dict('records')
+    unit_rows = {tuple(u[k] for k in UNIT_KEYS): i for i, u in enumerate(units)}
+
+    shape = (len(units), len(profiles))
+    values = {m: np.full(shape, np.nan, dtype=dtype) for m in kept}
+    modes = np.full(shape, '', dtype=object)
+    with_modes = 'Weapon' in metrics
+
+    for col, results in enumerate(per_target):
+        for r in results:
+            row = unit_rows[(r['UnitID'], r['Name'], r['Loadout Group'], r['Qty'])]
+            for m in kept:
+                values[m][row, col] = r[m]
+            if with_modes:
+                modes[row, col] = r['Weapon']
+
+    return MetricMatrix(units, labels, profiles, values, modes, metrics)
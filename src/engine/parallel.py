@@ -0,0 +1,173 @@
+# src/engine/parallel.py
+
+"""
+Process-Pool Sharded Matrix Evaluation
+
+For batch jobs (a whole datasheet library against a long target list)
+calculate_matrix(..., workers=N) spreads the work over a process pool.
+
+The roster is prepared and compiled once in the parent. Everything the
+workers need then goes through multiprocessing.shared_memory instead of
+pickled DataFrames:
+
+- compiled weapon arrays and compiled target arrays, as-is
+- object columns (dice specs, and the roster columns used to resolve
+  Profile IDs and group units) as integer codes; only their table of
+  distinct values travels with each task
+
+Work is split into (target shard x unit-Name shard) tasks. Profile ID
+winners, duplicate profiles and unit groups are all resolved within a
+unit Name, so each task runs the normal kernel and aggregate_unit_metrics()
+on its slice and the merged results equal the in-process ones.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from .calculator import aggregate_unit_metrics, roster_codes
+from .kernel import compile_targets, resolve_unique_weapons
+
+# Rows x targets below which a pool costs more than it saves
+PARALLEL_MIN_CELLS = 20_000
+
+# Roster columns aggregate_unit_metrics() reads (when present)
+AGGREGATION_COLUMNS = (
+    'UnitID', 'Name', 'Loadout Group', 'Qty', 'Pts', 'Profile ID', 'Weapon',
+    'BS', 'S', 'AP', 'Keywords', '__attack_spec__', '__damage_spec__',
+)
+
+
+def resolve_workers(workers):
+    """Worker count for a workers knob (None = one per CPU)."""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def should_shard(n_rows, n_targets, workers):
+    """True if a workers knob and input size are worth a process pool."""
+    return resolve_workers(workers) > 1 and n_rows * n_targets >= PARALLEL_MIN_CELLS
+
+
+class SharedArrays:
+    """
+    Named numpy arrays copied into shared memory blocks.
+
+    Object arrays are stored as int64 codes; their distinct values are kept
+    in the (picklable) spec so workers can decode them. Missing values
+    (None / NaN) decode as NaN, which pandas groups and deduplicates alike.
+    """
+
+    def __init__(self, arrays):
+        self.blocks = []
+        self.spec = {}
+        try:
+            for name, values in arrays.items():
+                values = np.asarray(values)
+                uniques = None
+                if values.dtype == object:
+                    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+                    values = codes.astype(np.int64)
+                block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+                self.blocks.append(block)
+                np.ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+                self.spec[name] = (block.name, values.dtype.str, values.shape, uniques)
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _load(spec, rows=None):
+    """Copies (the selected rows of) shared arrays out of shared memory."""
+    arrays = {}
+    for name, (block_name, dtype, shape, uniques) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        view = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        values = view[rows] if rows is not None else view.copy()
+        del view
+        block.close()
+        arrays[name] = uniques.take(values) if uniques is not None else values
+    return arrays
+
+
+def _evaluate_shard(weapon_spec, roster_spec, target_spec, profiles, target_index,
+                    name_shard, n_name_shards, deduplicate, assume_half_range, metrics):
+    """One task: the rows of one unit-Name shard against a slice of targets."""
+    name_block, dtype, shape, _ = roster_spec['Name']
+    block = shared_memory.SharedMemory(name=name_block)
+    names = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    rows = np.flatnonzero(names % n_name_shards == name_shard)
+    del names
+    block.close()
+    if not len(rows):
+        return target_index, [[] for _ in target_index]
+
+    weapons = _load(weapon_spec, rows)
+    target = {field: col[target_index] for field, col in _load(target_spec).items()}
+    kills, damage = resolve_unique_weapons(weapons, target, assume_half_range)
+
+    temp_df = pd.DataFrame(_load(roster_spec, rows))
+    codes = roster_codes(temp_df, deduplicate)
+    results = [
+        aggregate_unit_metrics(temp_df, kills[i], damage[i], profiles[t], deduplicate, metrics, codes)
+        for i, t in enumerate(target_index)
+    ]
+    return target_index, results
+
+
+def sharded_unit_metrics(temp_df, weapons, profiles, deduplicate=True, assume_half_range=False, workers=None,
+                         metrics=None):
+    """
+    aggregate_unit_metrics() results for every target, computed across a process pool.
+
+    Parameters:
+    - temp_df: Roster from prepare_roster()
+    - weapons: compile_weapons(temp_df)
+    - profiles: List of target profile dicts
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, ignore target Stealth (range variants are already in temp_df)
+    - workers: Processes to use (None = one per CPU)
+    - metrics: calculator.RESULT_METRICS to compute (default: all)
+
+    Returns:
+    - List (one per target) of calculate_group_metrics()-style result lists
+    """
+    workers = resolve_workers(workers)
+    n_target_shards = min(len(profiles), workers)
+    n_name_shards = -(-workers // n_target_shards)
+
+    columns = [c for c in AGGREGATION_COLUMNS if c in temp_df.columns]
+    roster = {c: temp_df[c].to_numpy() for c in columns}
+    # Names are always stored as codes; tasks shard on code % n_name_shards
+    roster['Name'] = temp_df['Name'].to_numpy(dtype=object)
+
+    shared = [SharedArrays(weapons)]
+    try:
+        shared.append(SharedArrays(roster))
+        shared.append(SharedArrays(compile_targets(profiles)))
+        weapon_spec, roster_spec, target_spec = (s.spec for s in shared)
+
+        tasks = [
+            (weapon_spec, roster_spec, target_spec, profiles, list(target_index),
+             name_shard, n_name_shards, deduplicate, assume_half_range, metrics)
+            for target_index in np.array_split(np.arange(len(profiles)), n_target_shards)
+            for name_shard in range(n_name_shards)
+        ]
+        per_target = [[] for _ in profiles]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for target_index, results in pool.map(_evaluate_shard, *zip(*tasks)):
+                for t, target_results in zip(target_index, results):
+                    per_target[t].extend(target_results)
+        return per_target
+    finally:
+        for s in shared:
+            s.release()
@@ -0,0 +1,170 @@
+# src/engine/roster.py
+
+"""
+Compiled Rosters
+
+Roster columns are mixed strings end to end ('Y'/'N' flags, '3+' stats,
+'D6+2' dice, Melta as 'Y' or a number, Range as 'M' or inches). A
+CompiledRoster parses a roster once into typed columns that every engine
+entry point reuses:
+
+- prepared(): the prepare_roster() frame (range variants expanded, dice
+  parsed into DiceSpecs)
+- weapons(): compile_weapons() arrays with bool flags and int8 stats
+- codes(): roster_codes() integer keys for Profile ID modes, duplicate
+  profiles and result groups, which the engine aggregates on
+
+Both range bands (far / close) are built lazily on first use.
+
+compile_roster(df) returns the cached CompiledRoster for df's content. The
+cache is keyed by a fingerprint of the DataFrame's columns, dtypes and
+values, so editing the source (in place or by building a new frame) is a
+cache miss and the stale compile is never used. Compiled data is shared
+between callers and must not be mutated.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from .calculator import prepare_roster, roster_codes
+from .dice import compile_dice
+from .kernel import compile_weapons
+
+# Recently compiled rosters kept by compile_roster()
+MAX_COMPILED_ROSTERS = 16
+
+# compile_weapons() integer fields narrowed to int8 (stats are tiny; tables clip far below 127)
+INT8_FIELDS = ('bs', 's', 'ap', 'sustained', 'crit_hit', 'crit_wound', 'reroll_hit', 'reroll_wound')
+
+_cache = OrderedDict()  # fingerprint -> CompiledRoster, least recently used first
+_cache_lock = threading.Lock()
+
+
+def _column_hashes(series):
+    """uint64 hash per cell; object cells are hashed once per distinct value, with their type."""
+    if series.dtype != object:
+        return pd.util.hash_pandas_object(series, index=False).to_numpy()
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    text = np.array([f"{type(u).__name__}:{u}" for u in uniques], dtype=object)
+    return pd.util.hash_array(text)[codes]
+
+
+def roster_fingerprint(df):
+    """
+    Content hash of a roster DataFrame (columns, dtypes and values; not the index).
+
+    Object cells are hashed with their type, so 1, '1' and True differ.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    for col in range(df.shape[1]):
+        digest.update(_column_hashes(df.iloc[:, col]).tobytes())
+    return digest.hexdigest()
+
+
+def narrow_weapons(weapons):
+    """compile_weapons() arrays with INT8_FIELDS stored as int8 (values clipped to the int8 range)."""
+    info = np.iinfo(np.int8)
+    return {
+        field: np.clip(col, info.min, info.max).astype(np.int8) if field in INT8_FIELDS else col
+        for field, col in weapons.items()
+    }
+
+
+class CompiledRoster:
+    """
+    A roster parsed once into typed, engine-ready columns.
+
+    Attributes:
+        fingerprint: roster_fingerprint() of the source DataFrame
+        columns: Source column names
+    """
+
+    def __init__(self, df, fingerprint=None):
+        self.fingerprint = fingerprint or roster_fingerprint(df)
+        self.columns = list(df.columns)
+        self._source = df.copy()
+        self._bands = {}  # assume_half_range -> dict of compiled pieces
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._source)
+
+    @property
+    def empty(self):
+        return self._source.empty
+
+    def matches(self, df):
+        """True if df still has the content this roster was compiled from."""
+        return roster_fingerprint(df) == self.fingerprint
+
+    def _band(self, assume_half_range):
+        assume_half_range = bool(assume_half_range)
+        with self._lock:
+            band = self._bands.get(assume_half_range)
+            if band is None:
+                temp_df = prepare_roster(self._source, assume_half_range)
+                band = {'prepared': temp_df, 'weapons': narrow_weapons(compile_weapons(temp_df))}
+                self._bands[assume_half_range] = band
+            return band
+
+    def prepared(self, assume_half_range=False):
+        """The prepare_roster() frame for one range band (read-only)."""
+        return self._band(assume_half_range)['prepared']
+
+    def weapons(self, assume_half_range=False):
+        """The compile_weapons() arrays for prepared(assume_half_range) (read-only)."""
+        return self._band(assume_half_range)['weapons']
+
+    def codes(self, assume_half_range=False, deduplicate=True):
+        """The roster_codes() of prepared(assume_half_range) (read-only)."""
+        band = self._band(assume_half_range)
+        key = ('codes', bool(deduplicate))
+        with self._lock:
+            if key not in band:
+                band[key] = roster_codes(band['prepared'], deduplicate)
+            return band[key]
+
+    def invalid_dice(self):
+        """
+        Returns {'A': [...], 'D': [...]}: distinct non-blank source values that
+        are not dice expressions (the engine treats them as 0 attacks / damage).
+        """
+        invalid = {}
+        for col in ('A', 'D'):
+            values = self._source[col].dropna().unique() if col in self._source.columns else []
+            invalid[col] = [v for v in values if str(v).strip() != '' and compile_dice(v) is None]
+        return invalid
+
+
+def compile_roster(df):
+    """
+    Returns the CompiledRoster for df's current content (cached).
+
+    Parameters:
+    - df: Roster DataFrame, or a CompiledRoster (returned as-is)
+
+    Returns:
+    - CompiledRoster
+    """
+    if isinstance(df, CompiledRoster):
+        return df
+
+    fingerprint = roster_fingerprint(df)
+    with _cache_lock:
+        roster = _cache.pop(fingerprint, None)
+        if roster is None:
+            roster = CompiledRoster(df, fingerprint)
+        _cache[fingerprint] = roster
+        while len(_cache) > MAX_COMPILED_ROSTERS:
+            _cache.popitem(last=False)
+    return roster
+
+
+def clear_compiled_rosters():
+    """Drops every cached CompiledRoster."""
+    with _cache_lock:
+        _cache.clear()
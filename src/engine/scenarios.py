@@ -0,0 +1,85 @@
+# src/engine/scenarios.py
+
+"""
+Scenario-Flag Combinations
+
+Cover, half range and target Stealth are the toggles users flip most.
+calculate_scenarios() evaluates a roster under every combination of them
+in one pass instead of one calculate_group_metrics() call per toggle:
+
+- The roster is compiled once per range band (far / close, see roster.py),
+  and each band's weapons are stacked once without and once with cover.
+- The stacked rows go through the kernel once against the target with
+  Stealth off and on. Hash-consing resolves rows that no flag changes
+  (e.g. melee weapons, non-range weapons) only once.
+- Half range ignores Stealth, so close-range results are shared by both
+  Stealth settings.
+
+Only the Profile ID resolution and unit aggregation run per scenario.
+"""
+
+import itertools
+
+import numpy as np
+from .calculator import aggregate_unit_metrics
+from .distributions import unit_distributions
+from .kernel import compile_targets, resolve_unique_weapons
+from .roster import compile_roster
+
+SCENARIO_FLAGS = ('assume_cover', 'assume_half_range', 'stealth')
+
+# Every (assume_cover, assume_half_range, stealth) combination
+SCENARIOS = tuple(itertools.product((False, True), repeat=len(SCENARIO_FLAGS)))
+
+
+def calculate_scenarios(df, target_profile, deduplicate=True, allocation='average'):
+    """
+    Evaluates a roster under every combination of SCENARIO_FLAGS.
+
+    Parameters:
+    - df: DataFrame with weapon data (any '__assume_cover__' column is overridden)
+    - target_profile: Target stats dict (its Stealth is overridden)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - allocation: 'average' (default) or 'exact' model-by-model kills, see calculate_group_metrics()
+
+    Returns:
+    - Dict of (assume_cover, assume_half_range, stealth) -> results in
+      calculate_group_metrics() format, one entry per SCENARIOS key
+    """
+    if df.empty:
+        return {key: [] for key in SCENARIOS}
+
+    # Far and close rosters have the same rows in the same order
+    roster = compile_roster(df)
+    rosters = {half: roster.prepared(half) for half in (False, True)}
+    codes = {half: roster.codes(half, deduplicate) for half in (False, True)}
+    n_rows = len(rosters[False])
+    variants = [(cover, half) for half in (False, True) for cover in (False, True)]
+    blocks = [dict(roster.weapons(half), cover=np.full(n_rows, cover)) for cover, half in variants]
+    weapons = {field: np.concatenate([b[field] for b in blocks]) for field in blocks[0]}
+    targets = [dict(target_profile, Stealth='Y' if stealth else 'N') for stealth in (False, True)]
+
+    if allocation == 'average':
+        # Half range ignores Stealth, so one kernel call without it covers every variant
+        kills, damage = resolve_unique_weapons(weapons, compile_targets(targets))
+
+    results = {}
+    for v, (cover, half) in enumerate(variants):
+        block = slice(v * n_rows, (v + 1) * n_rows)
+        for stealth in ((False,) if half else (False, True)):
+            if allocation == 'average':
+                scenario = aggregate_unit_metrics(rosters[half], kills[int(stealth), block],
+                                                  damage[int(stealth), block], targets[stealth], deduplicate,
+                                                  codes=codes[half])
+            else:
+                block_weapons = {field: col[block] for field, col in weapons.items()}
+                scenario = unit_distributions(rosters[half], block_weapons, targets[stealth],
+                                              deduplicate, half, allocation, codes[half])
+                for r in scenario:
+                    del r['Distribution']
+            results[(cover, half, stealth)] = scenario
+
+        if half:
+            results[(cover, half, True)] = [dict(r) for r in results[(cover, half, False)]]
+
+    return {key: results[key] for key in SCENARIOS}
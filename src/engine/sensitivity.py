@@ -0,0 +1,189 @@
+# src/engine/sensitivity.py
+
+"""
+Stat Sensitivity Analysis
+
+How much does each unit gain from one more attack, +1 to hit, +1 S, one
+more point of AP or +1 D? calculate_sensitivity() answers that for a whole
+roster and target list at once:
+
+- The roster is prepared and compiled once.
+- Each perturbation is applied to the compiled weapon arrays, and the
+  base and perturbed copies are stacked into one batch.
+- The batch goes through the kernel in a single call against every
+  target. Hash-consing collapses rows a perturbation does not change.
+
+Each block is then aggregated like calculate_group_metrics() (Profile ID
+winners are re-picked, since a buff can change the best mode). The
+result is a units x stats x targets table of metric changes.
+"""
+
+import numpy as np
+import pandas as pd
+from .calculator import aggregate_unit_metrics
+from .dice import DiceSpec
+from .kernel import compile_targets, resolve_unique_weapons, map_unique, _spec_value
+from .matrix import UNIT_KEYS, _normalize_targets
+from .roster import compile_roster
+
+# Stat -> change to the compiled value for a one-step improvement
+PERTURBATIONS = {
+    'A': 1,    # One more attack
+    'BS': -1,  # +1 to hit (3+ -> 2+; never better than 2+)
+    'S': 1,    # +1 Strength
+    'AP': -1,  # One more point of AP (-1 -> -2)
+    'D': 1,    # +1 Damage
+}
+
+METRICS = ('Kills', 'Damage', 'CPK')
+
+
+class SensitivityTable:
+    """
+    Per-unit metric changes from one-step stat improvements.
+
+    Attributes:
+        units: List of unit key dicts ('UnitID', 'Name', 'Loadout Group', 'Qty')
+        stats: List of perturbed stats (PERTURBATIONS keys)
+        targets: List of target labels
+        base: Dict of metric -> np.ndarray shaped (units, targets)
+        delta: Dict of metric -> np.ndarray shaped (units, stats, targets),
+               perturbed minus base. CPK changes are NaN where either side
+               has no kills (CPK 999.0).
+    """
+
+    def __init__(self, units, stats, targets, base, delta):
+        self.units = units
+        self.stats = stats
+        self.targets = targets
+        self.base = base
+        self.delta = delta
+
+    def __getitem__(self, metric):
+        return self.delta[metric]
+
+    def to_frame(self, metric, target):
+        """
+        Returns one metric's changes against one target as a DataFrame
+        (index: 'Name [Loadout Group]' unit labels, columns: stats).
+        """
+        labels = [f"{u['Name']} [{u['Loadout Group']}]" for u in self.units]
+        col = self.targets.index(target)
+        return pd.DataFrame(self.delta[metric][:, :, col], index=labels, columns=self.stats)
+
+
+    def to_records(self):
+        """
+        Returns one JSON-friendly dict per unit: its key fields plus
+        'base' ({target: {metric: value}}) and 'delta'
+        ({stat: {target: {metric: change}}}). NaN becomes None.
+        """
+        def cell(values, index):
+            return {m: (None if np.isnan(values[m][index]) else float(values[m][index])) for m in METRICS}
+
+        return [
+            dict(unit,
+                 base={target: cell(self.base, (u, t)) for t, target in enumerate(self.targets)},
+                 delta={stat: {target: cell(self.delta, (u, s, t)) for t, target in enumerate(self.targets)}
+                        for s, stat in enumerate(self.stats)})
+            for u, unit in enumerate(self.units)
+        ]
+
+
+def perturb_weapons(weapons, stat, step=None):
+    """
+    Returns a copy of compiled weapons with one stat improved.
+
+    Args:
+        weapons: Dict of arrays from compile_weapons()
+        stat: PERTURBATIONS key
+        step: Change to apply (default: PERTURBATIONS[stat])
+    """
+    step = PERTURBATIONS[stat] if step is None else step
+    perturbed = dict(weapons)
+
+    if stat in ('A', 'D'):
+        prefix = stat.lower()
+        specs = map_unique(pd.Series(weapons[f'{prefix}_spec'], dtype=object),
+                           lambda spec: spec.offset(step) if isinstance(spec, DiceSpec) else spec, dtype=object)
+        perturbed[f'{prefix}_spec'] = specs
+        fields = ('mean', 'min', 'max') if prefix == 'a' else ('mean',)
+        for field in fields:
+            perturbed[f'{prefix}_{field}'] = map_unique(pd.Series(specs, dtype=object),
+                                                        lambda spec: _spec_value(spec, field))
+    elif stat == 'BS':
+        bs = weapons['bs']
+        perturbed['bs'] = np.where(bs + step >= 2, bs + step, np.minimum(bs, 2))
+    else:
+        perturbed[stat.lower()] = weapons[stat.lower()] + step
+
+    return perturbed
+
+
+def calculate_sensitivity(df, targets, stats=None, deduplicate=True, assume_half_range=False):
+    """
+    Evaluates every one-step stat improvement for every unit and target.
+
+    Parameters:
+    - df: DataFrame with weapon data
+    - targets: Dict of {label: target profile} or list of target profiles
+    - stats: Stats to perturb (default: every PERTURBATIONS key)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+
+    Returns:
+    - SensitivityTable
+    """
+    labels, profiles = _normalize_targets(targets)
+    stats = list(PERTURBATIONS if stats is None else stats)
+    unknown = [s for s in stats if s not in PERTURBATIONS]
+    if unknown:
+        raise ValueError(f"Unknown stats: {unknown} (expected {list(PERTURBATIONS)})")
+
+    if df.empty or not profiles:
+        return SensitivityTable([], stats, labels,
+                                {m: np.empty((0, len(profiles))) for m in METRICS},
+                                {m: np.empty((0, len(stats), len(profiles))) for m in METRICS})
+
+    roster = compile_roster(df)
+    temp_df = roster.prepared(assume_half_range)
+    weapons = roster.weapons(assume_half_range)
+    codes = roster.codes(assume_half_range, deduplicate)
+    blocks = [weapons] + [perturb_weapons(weapons, stat) for stat in stats]
+    stacked = {field: np.concatenate([b[field] for b in blocks]) for field in weapons}
+
+    # One kernel call: (targets, (1 + stats) * rows)
+    kills, damage = resolve_unique_weapons(stacked, compile_targets(profiles), assume_half_range)
+    n_rows = len(temp_df)
+
+    # results[b][t] = calculate_group_metrics()-style results for block b, target t
+    results = [
+        [aggregate_unit_metrics(temp_df, kills[t, b * n_rows:(b + 1) * n_rows],
+                                damage[t, b * n_rows:(b + 1) * n_rows], profile, deduplicate, codes=codes)
+         for t, profile in enumerate(profiles)]
+        for b in range(len(blocks))
+    ]
+
+    # Grouping keys do not depend on stats, so every block has the same units
+    unit_keys = {}
+    for per_target in results[0]:
+        for r in per_target:
+            unit_keys.setdefault(tuple(r[k] for k in UNIT_KEYS), None)
+    keys_df = pd.DataFrame(list(unit_keys), columns=UNIT_KEYS).sort_values(by=list(UNIT_KEYS), kind='stable')
+    units = keys_df.to_dict('records')
+    unit_rows = {tuple(u[k] for k in UNIT_KEYS): i for i, u in enumerate(units)}
+
+    values = {m: np.full((len(blocks), len(units), len(profiles)), np.nan) for m in METRICS}
+    for b, per_target in enumerate(results):
+        for t, block_results in enumerate(per_target):
+            for r in block_results:
+                row = unit_rows[tuple(r[k] for k in UNIT_KEYS)]
+                for m in METRICS:
+                    values[m][b, row, t] = r[m]
+
+    base = {m: values[m][0] for m in METRICS}
+
+    # No kills = the 999.0 CPK sentinel, which has no meaningful difference
+    values['CPK'] = np.where(values['Kills'] > 0, values['CPK'], np.nan)
+    delta = {m: np.moveaxis(values[m][1:] - values[m][0], 0, 1) for m in METRICS}
+    return SensitivityTable(units, stats, labels, base, delta)
@@ -0,0 +1,221 @@
+# src/engine/session.py
+
+"""
+Incremental Engine Session
+
+An EngineSession keeps the results of the last roster it evaluated so an
+editor only pays for what an edit touched:
+
+- Row results are cached by a hash of the prepared row's content, so only
+  new or edited rows go through the kernel (once per row, for every
+  target at the same time).
+- Unit results are cached per unit Name. Profile ID winners and
+  duplicate profiles are resolved within a Name, so only Names with a
+  changed, added or removed row are re-aggregated.
+- Army totals are re-summed from the cached unit results.
+
+update() returns a SessionDelta with the units that changed, the units
+that disappeared and the new totals. results() returns the full result
+list in calculate_group_metrics() format.
+"""
+
+import numpy as np
+import pandas as pd
+from .calculator import prepare_roster, aggregate_unit_metrics, roster_codes
+from .kernel import compile_weapons, compile_targets, resolve_unique_weapons
+from .matrix import _normalize_targets
+
+# Parsed dice columns added by prepare_roster(); hashed by their text form
+_SPEC_COLUMNS = ('__attack_spec__', '__damage_spec__')
+
+
+def row_hashes(temp_df):
+    """
+    Content hash of every prepared roster row (same content = same hash).
+
+    Args:
+        temp_df: Roster from prepare_roster()
+
+    Returns:
+        np.ndarray of uint64, one per row
+    """
+    if temp_df.empty:
+        return np.empty(0, dtype=np.uint64)
+
+    hashable = temp_df.copy()
+    for col in hashable.columns:
+        if col in _SPEC_COLUMNS or hashable[col].dtype == object:
+            codes, uniques = pd.factorize(hashable[col], use_na_sentinel=False)
+            hashable[col] = np.array([str(u) for u in uniques], dtype=object)[codes]
+    return pd.util.hash_pandas_object(hashable, index=False).to_numpy()
+
+
+class SessionDelta:
+    """
+    What one EngineSession.update() changed.
+
+    Attributes:
+        rows_resolved: Rows that went through the kernel (new or edited content)
+        names_changed: Unit Names that were re-aggregated
+        updated: Dict of target label -> list of new / changed unit results
+        removed: Dict of target label -> list of unit keys (UnitID, Name,
+                 Loadout Group[, Qty]) that no longer exist
+        totals: Dict of target label -> {'Kills', 'Damage', 'Pts'} army totals
+    """
+
+    def __init__(self, rows_resolved, names_changed, updated, removed, totals):
+        self.rows_resolved = rows_resolved
+        self.names_changed = names_changed
+        self.updated = updated
+        self.removed = removed
+        self.totals = totals
+
+    @property
+    def is_empty(self):
+        """True if the update changed no unit results."""
+        return not any(self.updated.values()) and not any(self.removed.values())
+
+    def to_dict(self):
+        """JSON-friendly form (unit keys become lists)."""
+        return {
+            'rows_resolved': self.rows_resolved,
+            'names_changed': list(self.names_changed),
+            'updated': self.updated,
+            'removed': {label: [list(k) for k in keys] for label, keys in self.removed.items()},
+            'totals': self.totals,
+        }
+
+
+class EngineSession:
+    """
+    Incremental calculate_group_metrics() for one target list.
+
+    Parameters:
+    - targets: Dict of {label: target profile} or list of target profiles
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+    """
+
+    def __init__(self, targets, deduplicate=True, assume_half_range=False):
+        self.labels, self.profiles = _normalize_targets(targets)
+        self.deduplicate = deduplicate
+        self.assume_half_range = assume_half_range
+        self._targets = compile_targets(self.profiles)
+
+        self._row_cache = {}   # row hash -> (kills, damage) arrays shaped (targets,)
+        self._name_rows = {}   # Name -> tuple of row hashes from the last update
+        self._units = {}       # Name -> list (per target) of unit result lists
+
+    def update(self, df):
+        """
+        Evaluates df, reusing everything the previous update already computed.
+
+        Args:
+            df: Roster DataFrame (same format as calculate_group_metrics())
+
+        Returns:
+            SessionDelta
+        """
+        temp_df = prepare_roster(df, self.assume_half_range) if not df.empty else df
+        hashes = row_hashes(temp_df)
+
+        # 1. Rows: only content the cache has not seen goes through the kernel
+        rows_resolved = self._resolve_rows(temp_df, hashes)
+
+        # 2. Names whose row set changed (or disappeared) get re-aggregated
+        names = temp_df['Name'].to_numpy() if 'Name' in temp_df.columns else np.full(len(temp_df), None)
+        name_rows = {}
+        for name, h in zip(names, hashes.tolist()):
+            name_rows.setdefault(name, []).append(h)
+        name_rows = {name: tuple(rows) for name, rows in name_rows.items()}
+
+        changed = [n for n, rows in name_rows.items() if self._name_rows.get(n) != rows]
+        gone = [n for n in self._name_rows if n not in name_rows]
+        self._name_rows = name_rows
+
+        old_units = {n: self._units.pop(n, None) for n in changed + gone}
+        if changed:
+            self._aggregate(temp_df, hashes, names, changed)
+
+        # Keep the cache to rows still in the roster so it does not grow forever
+        live = set(hashes.tolist())
+        self._row_cache = {h: v for h, v in self._row_cache.items() if h in live}
+
+        return self._delta(rows_resolved, changed + gone, old_units)
+
+    def results(self, target=None):
+        """
+        Current results for one target in calculate_group_metrics() format.
+
+        Args:
+            target: Target label (default: the first target)
+        """
+        col = 0 if target is None else self.labels.index(target)
+        return self._sorted([r for units in self._units.values() for r in units[col]])
+
+    def totals(self, target=None):
+        """Army totals ({'Kills', 'Damage', 'Pts'}) for one target label."""
+        return self._totals(0 if target is None else self.labels.index(target))
+
+    # --- internals ---
+
+    def _resolve_rows(self, temp_df, hashes):
+        missing = {}
+        for i, h in enumerate(hashes.tolist()):
+            if h not in self._row_cache and h not in missing:
+                missing[h] = i
+        if not missing:
+            return 0
+
+        rows = temp_df.iloc[list(missing.values())]
+        kills, damage = resolve_unique_weapons(compile_weapons(rows), self._targets, self.assume_half_range)
+        for j, h in enumerate(missing):
+            self._row_cache[h] = (kills[:, j], damage[:, j])
+        return len(missing)
+
+    def _aggregate(self, temp_df, hashes, names, changed):
+        mask = pd.Series(names).isin(changed).to_numpy()
+        sub_df = temp_df[mask]
+        cached = [self._row_cache[h] for h in hashes[mask].tolist()]
+        row_kills = np.array([k for k, _ in cached]).reshape(len(cached), -1).T
+        row_damage = np.array([d for _, d in cached]).reshape(len(cached), -1).T
+
+        codes = roster_codes(sub_df, self.deduplicate)
+        for name in changed:
+            self._units[name] = [[] for _ in self.profiles]
+        for col, profile in enumerate(self.profiles):
+            for result in aggregate_unit_metrics(sub_df, row_kills[col], row_damage[col], profile, self.deduplicate,
+                                                 codes=codes):
+                self._units[result['Name']][col].append(result)
+
+    def _unit_key(self, result):
+        key = (result['UnitID'], result['Name'], result['Loadout Group'])
+        return key if self.deduplicate else key + (result['Qty'],)
+
+    def _sorted(self, results):
+        # calculate_group_metrics() lists units in groupby (sorted key) order
+        try:
+            return sorted(results, key=self._unit_key)
+        except TypeError:
+            return sorted(results, key=lambda r: tuple(map(str, self._unit_key(r))))
+
+    def _totals(self, col):
+        results = [r for units in self._units.values() for r in units[col]]
+        return {
+            'Kills': float(sum(r['Kills'] for r in results)),
+            'Damage': float(sum(r['Damage'] for r in results)),
+            'Pts': int(sum(r['Pts'] * r['Qty'] for r in results)),
+        }
+
+    def _delta(self, rows_resolved, names, old_units):
+        updated, removed = {}, {}
+        for col, label in enumerate(self.labels):
+            before = {self._unit_key(r): r for units in old_units.values() if units for r in units[col]}
+            after = [r for n in names for r in (self._units.get(n) or [[] for _ in self.labels])[col]]
+
+            updated[label] = self._sorted([r for r in after if before.get(self._unit_key(r)) != r])
+            keys_after = {self._unit_key(r) for r in after}
+            removed[label] = sorted((k for k in before if k not in keys_after), key=lambda k: tuple(map(str, k)))
+
+        totals = {label: self._totals(col) for col, label in enumerate(self.labels)}
+        return SessionDelta(rows_resolved, names, updated, removed, totals)
@@ -0,0 +1,282 @@
+# src/engine/simulation.py
+
+"""
+Monte Carlo Simulation Engine
+
+Rolls every attack sequence with real dice instead of multiplying
+probabilities, so it captures the rule interactions the closed-form
+engine only approximates: damage carry-over between models, Feel No Pain
+per point of damage, rerolls (RR_H / RR_W / Twin-Linked) that can still
+crit, and Torrent weapons never scoring critical hits.
+
+Trials are rolled as NumPy arrays in chunks. Every chunk gets its own
+child seed from one np.random.SeedSequence, so a fixed seed gives the
+same numbers whether chunks run in-process or across a process pool.
+
+simulate_group_metrics() takes the same roster DataFrame and target dict
+as calculate_group_metrics() and returns the same rows with the simulated
+mean, standard deviation and confidence interval added.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+from . import tables
+from .calculator import resolve_active_rows, summarize_units
+from .dice import DiceSpec
+from .kernel import compile_target, resolve_unique_weapons, stage_probabilities
+from .roster import compile_roster
+
+DEFAULT_TRIALS = 100_000
+DEFAULT_CHUNK_SIZE = 20_000
+
+
+def _dice_plan(spec, blast_mode=0):
+    """Returns (count, faces, modifier) for rolling a spec (Blast fixes attacks at min/max)."""
+    if not isinstance(spec, DiceSpec):
+        return (0, 0, 0)
+    if blast_mode == 2:
+        return (0, 0, spec.max)
+    if blast_mode == 1:
+        return (0, 0, spec.min)
+    return (spec.count, spec.faces, spec.modifier)
+
+
+def _roll(rng, plan, shape):
+    """Rolls a (count, faces, modifier) plan; totals are whole numbers >= 0."""
+    count, faces, modifier = plan
+    total = np.full(shape, modifier, dtype=float)
+    if count:
+        total = total + rng.integers(1, faces + 1, size=shape + (count,)).sum(axis=-1)
+    return np.maximum(total, 0).astype(np.int64)
+
+
+def _d6(rng, shape):
+    return rng.integers(1, 7, size=shape)
+
+
+def _apply_fnp(rng, damage, fnp_target, max_damage):
+    """Feel No Pain: each point of damage is ignored on a roll of fnp_target+."""
+    if fnp_target > 6 or max_damage <= 0:
+        return damage
+    rolls = _d6(rng, damage.shape + (max_damage,))
+    points = np.arange(max_damage) < damage[..., None]
+    return damage - ((rolls >= fnp_target) & points).sum(axis=-1)
+
+
+def _roll_d6_test(rng, shape, target, crit, reroll):
+    """
+    Rolls D6s that succeed on target+ (a 1 always fails) or on a critical.
+
+    Returns:
+        (success, critical) bool arrays after any reroll (tables.py reroll index)
+    """
+    roll = _d6(rng, shape)
+    if reroll == tables.REROLL_ONES:
+        roll = np.where((roll == 1) & (crit > 1), _d6(rng, shape), roll)
+    critical = roll >= crit
+    success = critical | ((roll > 1) & (roll >= target))
+    if reroll == tables.REROLL_FAILS:
+        again = _d6(rng, shape)
+        critical = np.where(success, critical, again >= crit)
+        success = success | (again >= crit) | ((again > 1) & (again >= target))
+    return success, critical
+
+
+def _roll_row(rng, row, trials):
+    """
+    Rolls one weapon row for `trials` trials.
+
+    Returns:
+        (normal, mortal): int arrays shaped (trials, events) of damage per
+        unsaved wound / per Devastating Wounds mortal, 0 where nothing landed
+    """
+    attacks_plan, damage_plan = row['attacks'], row['damage']
+    max_attacks = int(max(0, attacks_plan[0] * attacks_plan[1] + attacks_plan[2]))
+    max_damage = int(max(0, damage_plan[0] * damage_plan[1] + damage_plan[2]))
+    if max_attacks == 0:
+        empty = np.zeros((trials, 0), dtype=np.int64)
+        return empty, empty
+
+    attacks = _roll(rng, attacks_plan, (trials,))
+    swings = np.arange(max_attacks) < attacks[:, None]
+
+    # 1. Hit rolls (Torrent skips the roll, so it never crits)
+    if row['torrent']:
+        crit_hit = np.zeros_like(swings)
+        hit = swings
+    else:
+        hit, crit_hit = _roll_d6_test(rng, swings.shape, row['hit_target'], row['crit_hit'], row['reroll_hit'])
+        hit &= swings
+        crit_hit &= swings
+
+    auto_wound = crit_hit if row['lethal'] else np.zeros_like(crit_hit)
+    wound_rolls = (hit & ~auto_wound).astype(np.int64) + crit_hit * row['sustained']
+
+    # 2. Wound rolls (RR_W / Twin-Linked reroll)
+    slots = np.arange(1 + row['sustained']) < wound_rolls[..., None]
+    wounded, crit_wound = _roll_d6_test(rng, slots.shape, row['wound_target'], row['crit_wound'], row['reroll_wound'])
+    wounded &= slots
+
+    mortal_hit = wounded & crit_wound if row['dev'] else np.zeros_like(wounded)
+    saves_needed = np.concatenate([
+        (wounded & ~mortal_hit).reshape(trials, -1), auto_wound.reshape(trials, -1)
+    ], axis=1)
+    mortal_hit = mortal_hit.reshape(trials, -1)
+
+    # 3. Saves (a roll of 1 always fails)
+    roll = _d6(rng, saves_needed.shape)
+    unsaved = saves_needed & ((roll == 1) | (roll < row['save_target']))
+
+    # 4. Damage and Feel No Pain per point
+    normal = _apply_fnp(rng, _roll(rng, damage_plan, unsaved.shape), row['fnp_target'], max_damage) * unsaved
+    mortal = _apply_fnp(rng, _roll(rng, damage_plan, mortal_hit.shape), row['fnp_target'], max_damage) * mortal_hit
+    return normal, mortal
+
+
+def _allocate(normal, mortal, kills, taken, unit_size, model_w):
+    """
+    Allocates damage model by model. Normal damage is lost when a model
+    dies; mortal wounds carry over to the next model.
+    """
+    for dmg in normal.T:
+        taken = taken + dmg * (kills < unit_size)
+        dead = taken >= model_w
+        kills = kills + dead
+        taken = np.where(dead, 0, taken)
+    for dmg in mortal.T:
+        taken = taken + dmg * (kills < unit_size)
+        kills = np.minimum(kills + taken // model_w, unit_size)
+        taken = np.where(kills < unit_size, taken % model_w, 0)
+    return kills, taken
+
+
+def _simulate_chunk(units, target, trials, seed):
+    """
+    Simulates every unit for one chunk of trials.
+
+    Returns:
+        np.ndarray shaped (units, 4): sum and sum of squares of kills and damage
+    """
+    rng = np.random.default_rng(seed)
+    unit_size, model_w = target
+    totals = np.zeros((len(units), 4))
+
+    for u, rows in enumerate(units):
+        kills = np.zeros(trials, dtype=np.int64)
+        taken = np.zeros(trials, dtype=np.int64)
+        damage = np.zeros(trials, dtype=np.int64)
+        for row in rows:
+            normal, mortal = _roll_row(rng, row, trials)
+            kills, taken = _allocate(normal, mortal, kills, taken, unit_size, model_w)
+            damage += normal.sum(axis=1) + mortal.sum(axis=1)
+
+        totals[u] = (kills.sum(), (kills.astype(float) ** 2).sum(),
+                     damage.sum(), (damage.astype(float) ** 2).sum())
+    return totals
+
+
+def _row_plans(weapons, target, assume_half_range):
+    """Per-row roll plans (plain Python values, so they pickle cheaply)."""
+    p = {k: np.broadcast_to(v, weapons['bs'].shape) for k, v in
+         stage_probabilities(weapons, target, assume_half_range).items()}
+
+    return [
+        {
+            'attacks': _dice_plan(weapons['a_spec'][i], int(p['blast_mode'][i])),
+            'damage': _dice_plan(weapons['d_spec'][i]),
+            'torrent': bool(weapons['torrent'][i]),
+            'hit_target': int(p['hit_target'][i]),
+            'reroll_hit': int(p['hit_reroll'][i]),
+            'crit_hit': int(weapons['crit_hit'][i]),
+            'lethal': bool(weapons['lethal'][i]),
+            'sustained': int(weapons['sustained'][i]),
+            'wound_target': int(p['wound_target'][i]),
+            'crit_wound': int(weapons['crit_wound'][i]),
+            'reroll_wound': int(p['wound_reroll'][i]),
+            'dev': bool(weapons['dev'][i]),
+            'save_target': int(p['save_target'][i]),
+            'fnp_target': int(p['fnp_target'][i]),
+        }
+        for i in range(len(weapons['bs']))
+    ]
+
+
+def simulate_group_metrics(df, target_profile, deduplicate=True, assume_half_range=False,
+                           trials=DEFAULT_TRIALS, seed=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                           workers=1, confidence=0.95):
+    """
+    Monte Carlo version of calculate_group_metrics().
+
+    Profile ID modes and duplicates are resolved exactly as in
+    calculate_group_metrics(); each unit's active weapons (Qty copies when
+    not deduplicating) then fire at one fresh target unit per trial.
+
+    Parameters:
+    - df: DataFrame with weapon data
+    - target_profile: Target stats dict
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+    - trials: Number of simulated attack sequences per unit
+    - seed: Seed for reproducible results (None = fresh entropy)
+    - chunk_size: Trials rolled per NumPy batch
+    - workers: Processes to spread chunks over (1 = run in-process)
+    - confidence: Confidence level of the reported intervals
+
+    Returns:
+    - List of calculate_group_metrics() result dicts with extra keys
+      Sim_Kills, Sim_Kills_Std, Sim_Kills_CI, Sim_Damage, Sim_Damage_Std,
+      Sim_Damage_CI (CI = (low, high) for the mean) and Trials
+    """
+    if df.empty:
+        return []
+    if trials < 2:
+        raise ValueError("trials must be at least 2")
+
+    roster = compile_roster(df)
+    temp_df = roster.prepared(assume_half_range)
+    temp_df = temp_df.assign(__row__=np.arange(len(temp_df)))
+
+    weapons = roster.weapons(assume_half_range)
+    target = compile_target(target_profile)
+    row_kills, row_damage = resolve_unique_weapons(weapons, target, assume_half_range)
+    plans = _row_plans(weapons, target, assume_half_range)
+
+    work_df = resolve_active_rows(temp_df, row_kills, row_damage, deduplicate,
+                                  roster.codes(assume_half_range, deduplicate))
+    results = summarize_units(work_df, target_profile, deduplicate)
+
+    # summarize_units() groups by the same unit codes, so groups line up with results
+    units = []
+    for _, rows in work_df[work_df['__unit__'] >= 0].groupby('__unit__'):
+        unit = []
+        for row, qty in zip(rows['__row__'], rows['Qty']):
+            unit.extend([plans[row]] * (1 if deduplicate else int(qty)))
+        units.append(unit)
+
+    shape = (max(1, int(target['unit_size'])), int(target['w']))
+    sizes = [min(chunk_size, trials - start) for start in range(0, trials, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, [units] * len(sizes), [shape] * len(sizes), sizes, seeds))
+    else:
+        chunks = [_simulate_chunk(units, shape, n, s) for n, s in zip(sizes, seeds)]
+
+    totals = np.sum(chunks, axis=0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    for result, (k_sum, k_sq, d_sum, d_sq) in zip(results, totals):
+        for name, total, total_sq in (('Kills', k_sum, k_sq), ('Damage', d_sum, d_sq)):
+            mean = float(total / trials)
+            std = math.sqrt(max(0.0, (total_sq - trials * mean ** 2) / (trials - 1)))
+            margin = z * std / math.sqrt(trials)
+            result[f'Sim_{name}'] = mean
+            result[f'Sim_{name}_Std'] = std
+            result[f'Sim_{name}_CI'] = (mean - margin, mean + margin)
+        result['Trials'] = trials
+
+    return results
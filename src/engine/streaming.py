@@ -0,0 +1,103 @@
+# src/engine/streaming.py
+
+"""
+Streaming Evaluation
+
+iter_group_metrics() evaluates a very large roster or datasheet library in
+fixed-size chunks of rows and yields unit results one at a time, instead of
+building the whole expanded roster, its intermediate copies and the full
+result list like calculate_group_metrics().
+
+Unit groups, Profile ID winners and duplicate profiles are all resolved
+within a unit Name. Each chunk therefore evaluates every Name it finishes
+and carries the rows of its last Name over to the next chunk, so a unit
+whose rows straddle a chunk boundary is still aggregated as one unit.
+Memory is bounded by the chunk size plus the rows of one unit.
+
+Rows of one Name must be contiguous (e.g. a library sorted by Name),
+otherwise ValueError is raised. A DataFrame is checked before any result is
+yielded; caller-supplied chunks are checked as each one arrives, before any
+of its units are evaluated.
+"""
+
+import numpy as np
+import pandas as pd
+from .calculator import prepare_roster, aggregate_unit_metrics
+from .kernel import compile_weapons, compile_target, resolve_unique_weapons
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _check_contiguous(names, evaluated):
+    """Raises ValueError if a Name has split runs of rows or was already evaluated."""
+    codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    runs = codes[np.r_[True, codes[1:] != codes[:-1]]]
+    repeated = set(uniques[runs[pd.Series(runs).duplicated().to_numpy()]]) | (set(uniques) & evaluated)
+    if repeated:
+        raise ValueError(f"Rows for unit {sorted(map(str, repeated))[0]!r} are not contiguous "
+                         f"(sort the rows by Name before streaming)")
+
+
+def _chunks(rows, chunk_size):
+    """DataFrame slices of chunk_size rows, or the caller's own chunks."""
+    if isinstance(rows, pd.DataFrame):
+        for start in range(0, len(rows), chunk_size):
+            yield rows.iloc[start:start + chunk_size]
+    else:
+        yield from rows
+
+
+def iter_group_metrics(rows, target_profile, deduplicate=True, assume_half_range=False,
+                       chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields calculate_group_metrics() results chunk by chunk.
+
+    Parameters:
+    - rows: DataFrame with weapon data, or an iterable of DataFrame chunks
+            (e.g. pd.read_csv(path, chunksize=...))
+    - target_profile: Target stats dict
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+    - chunk_size: Rows per chunk when rows is a DataFrame
+
+    Yields:
+    - One result dict per unit, in calculate_group_metrics() format. Units
+      come in chunk order (sorted within each chunk), not globally sorted.
+    """
+    target = compile_target(target_profile)
+    evaluated = set()
+    # A DataFrame is checked once up front; caller chunks as they arrive
+    checked = isinstance(rows, pd.DataFrame)
+    if checked:
+        _check_contiguous(rows['Name'].to_numpy(), evaluated)
+
+    def evaluate(frames):
+        df = pd.concat(frames, ignore_index=True)
+        evaluated.update(df['Name'].unique())
+        temp_df = prepare_roster(df, assume_half_range)
+        row_kills, row_damage = resolve_unique_weapons(compile_weapons(temp_df), target, assume_half_range)
+        return aggregate_unit_metrics(temp_df, row_kills, row_damage, target_profile, deduplicate)
+
+    # Rows of the last Name seen, which may continue in the next chunk (kept as
+    # a list so a unit spanning many chunks is concatenated once, not per chunk)
+    pending = []
+    for chunk in _chunks(rows, chunk_size):
+        if chunk.empty:
+            continue
+        names = chunk['Name'].to_numpy()
+        if not checked:
+            # Lead with the pending Name so only a direct continuation of it is allowed
+            _check_contiguous(np.r_[pending[0]['Name'].to_numpy()[:1], names] if pending else names, evaluated)
+
+        trailing = names == names[-1]
+        if trailing.all():
+            if pending and pending[0]['Name'].iloc[0] != names[-1]:
+                yield from evaluate(pending)
+                pending = []
+            pending.append(chunk)
+        else:
+            yield from evaluate(pending + [chunk[~trailing]])
+            pending = [chunk[trailing]]
+
+    if pending:
+        yield from evaluate(pending)
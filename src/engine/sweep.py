@@ -0,0 +1,183 @@
+# src/engine/sweep.py
+
+"""
+Stat-Space Parameter Sweeps
+
+sweep_profiles() evaluates a grid of hypothetical weapon profiles, e.g.
+S 3..14 x AP 0..-4 x D {1, 2, D3, D6}, against a target list and returns
+the expected kills / damage / CPK cube for heatmaps ("what profile is
+efficient against this meta?").
+
+Each axis value is parsed once with compile_weapons(), so sweep values
+use the same syntax as roster cells ('3+', 'D6+1', 'Y'). The grid itself
+is never built as a DataFrame: cells are generated in fixed-size chunks
+by gathering the pre-compiled axis values, and each chunk goes through
+resolve_weapons() against every target at once. Memory stays bounded by
+the chunk size and the output cubes, which are filled chunk by chunk.
+
+compact=True stores the axes in compact encodings and evaluates in
+float32 (see kernel.compact_weapons()), halving the cubes and the memory
+traffic of every chunk; values stay within kernel.COMPACT_RTOL /
+COMPACT_ATOL of a float64 sweep.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+from .kernel import COMPACT_FLOAT, compact_weapons, compile_weapons, compile_targets, resolve_weapons
+from .matrix import _normalize_targets
+
+DEFAULT_CHUNK_SIZE = 16_384
+
+# Weapon profile the sweep axes are applied to (roster column -> value)
+DEFAULT_BASE = {'A': 1, 'BS': 3, 'S': 4, 'AP': 0, 'D': 1, 'Pts': 100}
+
+# Sweepable roster column -> compiled fields it sets
+AXIS_FIELDS = {
+    'A': ('a_mean', 'a_min', 'a_max', 'a_spec'),
+    'D': ('d_mean', 'd_spec'),
+    'BS': ('bs',),
+    'S': ('s',),
+    'AP': ('ap',),
+    'Sustained': ('sustained',),
+    'CritHit': ('crit_hit',),
+    'CritWound': ('crit_wound',),
+    'Lethal': ('lethal',),
+    'Dev': ('dev',),
+    'Torrent': ('torrent',),
+    'TwinLinked': ('twin_linked',),
+    'Blast': ('blast',),
+    'RR_H': ('reroll_hit',),
+    'RR_W': ('reroll_wound',),
+}
+
+
+class SweepCube:
+    """
+    Results of a parameter sweep.
+
+    Attributes:
+        axes: Dict of axis name -> list of swept values, in sweep order
+        targets: List of target labels
+        values: Dict of metric ('Kills', 'Damage', 'CPK') -> np.ndarray
+                shaped (*axis lengths, targets); float32 for compact sweeps
+    """
+
+    def __init__(self, axes, targets, values):
+        self.axes = axes
+        self.targets = targets
+        self.values = values
+
+    def __getitem__(self, metric):
+        return self.values[metric]
+
+    @property
+    def shape(self):
+        return self.values['Kills'].shape
+
+    def to_frame(self, metric, target, rows, columns, **fixed):
+        """
+        Returns a 2-d slice for a heatmap as a DataFrame.
+
+        Args:
+            metric: 'Kills', 'Damage' or 'CPK'
+            target: Target label
+            rows, columns: Axis names for the index and columns
+            **fixed: Value for every other axis, e.g. D='D6'
+        """
+        names = list(self.axes)
+        index = []
+        for name in names:
+            if name in (rows, columns):
+                index.append(slice(None))
+            elif name in fixed:
+                index.append(self.axes[name].index(fixed[name]))
+            else:
+                raise ValueError(f"Axis {name!r} needs a fixed value")
+        index.append(self.targets.index(target))
+
+        plane = self.values[metric][tuple(index)]
+        if names.index(rows) > names.index(columns):
+            plane = plane.T
+        return pd.DataFrame(plane, index=self.axes[rows], columns=self.axes[columns])
+
+    def to_dict(self):
+        """JSON-friendly form (metric cubes become nested lists)."""
+        return {
+            'axes': self.axes,
+            'targets': self.targets,
+            **{metric: cube.tolist() for metric, cube in self.values.items()},
+        }
+
+
+def _compile_axis(base, name, values):
+    """Compiled AXIS_FIELDS of every value of one axis."""
+    if name not in AXIS_FIELDS:
+        raise ValueError(f"Cannot sweep {name!r} (expected one of {list(AXIS_FIELDS)})")
+    weapons = compile_weapons(pd.DataFrame([dict(base, **{name: v}) for v in values]))
+    return {field: weapons[field] for field in AXIS_FIELDS[name]}
+
+
+def sweep_profiles(axes, targets, base=None, assume_cover=False, assume_half_range=False,
+                   chunk_size=DEFAULT_CHUNK_SIZE, compact=False):
+    """
+    Evaluates every combination of axis values against every target.
+
+    Parameters:
+    - axes: Dict of roster column -> values, e.g. {'S': range(3, 15), 'AP': [0, -1, -2],
+            'D': [1, 2, 'D3', 'D6']} (columns: see AXIS_FIELDS)
+    - targets: Dict of {label: target profile} or list of target profiles
+    - base: Weapon profile the axes are applied to (default: DEFAULT_BASE);
+            its Pts is the cost used for CPK
+    - assume_cover: If True, targets get +1 armor save (default False)
+    - assume_half_range: If True, ignore target Stealth (default False)
+    - chunk_size: Grid cells per kernel call
+    - compact: If True, evaluate in float32 with compact stat encodings and
+               return float32 cubes (default False)
+
+    Returns:
+    - SweepCube
+    """
+    labels, profiles = _normalize_targets(targets)
+    base = dict(DEFAULT_BASE, **(base or {}), __assume_cover__=assume_cover)
+    axes = {name: list(values) for name, values in axes.items()}
+
+    compiled_axes = [_compile_axis(base, name, values) for name, values in axes.items()]
+    base_weapon = compile_weapons(pd.DataFrame([base]))
+    target = compile_targets(profiles)
+    dtype = COMPACT_FLOAT if compact else np.float64
+    if compact:
+        compiled_axes = [compact_weapons(compiled) for compiled in compiled_axes]
+        base_weapon = compact_weapons(base_weapon)
+
+    shape = tuple(len(values) for values in axes.values())
+    n_cells = math.prod(shape)
+    kills = np.empty((len(profiles), n_cells), dtype=dtype)
+    damage = np.empty((len(profiles), n_cells), dtype=dtype)
+    cpk = np.empty((len(profiles), n_cells), dtype=dtype)
+
+    # Same CPK as calculate_group_metrics(): points spent / points killed
+    pts = float(base['Pts'])
+    target_pts = np.array([p.get('Pts', 1) for p in profiles], dtype=float).reshape(-1, 1)
+
+    for start in range(0, n_cells, chunk_size):
+        stop = min(start + chunk_size, n_cells)
+        cell_index = np.unravel_index(np.arange(start, stop), shape)
+
+        weapons = {field: np.repeat(col, stop - start) for field, col in base_weapon.items()}
+        for axis_index, compiled in zip(cell_index, compiled_axes):
+            for field, col in compiled.items():
+                weapons[field] = col[axis_index]
+
+        kills[:, start:stop], damage[:, start:stop] = resolve_weapons(weapons, target, assume_half_range)
+
+        killed_pts = kills[:, start:stop] * target_pts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cpk[:, start:stop] = np.where(killed_pts > 0, pts / killed_pts, 999.0)
+
+    values = {
+        metric: np.moveaxis(cube.reshape((len(profiles),) + shape), 0, -1)
+        for metric, cube in (('Kills', kills), ('Damage', damage), ('CPK', cpk))
+    }
+    return SweepCube(axes, labels, values)
@@ -0,0 +1,153 @@
+# src/engine/tables.py
+
+"""
+Precomputed Probability Tables
+
+Every roll in the attack sequence depends only on small integer stats
+(BS, S, T, AP, Sv, Inv, FNP, crit thresholds), so all probabilities are
+computed once at import into NumPy tables. The kernel gathers from them
+with fancy indexing instead of branching per row, and tests check the
+tables against brute-force dice enumeration.
+
+Index conventions:
+- Reroll axis: REROLL_NONE, REROLL_ONES, REROLL_FAILS
+- AP axis: AP value + AP_OFFSET (AP is negative, e.g. -2)
+- Stats outside a table's range are clipped to its edge (see clip_* helpers)
+
+Tables:
+- P_HIT[bs, crit_hit, reroll]          P(hit), critical hits always hit (bs is the modified BS)
+- P_CRIT_HIT[bs, crit_hit, reroll]     P(critical hit)
+- WOUND_TARGET[s, t]                   D6 roll needed to wound
+- P_WOUND[s, t, crit_wound, reroll]    P(wound), critical wounds always succeed
+- P_CRIT_WOUND[s, t, crit_wound, reroll] P(critical wound)
+- SAVE_TARGET[sv, ap, inv, cover]      D6 roll needed to save (7+ = no save)
+- P_FAIL_SAVE[sv, ap, inv, cover]      P(save failed)
+- P_FNP_FAIL[fnp]                      P(a point of damage gets through FNP), below 2 or 7 = no FNP
+
+The tables are float64. probability_tables(np.float32) returns float32
+copies for compact evaluation (see kernel.resolve_weapons()), and the
+*_LIST names hold nested-list copies for scalar lookups (one float from a
+list is several times cheaper than indexing a NumPy table with a tuple).
+"""
+
+import numpy as np
+
+REROLL_NONE = 0
+REROLL_ONES = 1
+REROLL_FAILS = 2
+
+MAX_BS = 8
+MAX_CRIT = 7
+MAX_STAT = 40
+MAX_SV = 7
+MAX_AP = 6
+AP_OFFSET = MAX_AP
+
+
+def _rerolled(p_success, p_crit):
+    """
+    Stacks (success, crit) probabilities for no reroll, reroll 1s and reroll fails.
+
+    A rerolled die gets a fresh chance at both success and a critical.
+    A 1 is only rerolled when it fails.
+    """
+    p_success = np.clip(p_success, 0.0, 1.0)
+    p_crit = np.clip(p_crit, 0.0, 1.0)
+    p_reroll = [np.zeros_like(p_success), np.where(p_success < 1, 1 / 6.0, 0.0), 1.0 - p_success]
+
+    success = np.stack([p_success + r * p_success for r in p_reroll], axis=-1)
+    crit = np.stack([p_crit + r * p_crit for r in p_reroll], axis=-1)
+    return _freeze(success), _freeze(crit)
+
+
+def _freeze(arr):
+    arr.setflags(write=False)
+    return arr
+
+
+def _build_hit_tables():
+    bs = np.arange(MAX_BS + 1).reshape(-1, 1)
+    crit = np.arange(MAX_CRIT + 1).reshape(1, -1)
+    p_crit = np.broadcast_to(np.maximum(0, (7 - crit) / 6.0), (len(bs), crit.size))
+    p_hit = np.maximum(np.maximum(0, (7 - bs) / 6.0), p_crit)
+    return _rerolled(p_hit, p_crit)
+
+
+def _build_wound_tables():
+    s = np.arange(MAX_STAT + 1).reshape(-1, 1)
+    t = np.arange(MAX_STAT + 1).reshape(1, -1)
+    target = np.select([s >= 2 * t, s > t, s == t, s > t / 2], [2, 3, 4, 5], default=6)
+
+    crit = np.arange(MAX_CRIT + 1).reshape(1, 1, -1)
+    p_crit = np.broadcast_to(np.maximum(0, (7 - crit) / 6.0), target.shape + (crit.size,))
+    p_wound = np.maximum(((7 - target) / 6.0)[..., None], p_crit)
+    success, crits = _rerolled(p_wound, p_crit)
+    return _freeze(target), success, crits
+
+
+def _build_save_tables():
+    sv = np.arange(MAX_SV + 1).reshape(-1, 1, 1, 1)
+    ap = (np.arange(2 * MAX_AP + 1) - AP_OFFSET).reshape(1, -1, 1, 1)
+    inv = np.arange(MAX_SV + 1).reshape(1, 1, -1, 1)
+    cover = np.array([False, True]).reshape(1, 1, 1, -1)
+
+    # Cover improves armor save by 1 (but not invuln, and never past 2+)
+    armor = np.where(cover & (sv > 2), sv - 1, sv) - ap
+    target = np.where(inv > 0, np.minimum(armor, inv), armor)
+
+    p_save = np.minimum((7 - target) / 6.0, 5 / 6.0)
+    p_fail = np.where(target > 6, 1.0, 1.0 - p_save)
+    return _freeze(target), _freeze(p_fail)
+
+
+def _build_fnp_table():
+    # FNP 2+ to 6+ rolls; anything else (0, 1, 7) is no FNP, so all damage gets through
+    fnp = np.arange(MAX_SV + 1)
+    return _freeze(np.where((fnp >= 2) & (fnp <= 6), 1.0 - (7 - fnp) / 6.0, 1.0))
+
+
+P_HIT, P_CRIT_HIT = _build_hit_tables()
+WOUND_TARGET, P_WOUND, P_CRIT_WOUND = _build_wound_tables()
+SAVE_TARGET, P_FAIL_SAVE = _build_save_tables()
+P_FNP_FAIL = _build_fnp_table()
+
+# Probability tables by float dtype (name -> table); float32 copies are made at import
+PROBABILITY_TABLES = ('P_HIT', 'P_CRIT_HIT', 'P_WOUND', 'P_CRIT_WOUND', 'P_FAIL_SAVE', 'P_FNP_FAIL')
+_TABLES_BY_DTYPE = {
+    np.dtype(dtype): {name: _freeze(globals()[name].astype(dtype, copy=False)) for name in PROBABILITY_TABLES}
+    for dtype in (np.float64, np.float32)
+}
+
+
+# Nested-list copies for the scalar kernel path and the math_core adapters
+P_HIT_LIST, P_CRIT_HIT_LIST, P_WOUND_LIST, P_CRIT_WOUND_LIST = (
+    P_HIT.tolist(), P_CRIT_HIT.tolist(), P_WOUND.tolist(), P_CRIT_WOUND.tolist()
+)
+
+
+def probability_tables(dtype=np.float64):
+    """Returns {name: table} for PROBABILITY_TABLES in dtype (float64 or float32)."""
+    try:
+        return _TABLES_BY_DTYPE[np.dtype(dtype)]
+    except KeyError:
+        raise ValueError(f"No probability tables for dtype {np.dtype(dtype)} (expected float64 or float32)")
+
+
+def clip_bs(bs):
+    return np.clip(bs, 0, MAX_BS)
+
+
+def clip_crit(threshold):
+    return np.clip(threshold, 0, MAX_CRIT)
+
+
+def clip_stat(value):
+    return np.clip(value, 0, MAX_STAT)
+
+
+def clip_save(value):
+    return np.clip(value, 0, MAX_SV)
+
+
+def ap_index(ap):
+    return np.clip(ap, -MAX_AP, MAX_AP) + AP_OFFSET
@@ -0,0 +1,218 @@
+# src/engine/topk.py
+
+"""
+Top-K Unit Queries
+
+top_units() answers "which K units are most points-efficient against this
+target?" without evaluating every unit of a large roster or datasheet
+library:
+
+1. kill_upper_bounds() gives every weapon row a cheap upper bound on its
+   expected kills: every attack hits and wounds (Sustained Hits on every
+   attack), only the save and Feel No Pain are rolled. Row bounds are
+   summed into unit bounds (Profile ID modes count once, at their best
+   bound), which bound each unit's CPK / Kills / Damage.
+2. The most promising units are evaluated exactly to seed the top K; any
+   unit whose cheap bound cannot beat the K-th result is never resolved.
+3. The remaining units go through the vectorized kernel only. Their exact
+   row results give much tighter unit bounds (only Profile ID winners and
+   duplicate removal are left unresolved).
+4. Units are aggregated exactly in that bound order, in batches, until no
+   remaining bound can beat the current K-th best result.
+
+Profile ID winners and duplicate profiles are resolved within a unit Name,
+so every batch evaluates all rows of the Names it touches. The results are
+the same as sorting the full calculate_group_metrics() list.
+"""
+
+import numpy as np
+import pandas as pd
+from . import tables
+from .calculator import aggregate_unit_metrics, subset_codes
+from .kernel import compile_target, resolve_unique_weapons
+from .roster import compile_roster
+
+# Metric -> True if lower is better
+METRICS = {'CPK': True, 'Kills': False, 'Damage': False}
+
+
+def kill_upper_bounds(weapons, target):
+    """
+    Per-row upper bounds on expected kills and damage against one target.
+
+    Args:
+        weapons: Dict of arrays from compile_weapons()
+        target: CompiledTarget from compile_target()
+
+    Returns:
+        Tuple of np.ndarray (kills, damage), shaped (rows,)
+    """
+    unit_size = target['unit_size']
+    blast = weapons['blast']
+    attacks = np.where(
+        blast & (unit_size >= 11), weapons['a_max'],
+        np.where(blast & (unit_size >= 6), weapons['a_min'], weapons['a_mean'])
+    )
+    # Every attack hits, crits for Sustained Hits and wounds
+    wounds = np.maximum(attacks, 0) * (1 + weapons['sustained'])
+
+    in_cover = (weapons['cover'] & ~weapons['ignores_cover'] & ~weapons['melee']).astype(np.intp)
+    p_fail = target['fail_curve'][..., tables.ap_index(weapons['ap']), in_cover]
+    p_fnp_fail = target['p_fnp_fail']
+
+    damage = np.maximum(weapons['d_mean'], 0)
+    model_w = target['w']
+    normal_kills = p_fail * np.minimum(1.0, damage / model_w)
+
+    # Devastating Wounds skip the save and spill over
+    dev = weapons['dev']
+    kills = wounds * p_fnp_fail * np.where(dev, np.maximum(normal_kills, damage / model_w), normal_kills)
+    total_damage = wounds * p_fnp_fail * damage * np.where(dev, 1.0, p_fail)
+    return kills, total_damage
+
+
+def _unit_bounds(temp_df, row_kills, row_damage, deduplicate, codes):
+    """
+    Per-unit (kills, damage, cost) bounds from per-row bounds, indexed by
+    unit code (see roster_codes()).
+
+    Rows sharing a Pts and Profile ID count once at their best bound (times
+    the most rows that can share the winning weapon name), as winners are
+    picked per (Name, Pts, Profile ID).
+    """
+    qty = temp_df['Qty'].to_numpy(dtype=float) if not deduplicate else np.ones(len(temp_df))
+    work = pd.DataFrame({
+        'unit': codes['unit'], 'mode': codes['mode'], 'winner': codes['winner'],
+        'Pts': temp_df['Pts'].to_numpy(), 'Qty': qty,
+        'ub_kills': row_kills * qty, 'ub_damage': row_damage * qty,
+    })
+    keep = codes['unit'] >= 0
+    work, exclusive = work[keep], codes['exclusive'][keep]
+    cumulative = work[~exclusive].groupby('unit')[['ub_kills', 'ub_damage']].sum()
+
+    modes = work[exclusive]
+    if not modes.empty:
+        shared = modes.groupby(['unit', 'mode', 'winner']).size().groupby(['unit', 'mode']).max()
+        best = modes.groupby(['unit', 'mode'])[['ub_kills', 'ub_damage']].max().mul(shared, axis=0)
+        cumulative = cumulative.add(best.groupby('unit').sum(), fill_value=0)
+
+    units = work.groupby('unit')
+    bounds = cumulative.reindex(units.size().index, fill_value=0.0)
+    cost = units['Pts'].max().astype(float) * units['Qty'].first()
+    return bounds['ub_kills'], bounds['ub_damage'], cost
+
+
+def _unit_names(codes):
+    """Name code per unit code, in unit code order."""
+    found, first = np.unique(codes['unit'], return_index=True)
+    return codes['name'][first[found >= 0]]
+
+
+def _sort_key(metric):
+    ascending = METRICS[metric]
+
+    def key(result):
+        value = result[metric]
+        unit = tuple(str(result[c]) for c in ('UnitID', 'Name', 'Loadout Group', 'Qty'))
+        return (value if ascending else -value, unit)
+    return key
+
+
+def _badness(metric, ub_kills, ub_damage, cost, target_pts):
+    """
+    Best value each unit could reach, as a sort key (lower is better).
+    """
+    if metric == 'CPK':
+        kv_points = ub_kills.to_numpy() * target_pts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(kv_points > 0, cost.to_numpy() / kv_points, 999.0)
+    return -(ub_kills if metric == 'Kills' else ub_damage).to_numpy()
+
+
+def top_units(df, target_profile, k=10, metric='CPK', deduplicate=True, assume_half_range=False,
+              batch_size=None):
+    """
+    Returns the K best units against one target.
+
+    Parameters:
+    - df: DataFrame with weapon data (a roster or a whole datasheet library) or a CompiledRoster
+    - target_profile: Target stats dict
+    - k: Number of units to return
+    - metric: 'CPK' (lowest first), 'Kills' or 'Damage' (highest first)
+    - deduplicate: Whether to apply Profile ID optimization (default True)
+    - assume_half_range: If True, only use close-range variants for Melta/Rapid Fire (default False)
+    - batch_size: Units evaluated exactly per step (default: max(k, 16))
+
+    Returns:
+    - Up to k results in calculate_group_metrics() format, best first (ties
+      broken by UnitID, Name, Loadout Group, Qty)
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric!r} (expected one of {list(METRICS)})")
+    if df.empty or k <= 0:
+        return []
+
+    roster = compile_roster(df)
+    temp_df = roster.prepared(assume_half_range)
+    weapons = roster.weapons(assume_half_range)
+    codes = roster.codes(assume_half_range, deduplicate)
+    target = compile_target(target_profile)
+    target_pts = target_profile.get('Pts', 1)
+    row_names = codes['name']
+    key = _sort_key(metric)
+    batch_size = batch_size or max(k, 16)
+
+    # Kernel results, filled in only for rows that are ever needed
+    row_kills = np.full(len(temp_df), np.nan)
+    row_damage = np.full(len(temp_df), np.nan)
+
+    def resolve(mask):
+        todo = mask & np.isnan(row_kills)
+        if todo.any():
+            row_kills[todo], row_damage[todo] = resolve_unique_weapons(
+                {f: col[todo] for f, col in weapons.items()}, target, assume_half_range)
+
+    evaluated, best = set(), []
+
+    def evaluate(names):
+        nonlocal best
+        names = set(names) - evaluated
+        if not names:
+            return
+        evaluated.update(names)
+        mask = np.isin(row_names, list(names))
+        resolve(mask)
+        best = sorted(best + aggregate_unit_metrics(temp_df[mask], row_kills[mask], row_damage[mask],
+                                                    target_profile, deduplicate, None,
+                                                    subset_codes(codes, mask)), key=key)[:k]
+
+    def cutoff():
+        return key(best[k - 1])[0] if len(best) >= k else np.inf
+
+    # 1. Perfect-hit/wound bounds for every unit; seed the top K from the most promising
+    bounds = _unit_bounds(temp_df, *kill_upper_bounds(weapons, target), deduplicate, codes)
+    badness = _badness(metric, *bounds, target_pts)
+    names = _unit_names(codes)
+    order = np.argsort(badness, kind='stable')
+    evaluate(names[order[:batch_size]])
+
+    # 2. Exact per-row kernel results (Profile ID modes at their best) for the units
+    #    the cheap bound cannot rule out; these bound each unit much more tightly
+    candidates = set(names[badness <= cutoff()]) - evaluated
+    if not candidates:
+        return best
+    mask = np.isin(row_names, list(candidates))
+    resolve(mask)
+    sub_df, sub_codes = temp_df[mask], subset_codes(codes, mask)
+    bounds = _unit_bounds(sub_df, row_kills[mask], row_damage[mask], deduplicate, sub_codes)
+    badness = _badness(metric, *bounds, target_pts)
+    names = _unit_names(sub_codes)
+    order = np.argsort(badness, kind='stable')
+
+    # 3. Exact unit results in bound order until no remaining unit can make the cut
+    for start in range(0, len(order), batch_size):
+        if badness[order[start]] > cutoff():
+            break
+        evaluate(names[order[start:start + batch_size]])
+
+    return best
@@ -2,7 +2,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from src.data.targets import TARGETS
-from src.engine.calculator import calculate_group_metrics, parse_d6_value
+from src.engine.calculator import parse_d6_value
+from src.engine.matrix import calculate_matrix
 
 # --- HELPER: DATA SANITIZATION ---
 def safe_chart_data(df):
@@ -53,6 +54,16 @@ def safe_chart_data(df):
         
     return plot_df
 
+# --- HELPER: UNIT ROWS IN A METRIC MATRIX ---
+def first_unit_rows(matrix):
+    """
+    Maps (Name, Loadout Group) -> first matching row of a MetricMatrix.
+    """
+    rows = {}
+    for i, unit in enumerate(matrix.units):
+        rows.setdefault((unit['Name'], unit['Loadout Group']), i)
+    return rows
+
 # --- CHART 1: THREAT MATRIX ---
 def plot_threat_matrix_interactive(df, color_map, template):
     # 1. Sanitize first
@@ -102,24 +113,27 @@ def plot_efficiency_curve_interactive(df, color_map, template, assume_half_range
     # Sort targets by Toughness for a logical X-Axis
     sorted_targets = sorted(TARGETS.items(), key=lambda item: item[1]['T'])
     target_names = [t[1]['Name'].split(' ')[0] for t in sorted_targets]
-    target_keys = [t[0] for t in sorted_targets]
 
     records = []
+    # Calc metrics for every unit vs every target in one pass (True = Efficiency)
+    matrix = calculate_matrix(df, [t[1] for t in sorted_targets], deduplicate=True, assume_half_range=assume_half_range,
+                              metrics=['CPK'])
+    unit_rows = first_unit_rows(matrix)
+    cpk = matrix['CPK']
+
     # Identify unique groups
     groups = df[['Name', 'Loadout Group']].drop_duplicates()
 
     for _, row in groups.iterrows():
         unit_name = row['Name']
         group_name = row['Loadout Group']
-        # Use boolean indexing mask
-        subset_df = df[(df['Name'] == unit_name) & (df['Loadout Group'] == group_name)]
         unit_id = f"{unit_name} ({group_name})"
+        unit_row = unit_rows.get((unit_name, group_name))
 
-        for t_key, t_name in zip(target_keys, target_names):
-            t_stats = TARGETS[t_key]
-            # Calc metrics (Using the robust engine)
-            metrics = calculate_group_metrics(subset_df, t_stats, deduplicate=True, assume_half_range=assume_half_range) # True = Efficiency
-            val = metrics[0]['CPK'] if metrics else 0
+        for col, t_name in enumerate(target_names):
+            val = 0
+            if unit_row is not None and not pd.isna(cpk[unit_row, col]):
+                val = cpk[unit_row, col]
 
             records.append({
                 'UnitID': unit_id,
@@ -208,21 +222,27 @@ def plot_army_damage(df, color_map, template, assume_half_range=False):
 
     records = []
 
-    for t_key, t_name in zip(target_keys, target_names):
+    # Use deduplicate=False to get TOTAL ARMY DAMAGE, all targets in one pass
+    matrix = calculate_matrix(df, [t[1] for t in sorted_targets], deduplicate=False, assume_half_range=assume_half_range,
+                              metrics=['Kills'])
+    unit_rows = first_unit_rows(matrix)
+    kills_matrix = matrix['Kills']
+    groups = df[['Name', 'Loadout Group']].drop_duplicates()
+
+    for col, (t_key, t_name) in enumerate(zip(target_keys, target_names)):
         t_stats = TARGETS[t_key]
 
         unit_damages = []
-        groups = df[['Name', 'Loadout Group']].drop_duplicates()
 
         for _, row in groups.iterrows():
             unit_name = row['Name']
             group_name = row['Loadout Group']
-            subset_df = df[(df['Name'] == unit_name) & (df['Loadout Group'] == group_name)]
             unit_id = f"{unit_name} ({group_name})"
+            unit_row = unit_rows.get((unit_name, group_name))
 
-            # Use deduplicate=False to get TOTAL ARMY DAMAGE
-            metrics = calculate_group_metrics(subset_df, t_stats, deduplicate=False, assume_half_range=assume_half_range)
-            kills = metrics[0]['Kills'] if metrics else 0
+            kills = 0
+            if unit_row is not None and not pd.isna(kills_matrix[unit_row, col]):
+                kills = kills_matrix[unit_row, col]
             dmg = kills * t_stats.get('W', 1)
             
             if dmg > 0:
@@ -29,7 +29,31 @@ TEST_FILES = [
     'test_half_range_toggle.py',# Half range toggle
     'test_melta_rapidfire.py',  # Melta/Rapid Fire numeric values
     'test_stealth.py',          # Stealth keyword
-    'test_target_manager_basic.py' # Target manager
+    'test_target_manager_basic.py', # Target manager
+    'test_vectorized_kernel.py',    # Vectorized resolve kernel
+    'test_matrix.py',               # Weapons x targets matrix
+    'test_dice.py',                 # Dice expression compiler
+    'test_range_expansion.py',      # Column-wise Melta/Rapid Fire expansion
+    'test_distributions.py',        # Exact kill/damage distributions
+    'test_simulation.py',           # Monte Carlo simulation engine
+    'test_allocation.py',           # Model-by-model damage allocation
+    'test_tables.py',               # Precomputed probability tables
+    'test_rerolls.py',              # RR_H / RR_W rerolls
+    'test_kernel_adapters.py',      # Legacy engines as kernel adapters
+    'test_weapon_profiles.py',      # Pandas-free single-profile path
+    'test_profile_dedup.py',        # Profile hash-consing
+    'test_engine_session.py',       # Incremental engine session
+    'test_result_cache.py',         # Calculator API result cache
+    'test_scenarios.py',            # Scenario-flag combinations
+    'test_sensitivity.py',          # Stat sensitivity analysis
+    'test_sweep.py',                # Stat-space parameter sweeps
+    'test_topk.py',                 # Top-K unit queries with bound pruning
+    'test_streaming.py',            # Streaming (chunked) evaluation
+    'test_parallel.py',             # Process-pool sharded matrix
+    'test_compiled_roster.py',      # Compiled roster cache and typed columns
+    'test_compiled_target.py',      # Compiled target profiles and save curves
+    'test_metric_selection.py',     # metrics= selector on the engine and API
+    'test_compact.py',              # float32 compact evaluation within tolerance
 ]
 
 def run_test_file(filename):
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test model-by-model damage allocation.
+Verify carry-over rules, per-point FNP, table caching and the 'exact' allocation mode.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+import cpk_engine
+from src.data.rosters import DEFAULT_ROSTER
+from src.data.targets import TARGETS
+from src.engine import math_core
+from src.engine.allocation import allocation_table, cache_info, expected_capped_damage, fnp_thinned, kills_pmf, start_state
+from src.engine.calculator import calculate_group_metrics
+from src.engine.dice import compile_dice
+from src.engine.matrix import calculate_matrix
+from src.engine.simulation import simulate_group_metrics
+
+
+def test_transition_rules():
+    """Normal damage is wasted on the last wound, mortal wounds spill over"""
+    print("=" * 60)
+    print("TEST: Transition Rules")
+    print("=" * 60)
+
+    # 3 x W2 models, one D3 wound
+    table = allocation_table(compile_dice(3), 2, 1.0, 3)
+    state = start_state(3, 2)
+
+    normal = state @ table.normal
+    assert np.allclose(kills_pmf(normal, 3, 2), [0, 1, 0, 0]), "D3 into W2 kills one model, wastes 1"
+
+    mortal = state @ table.mortal
+    assert mortal[1 * 2 + 1] == 1.0, "Mortal D3 kills one model and leaves 1 wound on the next"
+
+    wiped = state @ table.mortal @ table.mortal
+    assert np.allclose(kills_pmf(wiped, 3, 2), [0, 0, 0, 1]), "6 mortal damage wipes 3 x W2"
+
+    print(f"\n  ✅ PASS: Carry-over rules\n")
+
+
+def test_fnp_per_point():
+    """FNP thins each point of damage and tables are cached per key"""
+    print("=" * 60)
+    print("TEST: Per-Point FNP + Cache")
+    print("=" * 60)
+
+    # D2 vs FNP 5+ (each point gets through with 2/3)
+    pmf = fnp_thinned([0, 0, 1.0], 2 / 3)
+    assert np.allclose(pmf, [1 / 9, 4 / 9, 4 / 9]), f"{pmf}"
+
+    before = cache_info().hits
+    first = allocation_table(compile_dice('D6'), 3, 2 / 3, 5)
+    assert allocation_table(compile_dice('D6'), 3, 2 / 3, 5) is first, "Same key returns the cached table"
+    assert cache_info().hits == before + 1
+
+    print(f"\n  ✅ PASS: FNP thinning and caching\n")
+
+
+def test_capped_damage_exact():
+    """Legacy capped damage is exact for three or more dice"""
+    print("=" * 60)
+    print("TEST: Exact Capped Damage")
+    print("=" * 60)
+
+    # E[min(3D3, 5)] by enumeration
+    rolls = [a + b + c for a in (1, 2, 3) for b in (1, 2, 3) for c in (1, 2, 3)]
+    expected = sum(min(r, 5) for r in rolls) / len(rolls)
+
+    for engine in (math_core, cpk_engine):
+        assert np.isclose(engine.calculate_capped_damage(engine.parse_dice('3D3'), 5), expected)
+        assert np.isclose(engine.calculate_capped_damage(engine.parse_dice('D6+2'), 4), (3 + 4 * 5) / 6)
+    assert np.isclose(expected_capped_damage(compile_dice(12), 10), 10.0)
+
+    print(f"  E[min(3D3, 5)] = {expected:.4f}")
+    print(f"\n  ✅ PASS: No more average fallback\n")
+
+
+def test_exact_allocation_mode():
+    """allocation='exact' agrees with simulation; damage is unchanged"""
+    print("=" * 60)
+    print("TEST: Exact Allocation Mode")
+    print("=" * 60)
+
+    df = pd.DataFrame(DEFAULT_ROSTER)
+    for t_key in ('CUST', 'VEQ-L', 'KEQ'):
+        target = TARGETS[t_key]
+        average = calculate_group_metrics(df, target)
+        exact = calculate_group_metrics(df, target, allocation='exact')
+        simulated = simulate_group_metrics(df, target, trials=40_000, seed=3, confidence=0.999)
+
+        for a, e, s in zip(average, exact, simulated):
+            assert np.isclose(a['Damage'], e['Damage']), "Damage does not depend on allocation"
+            low, high = s['Sim_Kills_CI']
+            assert low - 1e-3 <= e['Kills'] <= high + 1e-3, f"{e['Name']} vs {t_key}: {e['Kills']} outside {low}-{high}"
+            assert e['Kills'] <= target['UnitSize'], "Exact kills never exceed the unit"
+            print(f"  {e['Name']:<20} vs {t_key:<6} average={a['Kills']:.3f} exact={e['Kills']:.3f}")
+
+    matrix = calculate_matrix(df, TARGETS, allocation='exact')
+    for t_key in ('GEQ', 'VEQ-H'):
+        expected = calculate_group_metrics(df, TARGETS[t_key], allocation='exact')
+        for e, m in zip(expected, matrix.target_results(t_key)):
+            assert np.isclose(e['Kills'], m['Kills']), f"Matrix exact kills differ for {e['Name']}"
+
+    print(f"\n  ✅ PASS: Exact allocation matches simulation\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Damage Allocation Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_transition_rules()
+        test_fnp_per_point()
+        test_capped_damage_exact()
+        test_exact_allocation_mode()
+
+        print("=" * 60)
+        print("✅ ALL ALLOCATION TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test compact (float32) evaluation.
+Verify compact weapon encodings, that the float32 kernel, matrix and sweep
+match the float64 path within COMPACT_RTOL / COMPACT_ATOL, and that the
+default float64 path is unchanged.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from backend.main import app
+from src.data.targets import TARGETS
+from src.engine import parallel, tables
+from src.engine.calculator import prepare_roster
+from src.engine.kernel import (
+    COMPACT_ATOL, COMPACT_FLOAT, COMPACT_INT_FIELDS, COMPACT_RTOL,
+    compact_weapons, compile_target, compile_targets, compile_weapons, resolve_unique_weapons, resolve_weapons,
+    weapons_dtype,
+)
+from src.engine.matrix import calculate_matrix
+from src.engine.roster import compile_roster
+from src.engine.sweep import sweep_profiles
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=3),
+        _row('Hellblasters', 'Plasma (Std)', S=7, AP=-2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', S=8, AP=-3, D=2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma Pistol', A=1, S=8, AP=-3, D=2, Range=12, Qty=5, RapidFire=1),
+        _row('Intercessors', 'Bolt Rifle', Qty=5, Sustained=1, CritHit=5, RR_H='1'),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M', **{'Loadout Group': 'Melee'}),
+        _row('Terminators', 'Chainfist', A=4, S=5, D='D3', Lethal='Y', Dev='Y', Range='M', Qty=5),
+        _row('Devastators', 'Frag Missile', A='D6', S=4, AP=0, Blast='Y', Torrent='Y', TwinLinked='Y'),
+    ])
+
+
+def _close(compact, double):
+    return np.allclose(compact, double, rtol=COMPACT_RTOL, atol=COMPACT_ATOL, equal_nan=True)
+
+
+def test_compact_encodings():
+    """compact_weapons() narrows stats and dice means without changing them"""
+    print("=" * 60)
+    print("TEST: Compact Encodings")
+    print("=" * 60)
+
+    weapons = compile_weapons(prepare_roster(_roster()))
+    compact = compact_weapons(weapons)
+    assert compact.keys() == weapons.keys()
+    for field, encoding in COMPACT_INT_FIELDS.items():
+        assert compact[field].dtype == encoding, field
+        assert np.array_equal(compact[field], weapons[field]), field
+    for field in ('a_mean', 'a_min', 'a_max', 'd_mean'):
+        assert compact[field].dtype == COMPACT_FLOAT, field
+    assert compact['a_spec'] is weapons['a_spec'] and compact['lethal'] is weapons['lethal']
+    assert weapons_dtype(weapons) == np.float64 and weapons_dtype(compact) == COMPACT_FLOAT
+
+    # A CompiledRoster's int8 stats are already narrower than the compact encodings
+    narrow = compact_weapons(compile_roster(_roster()).weapons())
+    assert narrow['s'].dtype == np.int8 and narrow['reroll_hit'].dtype == np.int8
+
+    # Out-of-range stats clip to values the tables treat the same way
+    extreme = compact_weapons({'crit_hit': np.array([-3, 9, 400]), 's': np.array([70000, -2, 12])})
+    assert extreme['crit_hit'].tolist() == [0, 9, 255]
+    assert np.array_equal(tables.clip_crit(extreme['crit_hit']), tables.clip_crit(np.array([-3, 9, 400])))
+    assert extreme['s'].tolist() == [32767, -2, 12]
+
+    assert tables.probability_tables()['P_HIT'] is tables.P_HIT
+    assert tables.probability_tables(np.float32)['P_WOUND'].dtype == np.float32
+    try:
+        tables.probability_tables(np.float16)
+        assert False, "float16 tables should be rejected"
+    except ValueError as e:
+        print(f"  {e}")
+
+    print(f"\n  ✅ PASS: Compact encodings\n")
+
+
+def test_kernel_within_tolerance():
+    """float32 kernel results match float64 within the stated tolerance"""
+    print("=" * 60)
+    print("TEST: Kernel Tolerance")
+    print("=" * 60)
+
+    profiles = list(TARGETS.values()) + [dict(TARGETS['MEQ'], Stealth='Y', FNP='5+')]
+    for half in (False, True):
+        weapons = compile_weapons(prepare_roster(_roster(), half))
+        for target in (compile_targets(profiles), compile_target(profiles[-1])):
+            double = resolve_weapons(weapons, target, half)
+            assert double[0].dtype == np.float64
+            for resolve in (resolve_weapons, resolve_unique_weapons):
+                compact = resolve(compact_weapons(weapons), target, half)
+                for c, d in zip(compact, double):
+                    assert c.dtype == COMPACT_FLOAT and c.shape == d.shape
+                    assert _close(c, d)
+    print(f"  {len(profiles)} targets, both range bands: within rtol={COMPACT_RTOL:g} atol={COMPACT_ATOL:g}")
+
+    print(f"\n  ✅ PASS: Kernel within tolerance\n")
+
+
+def test_matrix_and_sweep():
+    """Compact matrices and sweeps are float32 and match the float64 results"""
+    print("=" * 60)
+    print("TEST: Compact Matrix and Sweep")
+    print("=" * 60)
+
+    df = _roster()
+    for kwargs in ({}, {'assume_cover': True}, {'assume_half_range': True, 'deduplicate': False}):
+        double = calculate_matrix(df, TARGETS, **kwargs)
+        compact = calculate_matrix(df, TARGETS, compact=True, **kwargs)
+        assert compact.units == double.units
+        assert np.array_equal(compact.modes, double.modes)
+        for metric, values in double.values.items():
+            assert compact.values[metric].dtype == np.float32, metric
+            assert _close(compact.values[metric], values), (kwargs, metric)
+    assert calculate_matrix(df.iloc[:0], TARGETS, compact=True)['Kills'].dtype == np.float32
+
+    # Sharded workers evaluate in the same precision
+    original = parallel.PARALLEL_MIN_CELLS
+    parallel.PARALLEL_MIN_CELLS = 0
+    try:
+        sharded = calculate_matrix(df, TARGETS, compact=True, workers=2)
+    finally:
+        parallel.PARALLEL_MIN_CELLS = original
+    compact = calculate_matrix(df, TARGETS, compact=True)
+    assert all(np.array_equal(sharded.values[m], compact.values[m], equal_nan=True) for m in compact.values)
+    print(f"  Matrix: {len(double.units)} units x {len(TARGETS)} targets within tolerance")
+
+    axes = {'S': range(2, 13), 'AP': [0, -1, -2, -4], 'D': [1, 2, 'D3', 'D6+1'], 'A': [1, 'D6', '2D3'],
+            'Lethal': ['N', 'Y'], 'RR_W': ['N', 'Y']}
+    double = sweep_profiles(axes, TARGETS, base={'Pts': 60})
+    compact = sweep_profiles(axes, TARGETS, base={'Pts': 60}, compact=True, chunk_size=500)
+    for metric, cube in double.values.items():
+        assert cube.dtype == np.float64 and compact[metric].dtype == np.float32
+        assert _close(compact[metric], cube), metric
+        assert compact[metric].nbytes * 2 == cube.nbytes
+    print(f"  Sweep: {double.shape} cube within tolerance, half the bytes")
+
+    print(f"\n  ✅ PASS: Compact matrix and sweep\n")
+
+
+def test_compact_endpoints():
+    """/calculate-multi-target and /sweep accept compact=true"""
+    print("=" * 60)
+    print("TEST: Compact Endpoints")
+    print("=" * 60)
+
+    client = TestClient(app)
+    meq = {'Name': 'MEQ', 'Pts': 18, 'T': 4, 'W': 2, 'Sv': '3+', 'UnitSize': 5}
+    weapons = [{k: v for k, v in row.items() if pd.notna(v)} for row in _roster().to_dict('records')]
+
+    results = {}
+    for compact in (False, True):
+        response = client.post('/api/calculator/calculate-multi-target',
+                               json={'weapons': weapons, 'targets': [meq], 'compact': compact})
+        assert response.status_code == 200, response.text
+        results[compact] = response.json()['results']['MEQ']['metrics']
+    assert [m['Weapon'] for m in results[True]] == [m['Weapon'] for m in results[False]]
+    assert _close([m['Kills'] for m in results[True]], [m['Kills'] for m in results[False]])
+
+    payload = {'axes': {'S': [4, 8], 'AP': [0, -2]}, 'targets': [meq]}
+    double = client.post('/api/calculator/sweep', json=payload).json()
+    compact = client.post('/api/calculator/sweep', json=dict(payload, compact=True)).json()
+    assert _close(compact['Kills'], double['Kills'])
+
+    print(f"\n  ✅ PASS: Compact endpoints\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Compact Evaluation Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_compact_encodings()
+        test_kernel_within_tolerance()
+        test_matrix_and_sweep()
+        test_compact_endpoints()
+
+        print("=" * 60)
+        print("✅ ALL COMPACT EVALUATION TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
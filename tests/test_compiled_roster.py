@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test compiled rosters.
+Verify a CompiledRoster matches prepare_roster() + compile_weapons(), is
+cached per roster content, is invalidated by any edit of the source
+DataFrame, and that its codes and dice checks line up with the engine.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.roster_manager import load_roster_file, validate_roster_data
+from src.data.targets import TARGETS
+from src.engine.calculator import (
+    aggregate_unit_metrics, calculate_group_metrics, prepare_roster, unit_group_columns,
+)
+from src.engine.kernel import compile_weapons, compile_targets, resolve_unique_weapons
+from src.engine.matrix import calculate_matrix
+from src.engine.roster import (
+    INT8_FIELDS, CompiledRoster, clear_compiled_rosters, compile_roster, roster_fingerprint,
+)
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=3),
+        _row('Hellblasters', 'Plasma (Std)', S=7, AP=-2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', S=8, AP=-3, D=2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma Pistol', A=1, S=8, AP=-3, D=2, Range=12, Qty=5, RapidFire=1),
+        _row('Intercessors', 'Bolt Rifle', Qty=5, Sustained=1, CritHit=5),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M', **{'Loadout Group': 'Melee'}),
+        _row('Terminators', 'Chainfist', A=4, S=5, D='D3', Lethal='Y', Dev='Y', Range='M', Qty=5),
+    ])
+
+
+def test_matches_prepare_and_compile():
+    """Compiled bands give the same rows and the same kernel results"""
+    print("=" * 60)
+    print("TEST: Compiled Roster Matches prepare_roster() + compile_weapons()")
+    print("=" * 60)
+
+    df = _roster()
+    roster = CompiledRoster(df)
+    targets = compile_targets(list(TARGETS.values()))
+
+    for half in (False, True):
+        expected_df = prepare_roster(df, half)
+        expected = compile_weapons(expected_df)
+        weapons = roster.weapons(half)
+
+        pd.testing.assert_frame_equal(roster.prepared(half), expected_df)
+        assert weapons.keys() == expected.keys()
+        for field in INT8_FIELDS:
+            assert weapons[field].dtype == np.int8, field
+            assert np.array_equal(weapons[field], expected[field]), field
+        for field in ('lethal', 'dev', 'torrent', 'blast', 'melee', 'cover'):
+            assert weapons[field].dtype == bool, field
+
+        kills, damage = resolve_unique_weapons(weapons, targets, half)
+        expected_kills, expected_damage = resolve_unique_weapons(expected, targets, half)
+        assert np.array_equal(kills, expected_kills) and np.array_equal(damage, expected_damage)
+        print(f"  half_range={half}: {len(expected_df)} rows identical")
+
+    print(f"\n  ✅ PASS: Compiled roster matches\n")
+
+
+def test_cache_and_invalidation():
+    """Same content hits the cache; any edit (even in place) is a miss"""
+    print("=" * 60)
+    print("TEST: Cache and Invalidation")
+    print("=" * 60)
+
+    clear_compiled_rosters()
+    df = _roster()
+    roster = compile_roster(df)
+    assert compile_roster(df) is roster
+    assert compile_roster(df.copy()) is roster
+    assert compile_roster(roster) is roster
+    assert compile_roster(df.set_index(df.index + 100)) is roster, "The index is not part of the content"
+    print(f"  Fingerprint {roster.fingerprint}")
+
+    before = calculate_group_metrics(df, TARGETS['MEQ'])
+    df.loc[0, 'S'] = 3
+    assert not roster.matches(df)
+    edited = compile_roster(df)
+    assert edited is not roster
+    melta = (roster.prepared()['Weapon'] == 'Melta Rifle').to_numpy()
+    assert edited.weapons()['s'][melta] == [3] and roster.weapons()['s'][melta] == [9]
+
+    after = calculate_group_metrics(df, TARGETS['MEQ'])
+    assert after[0]['Kills'] != before[0]['Kills'], "An in-place edit must not reuse the stale compile"
+    print(f"  In-place edit: Eradicators {before[0]['Kills']:.3f} -> {after[0]['Kills']:.3f} kills")
+
+    # Values that print alike but parse differently are different content
+    text = _roster().astype({'A': object})
+    text.loc[4, 'A'] = '2'
+    assert roster_fingerprint(text) != roster_fingerprint(_roster().astype({'A': object}))
+    assert roster_fingerprint(_roster().rename(columns={'Keywords': 'Notes'})) != roster_fingerprint(_roster())
+
+    # Callers get shared read-only data: engine calls leave it untouched
+    roster = compile_roster(_roster())
+    weapons_cover = roster.weapons()['cover'].copy()
+    columns = list(roster.prepared().columns)
+    calculate_matrix(_roster(), TARGETS, assume_cover=True)
+    assert np.array_equal(roster.weapons()['cover'], weapons_cover)
+    assert list(roster.prepared().columns) == columns
+
+    print(f"\n  ✅ PASS: Cache and invalidation\n")
+
+
+def test_codes():
+    """Codes line up with the groups the engine reports, NaN keys included"""
+    print("=" * 60)
+    print("TEST: Categorical Codes")
+    print("=" * 60)
+
+    df = _roster()
+    df.loc[len(df)] = _row('Scouts', 'Sniper Rifle', **{'Loadout Group': np.nan})
+    roster = compile_roster(df)
+    temp_df = roster.prepared()
+
+    for deduplicate in (True, False):
+        codes = roster.codes(deduplicate=deduplicate)
+        assert roster.codes(deduplicate=deduplicate) is codes
+
+        # Profile ID modes share a mode code; each weapon is its own winner key
+        assert list(codes['exclusive']) == list(temp_df['Profile ID'] != '')
+        plasma = (temp_df['Profile ID'] == 'P1').to_numpy()
+        assert len(set(codes['mode'][plasma])) == 1 and len(set(codes['winner'][plasma])) == 2
+        assert list(codes['name']) == list(pd.factorize(temp_df['Name'])[0])
+
+        # Unit codes number the result groups in order; the NaN-keyed row has none
+        group_cols = unit_group_columns(temp_df, deduplicate)
+        unit = codes['unit']
+        assert list(unit[(temp_df['Name'] == 'Scouts').to_numpy()]) == [-1]
+        results = calculate_group_metrics(df, TARGETS['MEQ'], deduplicate)
+        assert sorted(set(unit[unit >= 0])) == list(range(len(results)))
+        for code, r in enumerate(results):
+            keys = temp_df.loc[unit == code, group_cols].drop_duplicates()
+            assert [tuple(k) for k in keys.to_numpy()] == [tuple(r[c] for c in group_cols)]
+
+        # Cached codes give the same results as computing them per call
+        kills, damage = resolve_unique_weapons(roster.weapons(), compile_targets([TARGETS['MEQ']]))
+        assert aggregate_unit_metrics(temp_df, kills[0], damage[0], TARGETS['MEQ'], deduplicate) == results
+        print(f"  deduplicate={deduplicate}: {len(results)} units")
+
+    print(f"\n  ✅ PASS: Codes line up\n")
+
+
+def test_invalid_dice():
+    """Non-dice A / D values are reported and rejected by the validator"""
+    print("=" * 60)
+    print("TEST: Invalid Dice Expressions")
+    print("=" * 60)
+
+    df = load_roster_file('default_roster')
+    assert compile_roster(df).invalid_dice() == {'A': [], 'D': []}
+    assert validate_roster_data(df) == (True, "")
+
+    df = df.astype({'D': object})
+    df.loc[0, 'D'] = 'D6+D3'
+    df.loc[1, 'D'] = ''
+    assert compile_roster(df).invalid_dice() == {'A': [], 'D': ['D6+D3']}
+    is_valid, error = validate_roster_data(df)
+    assert not is_valid and "'D'" in error and 'D6+D3' in error
+    print(f"  {error}")
+
+    print(f"\n  ✅ PASS: Invalid dice rejected\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Compiled Roster Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_matches_prepare_and_compile()
+        test_cache_and_invalidation()
+        test_codes()
+        test_invalid_dice()
+
+        print("=" * 60)
+        print("✅ ALL COMPILED ROSTER TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
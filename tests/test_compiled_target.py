@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test compiled target profiles.
+Verify CompiledTarget normalizes blank / 'N' saves and the 'Invuln'
+spelling, that its precomputed save curves, FNP factor and Stealth
+modifier match the probability tables, and that targets compile once.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import pickle
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine import tables
+from src.engine.calculator import resolve_single_row
+from src.engine.kernel import CompiledTarget, compile_target, compile_targets, compile_weapons, resolve_weapons
+
+WEAPONS = pd.DataFrame([
+    {'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1},
+    {'A': 'D6', 'BS': 4, 'S': 9, 'AP': -4, 'D': 'D6', 'Dev': 'Y'},
+    {'A': 4, 'BS': 3, 'S': 5, 'AP': -2, 'D': 2, 'Range': 'M', 'Lethal': 'Y'},
+    {'A': 'D3', 'BS': 4, 'S': 4, 'AP': 0, 'D': 1, 'Torrent': 'Y', '__assume_cover__': True},
+    {'A': 3, 'BS': 3, 'S': 6, 'AP': -7, 'D': 3, '__assume_cover__': True},
+])
+
+
+def test_normalization():
+    """'N', '' and '-' mean no save; 'Invuln' is read like 'Inv'"""
+    print("=" * 60)
+    print("TEST: Target Normalization")
+    print("=" * 60)
+
+    base = {'T': 5, 'W': 3, 'Sv': '2+', 'UnitSize': 5}
+    for blank in ('', 'N', 'n', '-', None, np.nan):
+        target = compile_target(dict(base, Inv=blank, FNP=blank))
+        assert (target.inv, target.fnp) == (0, 7), repr(blank)
+
+    assert compile_target(dict(base, Invuln='4+')).inv == 4
+    assert compile_target(dict(base, Inv='N', Invuln='5+')).inv == 5
+    assert compile_target(dict(base, Inv='4+', Invuln='5+')).inv == 4
+    assert compile_target(dict(base, FNP='5+')).fnp == 5
+
+    assert compile_target(dict(base, Stealth='y')).stealth_penalty == 1
+    assert compile_target(dict(base, Stealth=True)).stealth_penalty == 1
+    assert compile_target(dict(base, Stealth='N')).stealth_penalty == 0
+    assert compile_target(dict(base, W=0)).w == 1
+
+    # 'Invuln' target lists score like the same target written with 'Inv'
+    weapon = {'A': 2, 'BS': 3, 'S': 8, 'AP': -3, 'D': 2}
+    inv = resolve_single_row(weapon, dict(base, Inv='4+'))
+    assert resolve_single_row(weapon, dict(base, Invuln='4+')) == inv
+    assert resolve_single_row(weapon, dict(base, Invuln='N')) != inv
+    print(f"  Invuln 4+ vs AP-3: {inv[0]:.3f} kills")
+
+    print(f"\n  ✅ PASS: Targets normalized\n")
+
+
+def test_no_fnp_values():
+    """An FNP of 0, '0' or '' is no FNP: every point of damage gets through"""
+    print("=" * 60)
+    print("TEST: No-FNP Values")
+    print("=" * 60)
+
+    base = {'T': 4, 'W': 1, 'Sv': '3+', 'UnitSize': 10}
+    weapon = {'A': 10, 'BS': 3, 'S': 4, 'AP': 0, 'D': 1}
+    expected = resolve_single_row(weapon, dict(base, FNP='N'))
+    assert np.isclose(expected[0], 10 * 2 / 3 * 1 / 2 * 1 / 3)
+
+    for value in (0, '0', '', 1, '1+', 8):
+        target = compile_target(dict(base, FNP=value))
+        assert (target.fnp, target.p_fnp_fail) == (7, 1.0), repr(value)
+        assert resolve_single_row(weapon, dict(base, FNP=value)) == expected, repr(value)
+
+    weapons = compile_weapons(pd.DataFrame([weapon]))
+    targets = compile_targets([dict(base, FNP=0), dict(base, FNP='0'), dict(base, FNP=''), dict(base, FNP='5+')])
+    assert targets['fnp'].ravel().tolist() == [7, 7, 7, 5]
+    kills, _ = resolve_weapons(weapons, targets)
+    assert np.allclose(kills[:3], expected[0]) and kills[3, 0] < expected[0]
+    print(f"  FNP 0 / '0' / '': {expected[0]:.3f} kills, same as no FNP")
+
+    print(f"\n  ✅ PASS: No-FNP values\n")
+
+
+def test_precomputed_curves():
+    """Save curves, FNP factor and Stealth match the probability tables"""
+    print("=" * 60)
+    print("TEST: Precomputed Save Curves")
+    print("=" * 60)
+
+    for key, profile in TARGETS.items():
+        target = compile_target(profile)
+        sv, inv = tables.clip_save(target.sv), tables.clip_save(target.inv)
+        for ap in range(-tables.MAX_AP, tables.MAX_AP + 1):
+            for cover in (0, 1):
+                idx = (sv, tables.ap_index(ap), inv, cover)
+                assert target.save_curve[tables.ap_index(ap), cover] == tables.SAVE_TARGET[idx], key
+                assert target.fail_curve[tables.ap_index(ap), cover] == tables.P_FAIL_SAVE[idx], key
+        assert target.p_fnp_fail == tables.P_FNP_FAIL[tables.clip_save(target.fnp)], key
+        assert target['fail_curve'] is target.fail_curve
+    print(f"  {len(TARGETS)} targets x {2 * tables.MAX_AP + 1} AP values x cover ✓")
+
+    stacked = compile_targets(list(TARGETS.values()))
+    assert stacked['sv'].shape == (len(TARGETS), 1)
+    assert stacked['fail_curve'].shape == (len(TARGETS), 2 * tables.MAX_AP + 1, 2)
+    assert compile_targets([])['fail_curve'].shape == (0, 2 * tables.MAX_AP + 1, 2)
+
+    # Batched (stacked curves), single-target and scalar paths agree
+    weapons = compile_weapons(WEAPONS)
+    profiles = list(TARGETS.values()) + [dict(TARGETS['MEQ'], Stealth='Y')]
+    for half in (False, True):
+        kills, damage = resolve_weapons(weapons, compile_targets(profiles), half)
+        for t, profile in enumerate(profiles):
+            single = resolve_weapons(weapons, compile_target(profile), half)
+            assert np.allclose(single, (kills[t], damage[t]), rtol=0, atol=1e-12)
+            for row, attacker in enumerate(WEAPONS.to_dict('records')):
+                scalar = resolve_single_row(attacker, profile, half)
+                assert np.allclose(scalar, (kills[t, row], damage[t, row]), rtol=0, atol=1e-12)
+    print(f"  {len(profiles)} targets x {len(WEAPONS)} weapons: batched == scalar ✓")
+
+    print(f"\n  ✅ PASS: Curves match the tables\n")
+
+
+def test_compiled_once():
+    """Equal profiles share one CompiledTarget; compiled targets pass through"""
+    print("=" * 60)
+    print("TEST: Targets Compile Once")
+    print("=" * 60)
+
+    target = compile_target(TARGETS['TEQ'])
+    assert isinstance(target, CompiledTarget)
+    assert compile_target(dict(TARGETS['TEQ'])) is target
+    assert compile_target(target) is target
+    assert compile_target(dict(TARGETS['TEQ'], Inv='5+')) is not target
+    assert compile_target(dict(TARGETS['TEQ'], Tags=['elite'])).inv == 4, "Unhashable values still compile"
+
+    stacked = compile_targets([target, TARGETS['MEQ']])
+    assert stacked['inv'].ravel().tolist() == [4, 0]
+
+    # Workers receive compiled targets by pickle
+    copy = pickle.loads(pickle.dumps(target))
+    assert (copy.t, copy.sv, copy.inv) == (target.t, target.sv, target.inv)
+    assert np.array_equal(copy.fail_curve, target.fail_curve)
+    print(f"  {target!r}")
+
+    print(f"\n  ✅ PASS: Targets compile once\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Compiled Target Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_normalization()
+        test_no_fnp_values()
+        test_precomputed_curves()
+        test_compiled_once()
+
+        print("=" * 60)
+        print("✅ ALL COMPILED TARGET TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the dice expression compiler.
+Verify the NdX+M grammar, DiceSpec statistics, caching and the legacy adapters.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import cpk_engine
+from src.engine import math_core
+from src.engine.calculator import apply_blast_modifier, parse_d6_value, safe_int
+from src.engine.dice import DiceSpec, cache_info, compile_dice, parse_int
+
+
+def test_grammar():
+    """NdX+M expressions compile to the right count/faces/modifier"""
+    print("=" * 60)
+    print("TEST: Dice Grammar")
+    print("=" * 60)
+
+    cases = {
+        'D6': (1, 6, 0),
+        '2D6': (2, 6, 0),
+        'D6+2': (1, 6, 2),
+        '2d6+3': (2, 6, 3),
+        'D3': (1, 3, 0),
+        '2D3+1': (2, 3, 1),
+        ' d6 - 1 ': (1, 6, -1),
+        '4': (0, 0, 4),
+        4: (0, 0, 4),
+        '2.0': (0, 0, 2),
+    }
+
+    for expr, (count, faces, modifier) in cases.items():
+        spec = compile_dice(expr)
+        assert (spec.count, spec.faces, spec.modifier) == (count, faces, modifier), \
+            f"{expr!r} compiled to {spec}"
+        print(f"  {expr!r:>10} -> {spec}")
+
+    for bad in ['', None, float('nan'), 'N', 'D', 'D6+X', '2D']:
+        assert compile_dice(bad) is None, f"{bad!r} should not compile"
+
+    print(f"\n  ✅ PASS: Grammar handles dice, D3, fixed and invalid values\n")
+
+
+def test_statistics():
+    """DiceSpec mean/min/max/distribution are exact"""
+    print("=" * 60)
+    print("TEST: DiceSpec Statistics")
+    print("=" * 60)
+
+    spec = compile_dice('2D6+1')
+    assert (spec.mean, spec.min, spec.max) == (8.0, 3, 13), "2D6+1 stats"
+
+    values, probs = spec.distribution
+    assert values[0] == 3 and values[-1] == 13, "Distribution covers min..max"
+    assert np.isclose(probs.sum(), 1.0), "Distribution sums to 1"
+    assert np.isclose(probs[values == 8][0], 6 / 36), "P(2D6+1 == 8) = 6/36"
+    assert np.isclose((values * probs).sum(), spec.mean), "Distribution mean matches"
+
+    d3 = compile_dice('D3')
+    assert np.allclose(d3.pmf, [0, 1 / 3, 1 / 3, 1 / 3]), "D3 pmf indexed by value"
+    assert compile_dice(3).pmf[3] == 1.0, "Fixed value is a point mass"
+
+    print(f"  2D6+1: mean={spec.mean} min={spec.min} max={spec.max}")
+    print(f"\n  ✅ PASS: Statistics are exact\n")
+
+
+def test_interning_and_cache():
+    """Equal expressions share one hashable spec and repeat lookups hit the cache"""
+    print("=" * 60)
+    print("TEST: Interning & LRU Cache")
+    print("=" * 60)
+
+    assert compile_dice('D6+2') is compile_dice('d6 + 2'), "Equivalent expressions share one spec"
+    assert compile_dice('2') is compile_dice(2.0), "Numeric forms share one spec"
+    assert len({compile_dice('D6'), DiceSpec(1, 6, 0)}) == 1, "DiceSpec is hashable by value"
+    assert compile_dice('D6').offset(2) is compile_dice('D6+2'), "Offsets are interned"
+    assert compile_dice('D6+1').scaled(2) is compile_dice('2D6+2'), "Scaling is interned"
+
+    before = cache_info()['dice'].hits
+    for _ in range(100):
+        compile_dice('3D6+1')
+    assert cache_info()['dice'].hits - before >= 99, "Repeat lookups should be cache hits"
+
+    print(f"  Cache: {cache_info()['dice']}")
+    print(f"\n  ✅ PASS: Specs are interned and cached\n")
+
+
+def test_legacy_helpers():
+    """Calculator and legacy engine helpers agree with the compiler"""
+    print("=" * 60)
+    print("TEST: Legacy Helpers")
+    print("=" * 60)
+
+    assert parse_d6_value('D6+2') == 5.5
+    assert parse_d6_value('D3') == 2.0, "D3 is now supported by the main engine"
+    assert parse_d6_value('junk') == 0.0
+    assert safe_int('3+') == 3 and safe_int('-2') == -2 and safe_int('', default=7) == 7
+    assert parse_int('N', default=4) == 4
+
+    assert apply_blast_modifier('2D6+3', 11, True) == '15'
+    assert apply_blast_modifier('2D6+3', 8, True) == '5'
+    assert apply_blast_modifier('D3', 11, True) == '3'
+    assert apply_blast_modifier('D6', 5, True) == 'D6'
+
+    for parse_dice in (math_core.parse_dice, cpk_engine.parse_dice):
+        assert parse_dice('2D3+1') == {'count': 2, 'faces': 3, 'modifier': 1, 'is_fixed': False}
+        assert parse_dice('3') == {'count': 0, 'faces': 0, 'modifier': 3.0, 'is_fixed': True}
+
+    print(f"\n  ✅ PASS: Helpers share one grammar\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Dice Compiler Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_grammar()
+        test_statistics()
+        test_interning_and_cache()
+        test_legacy_helpers()
+
+        print("=" * 60)
+        print("✅ ALL DICE TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
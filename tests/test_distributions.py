@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test exact kill / damage distributions.
+Verify that the PMFs are normalized, agree with the expected-value engine and are cached.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import math
+import numpy as np
+import pandas as pd
+from src.data.rosters import DEFAULT_ROSTER
+from src.data.targets import TARGETS
+from src.engine.calculator import calculate_group_metrics
+from src.engine.distributions import calculate_group_distributions, resolve_distribution, cache_info
+
+
+def _weapon(**overrides):
+    weapon = {
+        'Name': 'Test', 'Pts': 100, 'Weapon': 'Gun', 'A': 2, 'BS': 3, 'S': 4, 'AP': 0, 'D': 1,
+        'CritHit': 6, 'CritWound': 6, 'Sustained': 0, 'Lethal': 'N', 'Dev': 'N',
+    }
+    weapon.update(overrides)
+    return weapon
+
+
+def test_small_exact_case():
+    """Two BS3+ S4 shots into GEQ give a hand-computable binomial"""
+    print("=" * 60)
+    print("TEST: Hand-Computed Distribution")
+    print("=" * 60)
+
+    # P(kill per shot) = hit 4/6 * wound 4/6 (S4 vs T3 = 3+) * fail 4/6 (5+ save)
+    p = (4 / 6) * (4 / 6) * (4 / 6)
+    dist = resolve_distribution(_weapon(), TARGETS['GEQ'])
+
+    expected = [(1 - p) ** 2, 2 * p * (1 - p), p ** 2]
+    assert np.allclose(dist.kills_pmf[:3], expected), f"{dist.kills_pmf[:3]} != {expected}"
+    assert np.allclose(dist.damage_pmf, expected), "W1, D1: damage equals kills"
+    assert np.isclose(dist.prob_kills_at_least(1), 1 - (1 - p) ** 2)
+    assert dist.prob_wipe() == 0.0, "Two shots cannot wipe 20 models"
+
+    print(f"  kills pmf: {np.round(dist.kills_pmf[:3], 4)}")
+    print(f"\n  ✅ PASS: Matches the binomial\n")
+
+
+def test_carry_over_and_wipe():
+    """Damage does not spill between models; a single model can be wiped"""
+    print("=" * 60)
+    print("TEST: Carry-Over + Wipe")
+    print("=" * 60)
+
+    # Torrent, no save: each D2 attack lands when the wound roll (2+) succeeds.
+    # Two D2 wounds kill one W3 model and the third point is wasted.
+    target = {'Name': 'Wall', 'Pts': 50, 'T': 1, 'W': 3, 'Sv': '7+', 'Inv': '', 'FNP': '', 'UnitSize': 2}
+    dist = resolve_distribution(_weapon(A=4, D=2, S=10, Torrent='Y'), target)
+
+    q = 5 / 6
+    landed = [math.comb(4, n) * q ** n * (1 - q) ** (4 - n) for n in range(5)]
+    expected = [landed[0] + landed[1], landed[2] + landed[3], landed[4]]
+    assert np.allclose(dist.kills_pmf, expected), f"{dist.kills_pmf} != {expected}"
+    assert np.isclose(dist.prob_wipe(), q ** 4), "Wiping needs all four wounds"
+    assert np.isclose(dist.mean_damage, 4 * q * 2), "Raw damage is not capped"
+
+    print(f"\n  ✅ PASS: Allocation is model by model\n")
+
+
+def test_means_match_engine():
+    """Mean damage equals calculate_group_metrics for every unit and target"""
+    print("=" * 60)
+    print("TEST: Means Match Expected-Value Engine")
+    print("=" * 60)
+
+    df = pd.DataFrame(DEFAULT_ROSTER)
+    for deduplicate in (True, False):
+        for t_key, t_stats in TARGETS.items():
+            expected = calculate_group_metrics(df, t_stats, deduplicate=deduplicate)
+            actual = calculate_group_distributions(df, t_stats, deduplicate=deduplicate)
+            assert len(expected) == len(actual)
+            for e, a in zip(expected, actual):
+                dist = a['Distribution']
+                assert (e['Name'], e['Kills']) == (a['Name'], a['Kills']), "Unit metrics unchanged"
+                assert np.isclose(dist.mean_damage, e['Damage']), \
+                    f"{a['Name']} vs {t_key}: {dist.mean_damage} != {e['Damage']}"
+                assert np.isclose(dist.kills_pmf.sum(), 1.0) and np.isclose(dist.damage_pmf.sum(), 1.0)
+                assert 0.0 <= dist.mean_kills <= t_stats['UnitSize']
+
+    print(f"\n  ✅ PASS: Distributions agree with expected values\n")
+
+
+def test_cache_and_summary():
+    """Repeated (weapon, target) pairs hit the cache; summary is consistent"""
+    print("=" * 60)
+    print("TEST: Cache + Summary")
+    print("=" * 60)
+
+    weapon = _weapon(A='D6+1', D='D3', Sustained=1, Dev='Y')
+    resolve_distribution(weapon, TARGETS['MEQ'])
+    before = cache_info().hits
+    dist = resolve_distribution(weapon, TARGETS['MEQ'])
+    assert cache_info().hits == before + 1, "Second lookup should be a cache hit"
+
+    summary = dist.summary()
+    at_least = summary['P_Kills_At_Least']
+    assert at_least[0] == 1.0 and all(a >= b for a, b in zip(at_least, at_least[1:])), "P(kills >= N) decreases"
+    assert np.isclose(summary['P_Wipe'], at_least[-1])
+    assert summary['Kills_Percentiles']['0.1'] <= summary['Kills_Percentiles']['0.9']
+
+    print(f"  {cache_info()}")
+    print(f"\n  ✅ PASS: Cached and summarized\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Distribution Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_small_exact_case()
+        test_carry_over_and_wipe()
+        test_means_match_engine()
+        test_cache_and_summary()
+
+        print("=" * 60)
+        print("✅ ALL DISTRIBUTION TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
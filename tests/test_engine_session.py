@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the incremental engine session.
+Verify EngineSession gives calculate_group_metrics() results and only
+recomputes the rows and units an edit touched.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine.calculator import calculate_group_metrics, prepare_roster
+from src.engine.session import EngineSession, row_hashes
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Intercessors', 'Bolt Rifle', Qty=5),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M'),
+        _row('Hellblasters', 'Plasma (Std)', A=2, S=7, AP=-2, D=1, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', A=2, S=8, AP=-3, D=2, **{'Profile ID': 'P1'}),
+        _row('Devastators', 'Lascannon', A=1, S=12, AP=-3, D='D6+1', Qty=2),
+        _row('Devastators', 'Heavy Bolter', A=3, S=5, AP=-1, D=2, Sustained=1),
+        _row('Inceptors', 'Assault Bolter', A='D3', S=5, AP=-1, D=2, Blast='Y'),
+    ])
+
+
+def _assert_same(results, expected, label):
+    assert len(results) == len(expected), f"{label}: {len(results)} units vs {len(expected)}"
+    for got, want in zip(results, expected):
+        assert got.keys() == want.keys(), f"{label}: keys differ for {want['Name']}"
+        for key, value in want.items():
+            if isinstance(value, float):
+                assert np.isclose(got[key], value), f"{label}: {want['Name']} {key} {got[key]} != {value}"
+            else:
+                assert got[key] == value, f"{label}: {want['Name']} {key} {got[key]} != {value}"
+
+
+def test_matches_group_metrics():
+    """Session results equal calculate_group_metrics() for every target and setting"""
+    print("=" * 60)
+    print("TEST: Session == calculate_group_metrics")
+    print("=" * 60)
+
+    df = _roster()
+    targets = {key: TARGETS[key] for key in ('GEQ', 'MEQ', 'TEQ')}
+    for deduplicate in (True, False):
+        for half_range in (False, True):
+            session = EngineSession(targets, deduplicate, half_range)
+            session.update(df)
+            for label, target in targets.items():
+                expected = calculate_group_metrics(df, target, deduplicate, half_range)
+                _assert_same(session.results(label), expected, f"{label} dedup={deduplicate} half={half_range}")
+    print(f"  {len(targets)} targets x 4 settings ✓")
+
+    print(f"\n  ✅ PASS: Session matches the full recompute\n")
+
+
+def test_edit_recomputes_one_unit():
+    """Editing one row resolves that row only and re-aggregates only its unit"""
+    print("=" * 60)
+    print("TEST: Single Edit")
+    print("=" * 60)
+
+    df = _roster()
+    session = EngineSession({'MEQ': TARGETS['MEQ']})
+    first = session.update(df)
+    assert first.rows_resolved == len(df)
+    assert len(first.updated['MEQ']) == len(session.results())
+
+    edited = df.copy()
+    edited.loc[5, 'A'] = 4  # Devastators' Heavy Bolter
+    delta = session.update(edited)
+    assert delta.rows_resolved == 1, f"Expected 1 row resolved, got {delta.rows_resolved}"
+    assert delta.names_changed == ['Devastators'], delta.names_changed
+    assert [r['Name'] for r in delta.updated['MEQ']] == ['Devastators']
+    assert not delta.removed['MEQ']
+    _assert_same(session.results(), calculate_group_metrics(edited, TARGETS['MEQ']), "after edit")
+
+    repeat = session.update(edited)
+    assert repeat.rows_resolved == 0 and repeat.is_empty, "Re-sending the same roster changes nothing"
+
+    # A new unit is aggregated on its own; existing units are left alone
+    copied = pd.concat([edited, edited.iloc[[0]].assign(UnitID='Sternguard', Name='Sternguard')], ignore_index=True)
+    hashes = row_hashes(prepare_roster(copied))
+    assert hashes.size == len(copied) and hashes[-1] != hashes[0], "Row hashes include the unit"
+    delta = session.update(copied)
+    assert delta.rows_resolved == 1 and delta.names_changed == ['Sternguard']
+    print(f"  edit -> 1 row, 1 unit; new unit -> {delta.rows_resolved} row")
+
+    print(f"\n  ✅ PASS: Edits only touch their unit\n")
+
+
+def test_removed_units_and_totals():
+    """Deleted units are reported and totals follow the current roster"""
+    print("=" * 60)
+    print("TEST: Removed Units and Totals")
+    print("=" * 60)
+
+    df = _roster()
+    targets = {'MEQ': TARGETS['MEQ'], 'TEQ': TARGETS['TEQ']}
+    session = EngineSession(targets)
+    session.update(df)
+
+    trimmed = df[df['Name'] != 'Inceptors']
+    delta = session.update(trimmed)
+    for label in targets:
+        assert delta.removed[label] == [('Inceptors', 'Inceptors', 'Ranged')], delta.removed[label]
+        assert not delta.updated[label]
+
+        expected = calculate_group_metrics(trimmed, targets[label])
+        totals = delta.totals[label]
+        assert np.isclose(totals['Kills'], sum(r['Kills'] for r in expected))
+        assert np.isclose(totals['Damage'], sum(r['Damage'] for r in expected))
+        assert totals['Pts'] == sum(r['Pts'] * r['Qty'] for r in expected)
+        assert session.totals(label) == totals
+
+    assert delta.to_dict()['removed']['MEQ'] == [['Inceptors', 'Inceptors', 'Ranged']]
+
+    empty = session.update(df.iloc[:0])
+    assert session.results() == [] and len(empty.removed['MEQ']) == len(calculate_group_metrics(trimmed, TARGETS['MEQ']))
+    print(f"  totals MEQ: {delta.totals['MEQ']}")
+
+    print(f"\n  ✅ PASS: Removed units and totals\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Engine Session Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_matches_group_metrics()
+        test_edit_recomputes_one_unit()
+        test_removed_units_and_totals()
+
+        print("=" * 60)
+        print("✅ ALL ENGINE SESSION TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
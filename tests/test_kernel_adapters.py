@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test that every engine entry point goes through the resolve kernel.
+Verify the scalar and batched kernel paths agree, and that the legacy
+math_core / cpk_engine helpers give the calculator's numbers.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+import cpk_engine
+from src.data.targets import TARGETS
+from src.engine import math_core, tables
+from src.engine.calculator import calculate_group_metrics, resolve_single_row, resolve_weapon_profile
+from src.engine.kernel import (
+    compile_weapon, compile_weapons, compile_target, compile_targets, reroll_mode, resolve_weapons, resolve_profile,
+)
+
+PROFILES = [
+    {'Name': 'Bolt Rifle', 'Pts': 90, 'A': 2, 'BS': '3+', 'S': 4, 'AP': -1, 'D': 1},
+    {'Name': 'Lascannon', 'Pts': 120, 'A': 1, 'BS': 4, 'S': 12, 'AP': -3, 'D': 'D6+1', 'RR_H': '1'},
+    {'Name': 'Flamer', 'Pts': 70, 'A': 'D6', 'BS': 4, 'S': 4, 'AP': 0, 'D': 1, 'Torrent': 'Y', 'IgnoresCover': 'Y'},
+    {'Name': 'Plasma', 'Pts': 110, 'A': 'D3', 'BS': 3, 'S': 8, 'AP': -3, 'D': 2, 'Blast': 'Y', 'Sustained': 1},
+    {'Name': 'Melta', 'Pts': 100, 'A': 2, 'BS': 4, 'S': 9, 'AP': -4, 'D': 'D6', 'Dev': 'Y', 'TwinLinked': 'Y'},
+    {'Name': 'Claws', 'Pts': 80, 'A': 5, 'BS': 3, 'S': 5, 'AP': -2, 'D': 2, 'Range': 'M',
+     'Lethal': 'Y', 'CritHit': 5, 'RR_W': 'F', '__assume_cover__': True},
+]
+
+
+def test_scalar_matches_batched():
+    """resolve_profile() (scalar) equals resolve_weapons() (batched) for every target"""
+    print("=" * 60)
+    print("TEST: Scalar Path == Batched Path")
+    print("=" * 60)
+
+    targets = list(TARGETS.values())
+    weapons = compile_weapons(pd.DataFrame(PROFILES))
+
+    for half_range in (False, True):
+        kills, damage = resolve_weapons(weapons, compile_targets(targets), half_range)
+        for ti, target in enumerate(targets):
+            for pi, profile in enumerate(PROFILES):
+                scalar = resolve_profile(profile, target, half_range)
+                assert np.allclose(scalar, (kills[ti, pi], damage[ti, pi])), \
+                    f"{profile['Name']} vs {target['Name']} (half range={half_range})"
+    print(f"  {len(PROFILES)} profiles x {len(targets)} targets ✓")
+
+    print(f"\n  ✅ PASS: Both kernel paths agree\n")
+
+
+def test_row_adapters():
+    """resolve_single_row() and resolve_weapon_profile() take dicts and rows alike"""
+    print("=" * 60)
+    print("TEST: Row Adapters")
+    print("=" * 60)
+
+    target = TARGETS['MEQ']
+    for profile in PROFILES:
+        expected = resolve_profile(profile, target)
+        assert np.allclose(resolve_single_row(pd.Series(profile), target), expected), profile['Name']
+        assert np.allclose(resolve_single_row(profile, target), expected), profile['Name']
+
+        result = resolve_weapon_profile(profile, target)
+        assert np.isclose(result['dead_models'], expected[0]) and np.isclose(result['total_damage'], expected[1])
+        print(f"  {profile['Name']:<12} kills={expected[0]:.3f} damage={expected[1]:.3f}")
+
+    print(f"\n  ✅ PASS: Adapters return kernel results\n")
+
+
+def test_cpk_engine_matches_calculator():
+    """cpk_engine.calculate_cpk() equals the calculator's CPK for a one-weapon unit"""
+    print("=" * 60)
+    print("TEST: cpk_engine == calculator")
+    print("=" * 60)
+
+    for t_key in ('GEQ', 'MEQ', 'TEQ', 'CUST'):
+        target = TARGETS[t_key]
+        for profile in PROFILES:
+            row = dict(profile, UnitID=profile['Name'], Qty=1, Weapon=profile['Name'],
+                       **{'Loadout Group': 'Ranged', 'Profile ID': '', 'Keywords': ''})
+            row.pop('__assume_cover__', None)
+            attacker = {k: v for k, v in profile.items() if k != '__assume_cover__'}
+
+            expected = calculate_group_metrics(pd.DataFrame([row]), target)[0]['CPK']
+            assert np.isclose(cpk_engine.calculate_cpk(attacker, target), round(expected, 2)), \
+                f"{profile['Name']} vs {t_key}"
+
+    no_hits = {'Pts': 50, 'A': 0, 'BS': 4, 'S': 4, 'AP': 0, 'D': 1}
+    assert cpk_engine.calculate_cpk(no_hits, TARGETS['MEQ']) == 999.9, "No kills keeps the 999.9 sentinel"
+
+    print(f"\n  ✅ PASS: CPK agrees across engines\n")
+
+
+def test_probability_helpers():
+    """math_core / cpk_engine probability helpers read the shared tables"""
+    print("=" * 60)
+    print("TEST: Probability Helpers")
+    print("=" * 60)
+
+    assert np.isclose(math_core.get_hit_prob(3, 'N'), 4 / 6)
+    assert np.isclose(math_core.get_hit_prob(3, '1'), 4 / 6 + 1 / 6 * 4 / 6)
+    assert np.isclose(math_core.get_hit_prob(3, 'F'), 4 / 6 + 2 / 6 * 4 / 6)
+    assert np.isclose(math_core.get_hit_prob(7, 'N'), 1 / 6), "An unmodified 6 always hits"
+
+    assert np.isclose(math_core.get_crit_prob(6, 'N'), 1 / 6)
+    assert np.isclose(math_core.get_crit_prob(5, '1'), 2 / 6 + 1 / 6 * 2 / 6)
+    assert np.isclose(math_core.get_crit_prob(6, 'F'), 1 / 6 + 5 / 6 * 1 / 6), "Fishing rerolls every non-crit"
+    assert np.isclose(math_core.get_crit_prob(6, 'F', target=3), 1 / 6 + 2 / 6 * 1 / 6), "Only misses are rerolled"
+    assert cpk_engine.get_crit_prob is math_core.get_crit_prob
+
+    for bs in range(2, 7):
+        for rr, mode in (('N', tables.REROLL_NONE), ('1', tables.REROLL_ONES), ('F', tables.REROLL_FAILS)):
+            assert math_core.get_hit_prob(bs, rr) == tables.P_HIT[bs, 6, mode]
+    assert math_core.get_hit_prob(12, 'N') == tables.P_HIT[tables.MAX_BS, 6, 0]
+    assert math_core.get_crit_prob(-1, 'N', target=12) == tables.P_CRIT_HIT[tables.MAX_BS, 0, 0]
+    assert type(math_core.get_hit_prob(3, 'N')) is float
+
+    print(f"\n  ✅ PASS: Helpers match the tables\n")
+
+
+def test_scalar_path_caches():
+    """Weapon dicts compile once per content; list tables and reroll spellings match the slow paths"""
+    print("=" * 60)
+    print("TEST: Scalar Path Caches")
+    print("=" * 60)
+
+    profile = PROFILES[1]
+    weapon = compile_weapon(profile)
+    assert compile_weapon(dict(profile)) is weapon, "Equal dicts share one WeaponProfile"
+    assert compile_weapon(dict(profile, BS=2)) is not weapon
+    assert compile_weapon(pd.Series(profile)).bs == weapon.bs
+    unhashable = compile_weapon(dict(profile, Keywords=['Heavy']))
+    assert unhashable.a_spec == weapon.a_spec and unhashable.bs == weapon.bs
+
+    for name in ('P_HIT', 'P_CRIT_HIT', 'P_WOUND', 'P_CRIT_WOUND'):
+        assert np.array_equal(np.array(getattr(tables, f'{name}_LIST')), getattr(tables, name)), name
+    target = compile_target(TARGETS['MEQ'])
+    assert np.array_equal(np.array(target.fail_list), target.fail_curve)
+
+    slow = {'1': tables.REROLL_ONES, 'Y': tables.REROLL_FAILS, 'F': tables.REROLL_FAILS}
+    for value in ('1', 'Y', 'y', 'F', 'f', ' f ', 'N', 'n', '', 1, 'Full', None, np.nan, True):
+        assert reroll_mode(value) == slow.get(str(value).strip().upper(), tables.REROLL_NONE), repr(value)
+
+    print(f"\n  ✅ PASS: Scalar caches agree\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Kernel Adapter Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_scalar_matches_batched()
+        test_row_adapters()
+        test_cpk_engine_matches_calculator()
+        test_probability_helpers()
+        test_scalar_path_caches()
+
+        print("=" * 60)
+        print("✅ ALL KERNEL ADAPTER TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
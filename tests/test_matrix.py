@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the weapons x targets matrix API.
+Verify that calculate_matrix matches calculate_group_metrics target by target.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.rosters import DEFAULT_ROSTER
+from src.data.targets import TARGETS
+from src.engine.calculator import calculate_group_metrics
+from src.engine.matrix import calculate_matrix
+
+
+def _roster():
+    """Default roster plus a melta unit so range variants are exercised"""
+    melta_unit = {
+        'UnitID': 'melta-1', 'Qty': 3, 'Name': 'Melta Squad', 'Loadout Group': 'Ranged',
+        'Pts': 90, 'Range': 12, 'Profile ID': '', 'Keywords': '', 'Weapon': 'Meltagun',
+        'A': 1, 'BS': 3, 'S': 9, 'AP': -4, 'D': 'D6', 'Melta': 2, 'RapidFire': 'N',
+    }
+    return pd.DataFrame(DEFAULT_ROSTER + [melta_unit])
+
+
+def _assert_same(expected, actual):
+    assert len(expected) == len(actual), f"Unit count {len(actual)} != {len(expected)}"
+    for e, a in zip(expected, actual):
+        assert (e['UnitID'], e['Name'], e['Weapon']) == (a['UnitID'], a['Name'], a['Weapon']), \
+            f"Unit mismatch: {e['Name']} vs {a['Name']}"
+        for metric in ('Kills', 'Damage', 'CPK', 'TTK'):
+            assert np.isclose(e[metric], a[metric]), \
+                f"{e['Name']} {metric}: {a[metric]} != {e[metric]}"
+
+
+def test_matrix_matches_group_metrics():
+    """Each matrix column equals a calculate_group_metrics call for that target"""
+    print("=" * 60)
+    print("TEST: Matrix Parity")
+    print("=" * 60)
+
+    df = _roster()
+
+    for deduplicate in (True, False):
+        for half_range in (False, True):
+            matrix = calculate_matrix(df, TARGETS, deduplicate=deduplicate, assume_half_range=half_range)
+
+            assert matrix['Kills'].shape == (len(matrix.units), len(TARGETS)), "Matrix should be units x targets"
+
+            for t_key, t_stats in TARGETS.items():
+                expected = calculate_group_metrics(df, t_stats, deduplicate=deduplicate, assume_half_range=half_range)
+                _assert_same(expected, matrix.target_results(t_key))
+
+    print(f"\n  Checked {len(TARGETS)} targets x 4 flag combinations")
+    print(f"\n  ✅ PASS: Matrix matches per-target results\n")
+
+
+def test_matrix_target_list_and_cover():
+    """Target lists are labelled by name and assume_cover matches the per-row column"""
+    print("=" * 60)
+    print("TEST: Matrix Target List + Cover")
+    print("=" * 60)
+
+    df = _roster()
+    targets = [TARGETS['GEQ'], TARGETS['MEQ']]
+
+    matrix = calculate_matrix(df, targets, assume_cover=True)
+    assert matrix.targets == [TARGETS['GEQ']['Name'], TARGETS['MEQ']['Name']], "List targets use profile names"
+
+    covered = df.copy()
+    covered['__assume_cover__'] = True
+    for col, t_stats in enumerate(targets):
+        _assert_same(calculate_group_metrics(covered, t_stats), matrix.column_results(col))
+
+    frame = matrix.to_frame('CPK')
+    assert list(frame.columns) == matrix.targets, "Frame columns should be target labels"
+    assert 'War Dog Karnivore [Melee]' in frame.index, "Frame index should be unit labels"
+
+    print(f"\n  CPK table:\n{frame.round(2)}")
+    print(f"\n  ✅ PASS: Target lists and cover handled\n")
+
+
+def test_matrix_empty_roster():
+    """Empty roster gives an empty matrix"""
+    print("=" * 60)
+    print("TEST: Matrix Empty Roster")
+    print("=" * 60)
+
+    matrix = calculate_matrix(pd.DataFrame(), TARGETS)
+    assert matrix.units == [], "No units expected"
+    assert matrix['CPK'].shape == (0, len(TARGETS)), "Empty matrix keeps the target axis"
+
+    print(f"\n  ✅ PASS: Empty roster handled\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Matrix API Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_matrix_matches_group_metrics()
+        test_matrix_target_list_and_cover()
+        test_matrix_empty_roster()
+
+        print("=" * 60)
+        print("✅ ALL MATRIX TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
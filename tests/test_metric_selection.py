@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test lazy metric selection.
+Verify metrics= returns only the requested result columns (plus unit keys,
+Qty and Pts), that every subset carries the same values as a full run,
+and that the API leaves unrequested metrics out.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from backend.main import app
+from src.data.targets import TARGETS
+from src.engine.calculator import RESULT_METRICS, calculate_group_metrics, select_metrics, trim_results
+from src.engine.matrix import calculate_matrix
+
+UNIT_KEYS = ('UnitID', 'Name', 'Loadout Group', 'Qty', 'Pts', 'Profile ID')
+
+SUBSETS = ([], ['Kills'], ['Damage'], ['CPK'], ['CPK_Grade'], ['TTK', 'Weapon'], ['Weapon', 'Kills', 'Damage'])
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=3),
+        _row('Hellblasters', 'Plasma (Std)', S=7, AP=-2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', S=8, AP=-3, D=2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Intercessors', 'Bolt Rifle', Qty=5, Sustained=1, CritHit=5),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M'),
+        _row('Grots', 'Blasta', A=0, S=3, AP=0, Pts=40),
+    ])
+
+
+def _expected(full, metrics):
+    return [{k: v for k, v in r.items() if k not in RESULT_METRICS or k in metrics} for r in full]
+
+
+def test_group_metrics_subsets():
+    """calculate_group_metrics(metrics=...) equals the full results, trimmed"""
+    print("=" * 60)
+    print("TEST: Group Metrics Subsets")
+    print("=" * 60)
+
+    df = _roster()
+    full_meq = calculate_group_metrics(df, TARGETS['MEQ'])
+    for target in ('GEQ', 'MEQ', 'TEQ'):
+        full = calculate_group_metrics(df, TARGETS[target])
+        assert calculate_group_metrics(df, TARGETS[target], metrics=RESULT_METRICS) == full
+        for metrics in SUBSETS:
+            subset = calculate_group_metrics(df, TARGETS[target], metrics=metrics)
+            assert subset == _expected(full, metrics), (target, metrics)
+            assert all(set(r) == set(UNIT_KEYS) | set(metrics) for r in subset), metrics
+    print(f"  {len(SUBSETS)} subsets x 3 targets match the full results ✓")
+
+    # Exact allocation is trimmed the same way
+    full = calculate_group_metrics(df, TARGETS['MEQ'], allocation='exact')
+    assert calculate_group_metrics(df, TARGETS['MEQ'], allocation='exact', metrics=['CPK']) == _expected(full, ['CPK'])
+
+    assert select_metrics() == frozenset(RESULT_METRICS)
+    assert trim_results(full, ['Kills'])[0].keys() == set(UNIT_KEYS) | {'Kills'}
+    assert 'CPK' in full[0], "trim_results() returns copies"
+    assert calculate_group_metrics(df, TARGETS['MEQ'], metrics='Kills') == _expected(full_meq, ['Kills'])
+    for bad in (['Kills', 'Wounds'], 'Wounds'):
+        try:
+            calculate_group_metrics(df, TARGETS['MEQ'], metrics=bad)
+            assert False, f"metrics={bad!r} should raise"
+        except ValueError as e:
+            print(f"  metrics={bad!r}: {e}")
+
+    print(f"\n  ✅ PASS: Group metrics subsets\n")
+
+
+def test_matrix_subsets():
+    """calculate_matrix(metrics=...) fills only the arrays it needs"""
+    print("=" * 60)
+    print("TEST: Matrix Subsets")
+    print("=" * 60)
+
+    df = _roster()
+    full = calculate_matrix(df, TARGETS)
+    for metrics in SUBSETS:
+        matrix = calculate_matrix(df, TARGETS, metrics=metrics)
+        needed = set(metrics) | ({'CPK'} if 'CPK_Grade' in metrics else set())
+        assert set(matrix.values) == {'Pts'} | (needed - {'Weapon', 'CPK_Grade'}), metrics
+        for metric, values in matrix.values.items():
+            assert np.array_equal(values, full.values[metric], equal_nan=True), metric
+        assert (matrix.modes != '').any() == ('Weapon' in metrics), "Mode labels are only joined for 'Weapon'"
+        for col in range(len(TARGETS)):
+            assert matrix.column_results(col) == _expected(full.column_results(col), metrics), metrics
+        print(f"  metrics={metrics}: {sorted(matrix.values)}")
+
+    print(f"\n  ✅ PASS: Matrix subsets\n")
+
+
+def test_api_metrics():
+    """The API computes and returns only the requested metrics"""
+    print("=" * 60)
+    print("TEST: API Metric Selection")
+    print("=" * 60)
+
+    client = TestClient(app)
+    meq = {'Name': 'MEQ', 'Pts': 18, 'T': 4, 'W': 2, 'Sv': '3+', 'UnitSize': 5}
+    weapons = [{k: v for k, v in row.items() if pd.notna(v)} for row in _roster().to_dict('records')]
+
+    full = client.post('/api/calculator/calculate', json={'weapons': weapons, 'target': meq}).json()
+    kills = client.post('/api/calculator/calculate', json={'weapons': weapons, 'target': meq,
+                                                           'metrics': ['Kills']}).json()
+    assert [m['Kills'] for m in kills['metrics']] == [m['Kills'] for m in full['metrics']]
+    assert all(m['CPK'] is None and m['Weapon'] is None for m in kills['metrics'])
+    assert kills['total_kills'] == full['total_kills']
+
+    cpk = client.post('/api/calculator/calculate', json={'weapons': weapons, 'target': meq,
+                                                         'metrics': ['CPK']}).json()
+    assert cpk['total_kills'] is None and cpk['avg_cpk'] is None
+    assert [m['CPK'] for m in cpk['metrics']] == [m['CPK'] for m in full['metrics']]
+
+    response = client.post('/api/calculator/calculate-multi-target',
+                           json={'weapons': weapons, 'targets': [meq], 'metrics': ['Kills', 'Weapon']})
+    assert response.status_code == 200, response.text
+    rows = response.json()['results']['MEQ']['metrics']
+    assert all('CPK' not in m and 'Damage' not in m for m in rows)
+    assert [(m['Weapon'], m['Kills']) for m in rows] == [(m['Weapon'], m['Kills']) for m in full['metrics']]
+    print(f"  multi-target row keys: {sorted(rows[0])}")
+
+    bad = client.post('/api/calculator/calculate', json={'weapons': weapons, 'target': meq, 'metrics': ['Wounds']})
+    assert bad.status_code == 422
+
+    print(f"\n  ✅ PASS: API metric selection\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Metric Selection Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_group_metrics_subsets()
+        test_matrix_subsets()
+        test_api_metrics()
+
+        print("=" * 60)
+        print("✅ ALL METRIC SELECTION TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -275,6 +275,43 @@ def test_no_profile_id_with_melta():
     else:
         print(f"\n  ❌ FAIL: Expected 1 result")
 
+def test_nan_group_key_labels():
+    """
+    A unit with a NaN group key gets no result row, so its modes must not
+    leak into another unit's active-mode label.
+    """
+    print("\n" + "=" * 60)
+    print("TEST: Mode Labels With a NaN Group Key")
+    print("=" * 60)
+
+    def row(unit, group, weapon, **stats):
+        base = {
+            'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': group, 'Pts': 100,
+            'Range': 24, 'Profile ID': 'P', 'Keywords': '', 'Weapon': weapon,
+            'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+        }
+        base.update(stats)
+        return base
+
+    alpha = [
+        row('Alpha', 'A', 'Flamer', A='D6', AP=0, Torrent='Y'),
+        row('Alpha', 'A', 'Melta', A=1, S=9, AP=-4, D='D6'),
+    ]
+    beta = row('Beta', float('nan'), 'Plasma', S=8, AP=-3, D=2)
+    meq = TARGETS['MEQ']
+    for deduplicate in (True, False):
+        expected = calculate_group_metrics(pd.DataFrame(alpha), meq, deduplicate)
+        results = calculate_group_metrics(pd.DataFrame(alpha + [beta]), meq, deduplicate)
+        assert [r['Weapon'] for r in results] == [r['Weapon'] for r in expected] == ['Melta'], results
+        assert results[0]['Kills'] == expected[0]['Kills']
+
+        # Also with the NaN-keyed unit sorted before the real one
+        results = calculate_group_metrics(pd.DataFrame([dict(beta, Name='Aardvark')] + alpha), meq, deduplicate)
+        assert [r['Weapon'] for r in results] == ['Melta'], results
+
+    print(f"  Alpha's active mode: Melta (Beta has a NaN Loadout Group and no result)")
+    print(f"\n  ✅ PASS: NaN-keyed units do not leak into mode labels")
+
 if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("Multi-Mode Range Weapon Corner Case Tests")
@@ -284,6 +321,7 @@ if __name__ == "__main__":
         test_multi_mode_with_range_weapon()
         test_multi_mode_different_profile_ids()
         test_no_profile_id_with_melta()
+        test_nan_group_key_labels()
 
         print("\n" + "=" * 60)
         print("✅ ALL CORNER CASE TESTS PASSED")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test process-pool sharded matrix evaluation.
+Verify calculate_matrix(workers=N) equals the in-process matrix, that small
+inputs stay in-process, and that shared memory round-trips and is released.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine import parallel
+from src.engine.dice import compile_dice
+from src.engine.matrix import calculate_matrix, METRICS
+from src.engine.parallel import SharedArrays, _load, resolve_workers, should_shard
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Intercessors', 'Bolt Rifle', Qty=5),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M', **{'Loadout Group': 'Melee'}),
+        _row('Hellblasters', 'Plasma (Std)', S=7, AP=-2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', S=8, AP=-3, D=2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=3),
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=6, UnitID='E2'),
+        _row('Inceptors', 'Assault Bolter', A='D6', BS=2, S=5, AP=0, Blast='Y', Qty=3),
+        _row('Terminators', 'Chainfist', A=4, S=5, D='D3', Lethal='Y', Dev='Y', Range='M', Qty=5),
+        _row('Scouts', 'Bolt Pistol', A=1, AP=0, Qty=5, Keywords=None),
+    ])
+
+
+def _assert_same(a, b):
+    assert a.units == b.units
+    assert a.targets == b.targets
+    for m in METRICS:
+        assert np.allclose(a[m], b[m], equal_nan=True), m
+    assert (a.modes == b.modes).all()
+
+
+def test_sharded_matches_in_process():
+    """Every worker count gives the in-process matrix"""
+    print("=" * 60)
+    print("TEST: Sharded == In-Process")
+    print("=" * 60)
+
+    df = _roster()
+    original = parallel.PARALLEL_MIN_CELLS
+    parallel.PARALLEL_MIN_CELLS = 0
+    try:
+        for deduplicate in (True, False):
+            for half_range in (False, True):
+                expected = calculate_matrix(df, TARGETS, deduplicate, half_range)
+                for workers in (2, 3, 2 * len(TARGETS)):
+                    _assert_same(calculate_matrix(df, TARGETS, deduplicate, half_range, workers=workers), expected)
+        _assert_same(calculate_matrix(df, TARGETS, assume_cover=True, workers=2),
+                     calculate_matrix(df, TARGETS, assume_cover=True))
+    finally:
+        parallel.PARALLEL_MIN_CELLS = original
+    print(f"  workers 2, 3, {2 * len(TARGETS)} x dedup x half range ✓")
+
+    print(f"\n  ✅ PASS: Sharded results match\n")
+
+
+def test_small_inputs_stay_in_process():
+    """Below PARALLEL_MIN_CELLS (or with one worker) no pool is started"""
+    print("=" * 60)
+    print("TEST: Small Inputs Stay In-Process")
+    print("=" * 60)
+
+    assert not should_shard(100, 10, workers=8)
+    assert not should_shard(10 ** 6, 10, workers=1)
+    assert should_shard(10 ** 6, 10, workers=2)
+    assert resolve_workers(None) == (os.cpu_count() or 1) and resolve_workers(0) == 1
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("A small matrix should not start a process pool")
+
+    original = parallel.sharded_unit_metrics
+    import src.engine.matrix as matrix
+    matrix.sharded_unit_metrics = no_pool
+    try:
+        calculate_matrix(_roster(), TARGETS, workers=8)
+    finally:
+        matrix.sharded_unit_metrics = original
+
+    print(f"\n  ✅ PASS: Small inputs stay in-process\n")
+
+
+def test_shared_arrays_round_trip():
+    """Numeric and object arrays round-trip through shared memory; blocks are unlinked after"""
+    print("=" * 60)
+    print("TEST: Shared Arrays Round Trip")
+    print("=" * 60)
+
+    arrays = {
+        'bs': np.array([3, 4, 2]),
+        'lethal': np.array([True, False, True]),
+        'target': np.array([[4], [7]]),
+        'spec': np.array([compile_dice('D6'), compile_dice(2), compile_dice('D6')], dtype=object),
+        'name': np.array(['a', None, 'a'], dtype=object),
+    }
+    shared = SharedArrays(arrays)
+    try:
+        loaded = _load(shared.spec)
+        rows = _load({k: shared.spec[k] for k in ('bs', 'spec')}, np.array([0, 2]))
+    finally:
+        names = [block.name for block in shared.blocks]
+        shared.release()
+
+    for name, values in arrays.items():
+        if name != 'name':
+            assert loaded[name].tolist() == values.tolist(), name
+    assert loaded['name'][[0, 2]].tolist() == ['a', 'a'] and pd.isna(loaded['name'][1])
+    assert rows['bs'].tolist() == [3, 2] and rows['spec'].tolist() == [compile_dice('D6')] * 2
+    assert shared.spec['spec'][1] == '<i8', "Object arrays are stored as codes"
+
+    for name in names:
+        try:
+            shared_memory.SharedMemory(name=name).close()
+            raise AssertionError(f"Block {name} was not unlinked")
+        except FileNotFoundError:
+            pass
+
+    print(f"\n  ✅ PASS: Shared arrays round trip\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Parallel Matrix Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_sharded_matches_in_process()
+        test_small_inputs_stay_in_process()
+        test_shared_arrays_round_trip()
+
+        print("=" * 60)
+        print("✅ ALL PARALLEL MATRIX TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test profile hash-consing in the kernel.
+Verify each distinct weapon profile is resolved once and scattered back to its rows.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine import kernel
+from src.engine.calculator import calculate_group_metrics
+from src.engine.kernel import compile_weapons, compile_target, resolve_weapons, resolve_unique_weapons, unique_weapons
+from src.engine.matrix import calculate_matrix
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _tournament_roster(squads):
+    """Many squads sharing a handful of weapon profiles"""
+    rows = []
+    for i in range(squads):
+        rows.append(_row(f'Intercessors {i}', 'Bolt Rifle'))
+        rows.append(_row(f'Intercessors {i}', 'Bolt Pistol', A=1, BS='3+', AP=0))
+        rows.append(_row(f'Intercessors {i}', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M'))
+        rows.append(_row(f'Intercessors {i}', 'Plasma', A='D3', S=8, AP=-3, D=2, Blast='Y'))
+    return pd.DataFrame(rows)
+
+
+def test_canonical_profiles():
+    """Rows that only differ in names, points or spelling share one profile"""
+    print("=" * 60)
+    print("TEST: Canonical Profiles")
+    print("=" * 60)
+
+    df = pd.DataFrame([
+        _row('A', 'Bolt Rifle'),
+        _row('B', 'Bolt Rifle', Pts=250, BS='3+', AP='-1'),  # same math, different spelling
+        _row('C', 'Heavy Bolter', D='D3'),
+        _row('D', 'Heavy Bolter', D='d3'),
+        _row('E', 'Bolt Rifle', Lethal='Y'),  # a keyword makes it distinct
+    ])
+    weapons = compile_weapons(df)
+    unique, inverse = unique_weapons(weapons)
+
+    assert len(unique['bs']) == 3, f"Expected 3 distinct profiles, got {len(unique['bs'])}"
+    assert inverse[0] == inverse[1] and inverse[2] == inverse[3] and inverse[4] != inverse[0]
+    for field, col in weapons.items():
+        assert (unique[field][inverse] == col).all(), f"{field} does not scatter back"
+
+    empty, empty_inverse = unique_weapons(compile_weapons(df.iloc[:0]))
+    assert len(empty['bs']) == 0 and len(empty_inverse) == 0
+
+    print(f"  5 rows -> 3 profiles, inverse={inverse.tolist()}")
+    print(f"\n  ✅ PASS: Canonical profiles\n")
+
+
+def test_results_match_row_by_row():
+    """resolve_unique_weapons() equals resolve_weapons() row for row"""
+    print("=" * 60)
+    print("TEST: Unique == Row-by-Row")
+    print("=" * 60)
+
+    weapons = compile_weapons(_tournament_roster(25))
+    target = compile_target(TARGETS['MEQ'])
+    for half_range in (False, True):
+        expected = resolve_weapons(weapons, target, half_range)
+        actual = resolve_unique_weapons(weapons, target, half_range)
+        assert np.allclose(expected, actual), f"half range={half_range}"
+
+    print(f"\n  ✅ PASS: Results scatter back unchanged\n")
+
+
+def test_scales_with_distinct_profiles():
+    """A large roster only sends its distinct profiles through the kernel"""
+    print("=" * 60)
+    print("TEST: Work Scales With Distinct Profiles")
+    print("=" * 60)
+
+    roster = _tournament_roster(500)
+    resolved_rows = []
+    original = kernel.resolve_weapons
+
+    def counting(weapons, target, assume_half_range=False):
+        resolved_rows.append(len(weapons['bs']))
+        return original(weapons, target, assume_half_range)
+
+    kernel.resolve_weapons = counting
+    try:
+        results = calculate_group_metrics(roster, TARGETS['GEQ'])
+        calculate_matrix(roster, {k: TARGETS[k] for k in ('GEQ', 'MEQ', 'TEQ')})
+    finally:
+        kernel.resolve_weapons = original
+
+    assert resolved_rows == [4, 4], f"Kernel saw {resolved_rows} rows for {len(roster)} roster rows"
+    assert len(results) == 500
+    assert np.allclose([r['Kills'] for r in results], results[0]['Kills']), "Identical squads score the same"
+    print(f"  {len(roster)} rows -> {resolved_rows[0]} kernel rows per call")
+
+    print(f"\n  ✅ PASS: Kernel work scales with distinct profiles\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Profile Hash-Consing Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_canonical_profiles()
+        test_results_match_row_by_row()
+        test_scales_with_distinct_profiles()
+
+        print("=" * 60)
+        print("✅ ALL PROFILE HASH-CONSING TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test RR_H / RR_W rerolls in the main engine.
+Verify reroll-1s and reroll-fails on hits and wounds, and their interaction with crits.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine.calculator import calculate_group_metrics
+from src.engine.simulation import simulate_group_metrics
+
+
+def _unit(name, **weapon):
+    row = {
+        'UnitID': name, 'Qty': 1, 'Name': name, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': name,
+        'A': 12, 'BS': 4, 'S': 4, 'AP': 0, 'D': 1, 'RR_H': 'N', 'RR_W': 'N',
+    }
+    row.update(weapon)
+    return row
+
+
+def _damage(**weapon):
+    df = pd.DataFrame([_unit('Test', **weapon)])
+    return calculate_group_metrics(df, TARGETS['MEQ'])[0]['Damage']
+
+
+def test_reroll_hits():
+    """RR_H '1' and 'Y' scale hits by the reroll formulas"""
+    print("=" * 60)
+    print("TEST: Reroll Hits")
+    print("=" * 60)
+
+    base = _damage()
+    p = 3 / 6  # BS 4+
+    assert np.isclose(_damage(RR_H='1') / base, (p + p / 6) / p), "Reroll 1s adds 1/6 of the hit chance"
+    assert np.isclose(_damage(RR_H='Y') / base, (p + (1 - p) * p) / p), "Reroll fails"
+    assert np.isclose(_damage(RR_H='F'), _damage(RR_H='Y')), "'F' is an alias for reroll fails"
+    assert np.isclose(_damage(RR_H='1', Torrent='Y'), _damage(Torrent='Y')), "Torrent has nothing to reroll"
+
+    print(f"  Damage: base={base:.3f} RR1={_damage(RR_H='1'):.3f} RRF={_damage(RR_H='Y'):.3f}")
+    print(f"\n  ✅ PASS: Hit rerolls\n")
+
+
+def test_reroll_wounds_and_crits():
+    """Rerolled dice can still crit, so Sustained and Dev gain from rerolls"""
+    print("=" * 60)
+    print("TEST: Reroll Wounds + Crits")
+    print("=" * 60)
+
+    # S4 vs T4 wounds on 4+
+    p = 3 / 6
+    base = _damage()
+    assert np.isclose(_damage(RR_W='Y') / base, (p + (1 - p) * p) / p), "Reroll failed wounds"
+    assert np.isclose(_damage(RR_W='Y'), _damage(TwinLinked='Y')), "Twin-Linked equals RR_W fails"
+
+    # Sustained 1 with reroll-fails: crits on the reroll generate extra hits too
+    p_hit, p_crit = 3 / 6, 1 / 6
+    rr_hit, rr_crit = p_hit + (1 - p_hit) * p_hit, p_crit + (1 - p_hit) * p_crit
+    expected = (rr_hit + rr_crit) / (p_hit + p_crit)
+    assert np.isclose(_damage(RR_H='Y', Sustained=1) / _damage(Sustained=1), expected), "Sustained uses rerolled crits"
+
+    # Dev: mortal share grows with rerolled crit wounds
+    assert _damage(RR_W='Y', Dev='Y', AP=0, D=2) > _damage(RR_W='Y', AP=0, D=2), "Rerolled crits trigger Dev"
+
+    print(f"\n  ✅ PASS: Rerolls interact with crit thresholds\n")
+
+
+def test_batched_roster_matches_simulation():
+    """One batched call handles mixed rerolls and agrees with simulated dice"""
+    print("=" * 60)
+    print("TEST: Batched Rerolls vs Simulation")
+    print("=" * 60)
+
+    df = pd.DataFrame([
+        _unit('Ones', RR_H='1', RR_W='1'),
+        _unit('Fails', RR_H='Y', RR_W='F', Sustained=1, Lethal='Y', CritHit=5),
+        _unit('Dev', RR_W='Y', Dev='Y', CritWound=5, D='D3', S=5),
+        _unit('Plain'),
+    ])
+
+    expected = calculate_group_metrics(df, TARGETS['MEQ'])
+    simulated = simulate_group_metrics(df, TARGETS['MEQ'], trials=40_000, seed=11, confidence=0.999)
+    for e, s in zip(expected, simulated):
+        low, high = s['Sim_Damage_CI']
+        assert low <= e['Damage'] <= high, f"{e['Name']}: damage {e['Damage']} outside {low}-{high}"
+        print(f"  {e['Name']:<6} engine={e['Damage']:.3f} sim={s['Sim_Damage']:.3f}")
+
+    print(f"\n  ✅ PASS: Batched rerolls match simulation\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Reroll Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_reroll_hits()
+        test_reroll_wounds_and_crits()
+        test_batched_roster_matches_simulation()
+
+        print("=" * 60)
+        print("✅ ALL REROLL TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the calculator API result cache.
+Verify LRU eviction, TTL expiry, stable request keys, and that repeat
+requests are served from the cache without building pandas objects.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import pandas as pd
+from fastapi.testclient import TestClient
+from backend.cache import ResultCache, request_key
+from backend.main import app
+from backend.routers.calculator import result_cache
+
+WEAPONS = [
+    {'UnitID': 'U1', 'Name': 'Intercessors', 'Qty': 5, 'Loadout Group': 'Ranged', 'Pts': 90,
+     'Range': 24, 'Weapon': 'Bolt Rifle', 'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1},
+    {'UnitID': 'U2', 'Name': 'Devastators', 'Qty': 2, 'Loadout Group': 'Ranged', 'Pts': 120,
+     'Range': 48, 'Weapon': 'Lascannon', 'A': 1, 'BS': 3, 'S': 12, 'AP': -3, 'D': 'D6+1'},
+]
+MEQ = {'Name': 'MEQ', 'Pts': 18, 'T': 4, 'W': 2, 'Sv': '3+', 'UnitSize': 5}
+TEQ = {'Name': 'TEQ', 'Pts': 40, 'T': 5, 'W': 3, 'Sv': '2+', 'Inv': '4+', 'UnitSize': 5}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_and_ttl():
+    """Least recently used entries are evicted and old entries expire"""
+    print("=" * 60)
+    print("TEST: LRU Eviction and TTL")
+    print("=" * 60)
+
+    clock = FakeClock()
+    cache = ResultCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1       # 'a' is now the most recently used
+    cache.put('c', 3)                # evicts 'b'
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+
+    clock.now = 9.9
+    assert cache.get('a') == 1, "Entries live for ttl_seconds"
+    clock.now = 10.0
+    assert cache.get('a') is None and cache.get('c') is None, "Entries expire after ttl_seconds"
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (4, 3, 0), stats
+    cache.clear()
+    assert cache.stats()['hits'] == 0
+    print(f"  stats before clear: {stats}")
+
+    print(f"\n  ✅ PASS: LRU and TTL\n")
+
+
+def test_request_key():
+    """Keys depend on content, not on dict key order"""
+    print("=" * 60)
+    print("TEST: Request Keys")
+    print("=" * 60)
+
+    reordered = [dict(reversed(list(w.items()))) for w in WEAPONS]
+    assert request_key(WEAPONS, MEQ, False) == request_key(reordered, dict(reversed(list(MEQ.items()))), False)
+    assert request_key(WEAPONS, MEQ, False) != request_key(WEAPONS, MEQ, True)
+    assert request_key(WEAPONS, MEQ, False) != request_key(WEAPONS[:1], MEQ, False)
+    print(f"  key: {request_key(WEAPONS, MEQ, False)}")
+
+    print(f"\n  ✅ PASS: Stable request keys\n")
+
+
+def test_api_serves_repeats_from_cache():
+    """Repeat /calculate and /calculate-multi-target payloads skip the engine and pandas"""
+    print("=" * 60)
+    print("TEST: API Cache")
+    print("=" * 60)
+
+    client = TestClient(app)
+    result_cache.clear()
+    body = {'weapons': WEAPONS, 'target': MEQ, 'assume_cover': False}
+    multi_body = {'weapons': WEAPONS, 'targets': [MEQ, TEQ]}
+
+    first = client.post('/api/calculator/calculate', json=body).json()
+    first_multi = client.post('/api/calculator/calculate-multi-target', json=multi_body).json()
+    assert client.post('/api/calculator/calculate', json=dict(body, assume_cover=True)).status_code == 200
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("pandas object built for a cached request")
+
+    original_series, original_frame = pd.Series.__init__, pd.DataFrame.__init__
+    pd.Series.__init__, pd.DataFrame.__init__ = forbidden, forbidden
+    try:
+        assert client.post('/api/calculator/calculate', json=body).json() == first
+        assert client.post('/api/calculator/calculate-multi-target', json=multi_body).json() == first_multi
+        # A session request for a cached payload gets the full metrics (no delta)
+        session = client.post('/api/calculator/calculate', json=dict(body, session_id='tab-1')).json()
+        assert session['metrics'] == first['metrics'] and session['delta'] is None
+    finally:
+        pd.Series.__init__, pd.DataFrame.__init__ = original_series, original_frame
+
+    stats = client.get('/api/calculator/cache').json()
+    assert (stats['hits'], stats['misses'], stats['size']) == (3, 3, 3), stats
+    print(f"  stats: {stats}")
+
+    print(f"\n  ✅ PASS: Repeat requests served from cache\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Result Cache Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_lru_and_ttl()
+        test_request_key()
+        test_api_serves_repeats_from_cache()
+
+        print("=" * 60)
+        print("✅ ALL RESULT CACHE TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test scenario-flag combinations.
+Verify calculate_scenarios() gives calculate_group_metrics() results for
+every cover / half range / stealth combination from one kernel pass.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine import scenarios
+from src.engine.calculator import calculate_group_metrics
+from src.engine.scenarios import SCENARIOS, SCENARIO_FLAGS, calculate_scenarios
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Intercessors', 'Bolt Rifle', Qty=5, RapidFire=1),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M'),
+        _row('Hellblasters', 'Plasma (Std)', A=2, S=7, AP=-2, D=1, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', A=2, S=8, AP=-3, D=2, **{'Profile ID': 'P1'}),
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=3),
+        _row('Eradicators', 'Flamer', A='D6', S=4, AP=0, D=1, Torrent='Y', IgnoresCover='Y'),
+        _row('Inceptors', 'Assault Bolter', A='D3', S=5, AP=-1, D=2, Blast='Y'),
+    ])
+
+
+def _assert_same(results, expected, label):
+    assert len(results) == len(expected), f"{label}: {len(results)} units vs {len(expected)}"
+    for got, want in zip(results, expected):
+        for key, value in want.items():
+            if isinstance(value, float):
+                assert np.isclose(got[key], value), f"{label}: {want['Name']} {key} {got[key]} != {value}"
+            else:
+                assert got[key] == value, f"{label}: {want['Name']} {key} {got[key]} != {value}"
+
+
+def test_matches_separate_calls():
+    """Every combination equals its own calculate_group_metrics() call"""
+    print("=" * 60)
+    print("TEST: Scenarios == Separate Calls")
+    print("=" * 60)
+
+    df = _roster()
+    for t_key in ('GEQ', 'MEQ', 'TEQ'):
+        for deduplicate in (True, False):
+            results = calculate_scenarios(df, TARGETS[t_key], deduplicate)
+            assert tuple(results) == SCENARIOS and len(SCENARIOS) == 2 ** len(SCENARIO_FLAGS)
+
+            for (cover, half, stealth), scenario in results.items():
+                target = dict(TARGETS[t_key], Stealth='Y' if stealth else 'N')
+                expected = calculate_group_metrics(df.assign(__assume_cover__=cover), target, deduplicate, half)
+                _assert_same(scenario, expected, f"{t_key} cover={cover} half={half} stealth={stealth}")
+        print(f"  {t_key}: {len(SCENARIOS)} scenarios x 2 dedup settings ✓")
+
+    exact = calculate_scenarios(df, TARGETS['MEQ'], allocation='exact')
+    for (cover, half, stealth), scenario in exact.items():
+        target = dict(TARGETS['MEQ'], Stealth='Y' if stealth else 'N')
+        expected = calculate_group_metrics(df.assign(__assume_cover__=cover), target, True, half, 'exact')
+        _assert_same(scenario, expected, f"exact cover={cover} half={half} stealth={stealth}")
+    print(f"  exact allocation ✓")
+
+    assert calculate_scenarios(df.iloc[:0], TARGETS['MEQ']) == {key: [] for key in SCENARIOS}
+
+    print(f"\n  ✅ PASS: Scenarios match separate calls\n")
+
+
+def test_flags_change_results():
+    """Cover, half range and stealth each move the numbers they should"""
+    print("=" * 60)
+    print("TEST: Flag Effects")
+    print("=" * 60)
+
+    results = calculate_scenarios(_roster(), TARGETS['MEQ'])
+    kills = {key: {r['Name']: r['Kills'] for r in scenario} for key, scenario in results.items()}
+    damage = {key: {r['Name']: r['Damage'] for r in scenario} for key, scenario in results.items()}
+
+    base = kills[(False, False, False)]
+    assert kills[(True, False, False)]['Intercessors'] < base['Intercessors'], "Cover reduces ranged kills"
+    assert damage[(False, True, False)]['Eradicators'] > damage[(False, False, False)]['Eradicators'], \
+        "Half range adds Melta damage"
+    assert kills[(False, False, True)]['Hellblasters'] < base['Hellblasters'], "Stealth reduces hits"
+    assert kills[(False, True, True)] == kills[(False, True, False)], "Half range ignores Stealth"
+    print(f"  Intercessors: {base['Intercessors']:.3f} -> cover {kills[(True, False, False)]['Intercessors']:.3f}")
+
+    print(f"\n  ✅ PASS: Flags change the expected units\n")
+
+
+def test_one_kernel_pass():
+    """All combinations go through the kernel in a single call"""
+    print("=" * 60)
+    print("TEST: One Kernel Pass")
+    print("=" * 60)
+
+    calls = []
+    original = scenarios.resolve_unique_weapons
+
+    def counting(weapons, target, *args):
+        calls.append(target['stealth'].size)
+        return original(weapons, target, *args)
+
+    scenarios.resolve_unique_weapons = counting
+    try:
+        calculate_scenarios(_roster(), TARGETS['TEQ'])
+    finally:
+        scenarios.resolve_unique_weapons = original
+
+    assert calls == [2], f"Expected one call against 2 target variants, got {calls}"
+    print(f"  kernel calls: {len(calls)}")
+
+    print(f"\n  ✅ PASS: One kernel pass\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Scenario Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_matches_separate_calls()
+        test_flags_change_results()
+        test_one_kernel_pass()
+
+        print("=" * 60)
+        print("✅ ALL SCENARIO TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
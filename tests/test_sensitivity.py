@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test stat sensitivity analysis.
+Verify calculate_sensitivity() equals re-running calculate_group_metrics()
+on a roster with the stat improved, for every unit, stat and target.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine import sensitivity
+from src.engine.calculator import calculate_group_metrics
+from src.engine.kernel import compile_weapons
+from src.engine.sensitivity import PERTURBATIONS, calculate_sensitivity, perturb_weapons
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Intercessors', 'Bolt Rifle', Qty=5),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M'),
+        _row('Hellblasters', 'Plasma (Std)', A=2, S=7, AP=-2, D=1, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', A=2, S=8, AP=-3, D=2, **{'Profile ID': 'P1'}),
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2),
+        _row('Inceptors', 'Assault Bolter', A='D6', BS=2, S=5, AP=0, D=1, Blast='Y'),
+        _row('Terminators', 'Chainfist', A=4, S=5, AP=-1, D='D3', Lethal='Y', Dev='Y', Sustained=1, Range='M'),
+    ])
+
+
+def _improved(df, stat):
+    """The roster with one stat improved by hand"""
+    def bump(value):
+        return f"{value}+1" if isinstance(value, str) else value + 1
+
+    df = df.copy()
+    if stat in ('A', 'D'):
+        df[stat] = [bump(v) for v in df[stat]]
+    elif stat == 'BS':
+        df['BS'] = [max(2, v - 1) for v in df['BS']]
+    else:
+        df[stat] = df[stat] + PERTURBATIONS[stat]
+    return df
+
+
+def test_matches_perturbed_rosters():
+    """Each delta equals calculate_group_metrics() on the improved roster minus the base"""
+    print("=" * 60)
+    print("TEST: Sensitivity == Perturbed Rosters")
+    print("=" * 60)
+
+    df = _roster()
+    targets = {key: TARGETS[key] for key in ('GEQ', 'MEQ', 'TEQ')}
+    for deduplicate in (True, False):
+        for half_range in (False, True):
+            table = calculate_sensitivity(df, targets, deduplicate=deduplicate, assume_half_range=half_range)
+            assert table.stats == list(PERTURBATIONS)
+            keys = [(u['Name'], u['Qty']) for u in table.units]
+
+            for t, (label, target) in enumerate(targets.items()):
+                base = {(r['Name'], r['Qty']): r for r in calculate_group_metrics(df, target, deduplicate, half_range)}
+                assert sorted(base) == sorted(keys)
+                for s, stat in enumerate(table.stats):
+                    improved = {(r['Name'], r['Qty']): r for r in
+                                calculate_group_metrics(_improved(df, stat), target, deduplicate, half_range)}
+                    for u, key in enumerate(keys):
+                        assert np.isclose(table.base['Kills'][u, t], base[key]['Kills'])
+                        for metric in ('Kills', 'Damage'):
+                            expected = improved[key][metric] - base[key][metric]
+                            assert np.isclose(table.delta[metric][u, s, t], expected), \
+                                f"{key} {stat} {metric} vs {label}: {table.delta[metric][u, s, t]} != {expected}"
+    print(f"  {len(PERTURBATIONS)} stats x {len(targets)} targets x 4 settings ✓")
+
+    print(f"\n  ✅ PASS: Deltas match perturbed rosters\n")
+
+
+def test_perturbations():
+    """perturb_weapons() improves one stat and leaves the input alone"""
+    print("=" * 60)
+    print("TEST: Perturbed Weapons")
+    print("=" * 60)
+
+    weapons = compile_weapons(pd.DataFrame([_row('A', 'x', BS=2, A='D6'), _row('B', 'y', BS=4, A=3)]))
+    assert perturb_weapons(weapons, 'BS')['bs'].tolist() == [2, 3], "Never better than 2+"
+    more = perturb_weapons(weapons, 'A')
+    assert more['a_mean'].tolist() == [4.5, 4.0] and more['a_min'].tolist() == [2, 4] and more['a_max'].tolist() == [7, 4]
+    assert str(more['a_spec'][0]) == 'D6+1' and str(weapons['a_spec'][0]) == 'D6'
+    assert perturb_weapons(weapons, 'AP')['ap'].tolist() == [-2, -2]
+
+    try:
+        calculate_sensitivity(_roster(), [TARGETS['MEQ']], stats=['Ld'])
+        raise AssertionError("Unknown stats should be rejected")
+    except ValueError:
+        pass
+
+    print(f"\n  ✅ PASS: Perturbations\n")
+
+
+def test_one_kernel_pass():
+    """Base and every perturbation go through the kernel in one call"""
+    print("=" * 60)
+    print("TEST: One Kernel Pass")
+    print("=" * 60)
+
+    calls = []
+    original = sensitivity.resolve_unique_weapons
+
+    def counting(weapons, target, *args):
+        calls.append((len(weapons['bs']), target['t'].size))
+        return original(weapons, target, *args)
+
+    df = _roster()
+    sensitivity.resolve_unique_weapons = counting
+    try:
+        table = calculate_sensitivity(df, {'MEQ': TARGETS['MEQ'], 'TEQ': TARGETS['TEQ']}, stats=['A', 'S'])
+    finally:
+        sensitivity.resolve_unique_weapons = original
+
+    assert calls == [(3 * len(df), 2)], calls
+    assert table['Kills'].shape == (len(table.units), 2, 2)
+    assert table.to_frame('Kills', 'TEQ').columns.tolist() == ['A', 'S']
+
+    records = table.to_records()
+    assert records[0]['delta']['A']['TEQ'].keys() == {'Kills', 'Damage', 'CPK'}
+    print(f"  kernel calls: {calls}")
+
+    print(f"\n  ✅ PASS: One kernel pass\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Sensitivity Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_matches_perturbed_rosters()
+        test_perturbations()
+        test_one_kernel_pass()
+
+        print("=" * 60)
+        print("✅ ALL SENSITIVITY TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the Monte Carlo simulation engine.
+Verify reproducibility, agreement with the exact engines and rule handling.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import pandas as pd
+from src.data.rosters import DEFAULT_ROSTER
+from src.data.targets import TARGETS
+from src.engine.calculator import calculate_group_metrics
+from src.engine.distributions import calculate_group_distributions
+from src.engine.simulation import simulate_group_metrics
+
+
+def _roster():
+    return pd.DataFrame(DEFAULT_ROSTER)
+
+
+def test_seed_reproducible():
+    """Same seed gives identical results, in-process or across a process pool"""
+    print("=" * 60)
+    print("TEST: Seeded Reproducibility")
+    print("=" * 60)
+
+    df = _roster()
+    kwargs = dict(trials=20_000, seed=42, chunk_size=5_000)
+    first = simulate_group_metrics(df, TARGETS['MEQ'], **kwargs)
+    again = simulate_group_metrics(df, TARGETS['MEQ'], **kwargs)
+    pooled = simulate_group_metrics(df, TARGETS['MEQ'], workers=2, **kwargs)
+
+    for a, b, c in zip(first, again, pooled):
+        assert a['Sim_Kills'] == b['Sim_Kills'] == c['Sim_Kills'], f"{a['Name']} kills not reproducible"
+        assert a['Sim_Damage'] == b['Sim_Damage'] == c['Sim_Damage'], f"{a['Name']} damage not reproducible"
+
+    print(f"\n  ✅ PASS: Seeded runs are identical\n")
+
+
+def test_matches_exact_engines():
+    """Simulated means agree with the distribution engine within the CI"""
+    print("=" * 60)
+    print("TEST: Agreement With Exact Engines")
+    print("=" * 60)
+
+    df = _roster()
+    for t_key in ('GEQ', 'TEQ', 'CUST', 'VEQ-L'):
+        target = TARGETS[t_key]
+        expected = calculate_group_metrics(df, target)
+        exact = calculate_group_distributions(df, target)
+        simulated = simulate_group_metrics(df, target, trials=40_000, seed=7, confidence=0.999)
+
+        for e, x, s in zip(expected, exact, simulated):
+            assert (e['Name'], e['Kills'], e['Damage']) == (s['Name'], s['Kills'], s['Damage']), \
+                "Expected-value columns are unchanged"
+            low, high = s['Sim_Damage_CI']
+            assert low <= e['Damage'] <= high, f"{s['Name']} vs {t_key}: damage {e['Damage']} outside {low}-{high}"
+            low, high = s['Sim_Kills_CI']
+            mean_kills = x['Distribution'].mean_kills
+            assert low <= mean_kills <= high, f"{s['Name']} vs {t_key}: kills {mean_kills} outside {low}-{high}"
+            print(f"  {s['Name']:<20} vs {t_key:<6} Sim={s['Sim_Kills']:.3f} ±{high - s['Sim_Kills']:.3f} Exact={mean_kills:.3f}")
+
+    print(f"\n  ✅ PASS: Simulation agrees with exact engines\n")
+
+
+def test_rule_interactions():
+    """Torrent never crits and damage beyond the last model is still counted"""
+    print("=" * 60)
+    print("TEST: Rule Interactions")
+    print("=" * 60)
+
+    weapon = {
+        'UnitID': 'f1', 'Qty': 1, 'Name': 'Flamer', 'Loadout Group': 'Ranged', 'Pts': 50,
+        'Range': 12, 'Profile ID': '', 'Keywords': '', 'Weapon': 'Flamer',
+        'A': 6, 'BS': 2, 'S': 10, 'AP': 0, 'D': 3, 'Torrent': 'Y', 'Lethal': 'Y', 'Sustained': 2,
+    }
+    target = {'Name': 'Wall', 'Pts': 10, 'T': 1, 'W': 1, 'Sv': '7+', 'Inv': '', 'FNP': '', 'UnitSize': 2}
+    result = simulate_group_metrics(pd.DataFrame([weapon]), target, trials=5_000, seed=1)[0]
+
+    # No crits: 6 wound rolls at 2+, D3 each, kills capped at the unit size
+    assert abs(result['Sim_Damage'] - 6 * (5 / 6) * 3) < 0.2, f"Damage {result['Sim_Damage']}"
+    assert result['Sim_Kills'] <= 2.0, "Kills are capped at UnitSize"
+    assert result['Sim_Kills_Std'] >= 0 and result['Trials'] == 5_000
+
+    print(f"  Sim damage {result['Sim_Damage']:.2f}, kills {result['Sim_Kills']:.3f}")
+    print(f"\n  ✅ PASS: Rules rolled as written\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Simulation Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_seed_reproducible()
+        test_matches_exact_engines()
+        test_rule_interactions()
+
+        print("=" * 60)
+        print("✅ ALL SIMULATION TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
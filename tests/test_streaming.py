@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test streaming (chunked) evaluation.
+Verify iter_group_metrics() yields the same units as calculate_group_metrics()
+for every chunk size, including units and Profile ID modes split across
+chunk boundaries, and that each chunk stays bounded.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.targets import TARGETS
+from src.engine import streaming
+from src.engine.calculator import calculate_group_metrics
+from src.engine.streaming import iter_group_metrics
+
+UNIT_KEYS = ('UnitID', 'Name', 'Loadout Group', 'Qty')
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=3),
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=6, UnitID='E2'),
+        _row('Hellblasters', 'Plasma (Std)', S=7, AP=-2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Bolt Pistol', A=1, Range=12, Qty=5),
+        _row('Hellblasters', 'Plasma (Ovr)', S=8, AP=-3, D=2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', S=8, AP=-3, D=2, Qty=5, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma Pistol', A=1, S=8, AP=-3, D=2, Range=12, Qty=5, RapidFire=1),
+        _row('Intercessors', 'Bolt Rifle', Qty=5),
+        _row('Intercessors', 'Bolt Rifle', Qty=5),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M', **{'Loadout Group': 'Melee'}),
+        _row('Terminators', 'Chainfist', A=4, S=5, D='D3', Lethal='Y', Dev='Y', Range='M', Qty=5),
+    ])
+
+
+def _by_unit(results):
+    return {tuple(r[k] for k in UNIT_KEYS): r for r in results}
+
+
+def _assert_same(got, expected):
+    assert len(got) == len(expected), f"{len(got)} units != {len(expected)}"
+    got, expected = _by_unit(got), _by_unit(expected)
+    assert got.keys() == expected.keys()
+    for key, r in expected.items():
+        assert got[key]['Weapon'] == r['Weapon'], key
+        for metric in ('Kills', 'Damage', 'CPK', 'TTK'):
+            assert np.isclose(got[key][metric], r[metric]), f"{key} {metric}"
+
+
+def test_matches_calculator():
+    """Every chunk size gives calculate_group_metrics()'s units"""
+    print("=" * 60)
+    print("TEST: Streaming == calculate_group_metrics")
+    print("=" * 60)
+
+    df = _roster()
+    for target_key in ('GEQ', 'MEQ', 'TEQ'):
+        target = TARGETS[target_key]
+        for deduplicate in (True, False):
+            for half_range in (False, True):
+                expected = calculate_group_metrics(df, target, deduplicate, half_range)
+                for chunk_size in (1, 2, 3, 5, len(df)):
+                    got = list(iter_group_metrics(df, target, deduplicate, half_range, chunk_size=chunk_size))
+                    _assert_same(got, expected)
+    print(f"  chunk sizes 1, 2, 3, 5, {len(df)} ✓")
+
+    print(f"\n  ✅ PASS: Streaming matches the calculator\n")
+
+
+def test_csv_chunks():
+    """Chunks from pd.read_csv(chunksize=...) stream like a DataFrame"""
+    print("=" * 60)
+    print("TEST: CSV Chunks")
+    print("=" * 60)
+
+    df = _roster()
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+
+    reader = pd.read_csv(buffer, chunksize=4, keep_default_na=False)
+    got = list(iter_group_metrics(reader, TARGETS['MEQ']))
+    _assert_same(got, calculate_group_metrics(df, TARGETS['MEQ']))
+
+    print(f"\n  ✅ PASS: CSV chunks\n")
+
+
+def test_bounded_and_lazy():
+    """Each chunk only holds chunk_size rows plus one unit; results come before all input is read"""
+    print("=" * 60)
+    print("TEST: Bounded and Lazy")
+    print("=" * 60)
+
+    library = pd.DataFrame([
+        _row(f"Unit {i:03d}", weapon, A=1 + i % 3, S=3 + i % 5, Pts=60 + i)
+        for i in range(200) for weapon in ('Gun', 'Knife')
+    ])
+    sizes = []
+    original = streaming.prepare_roster
+
+    def recording(df, *args):
+        sizes.append(len(df))
+        return original(df, *args)
+
+    streaming.prepare_roster = recording
+    try:
+        results = iter_group_metrics(library, TARGETS['MEQ'], chunk_size=25)
+        first = next(results)
+        assert sizes == [24], sizes
+        assert first['Name'] == 'Unit 000'
+        rest = list(results)
+    finally:
+        streaming.prepare_roster = original
+
+    assert len(rest) + 1 == 200
+    assert max(sizes) <= 25 + 1 and sum(sizes) == len(library)
+    print(f"  {len(sizes)} chunks, largest {max(sizes)} rows")
+
+    print(f"\n  ✅ PASS: Bounded and lazy\n")
+
+
+def test_long_unit():
+    """A unit spanning many chunks is concatenated once, not once per chunk"""
+    print("=" * 60)
+    print("TEST: Unit Spanning Many Chunks")
+    print("=" * 60)
+
+    df = pd.concat([_roster().iloc[:2]] + [_roster().iloc[[3]]] * 60 + [_roster().iloc[7:]], ignore_index=True)
+    concatenated = []
+
+    class RecordingPandas:
+        """pandas as seen by the streaming module, counting the rows it concatenates"""
+        def __getattr__(self, name):
+            return getattr(pd, name)
+
+        def concat(self, frames, *args, **kwargs):
+            frames = list(frames)
+            concatenated.append(sum(len(f) for f in frames))
+            return pd.concat(frames, *args, **kwargs)
+
+    streaming.pd = RecordingPandas()
+    try:
+        got = list(iter_group_metrics(df, TARGETS['MEQ'], chunk_size=4))
+        chunks = [df.iloc[i:i + 4] for i in range(0, len(df), 4)]
+        got_chunks = list(iter_group_metrics(iter(chunks), TARGETS['MEQ']))
+    finally:
+        streaming.pd = pd
+
+    _assert_same(got, calculate_group_metrics(df, TARGETS['MEQ']))
+    _assert_same(got_chunks, calculate_group_metrics(df, TARGETS['MEQ']))
+    assert sum(concatenated) == 2 * len(df), concatenated
+    print(f"  {len(df)} rows in chunks of 4: {len(concatenated)} concatenations, {sum(concatenated)} rows copied")
+
+    print(f"\n  ✅ PASS: Unit spanning many chunks\n")
+
+
+def test_non_contiguous():
+    """Split Names raise ValueError before a DataFrame yields anything, and before a chunk is evaluated"""
+    print("=" * 60)
+    print("TEST: Non-Contiguous Names")
+    print("=" * 60)
+
+    df = _roster()
+    split = pd.concat([df, df.iloc[:1]], ignore_index=True)
+    sizes = []
+    original = streaming.prepare_roster
+
+    def recording(df, *args):
+        sizes.append(len(df))
+        return original(df, *args)
+
+    streaming.prepare_roster = recording
+    try:
+        for chunk_size in (1, 3, len(split)):
+            try:
+                next(iter_group_metrics(split, TARGETS['MEQ'], chunk_size=chunk_size))
+                raise AssertionError("Non-contiguous unit rows should be rejected")
+            except ValueError as e:
+                assert 'Eradicators' in str(e), e
+            assert sizes == [], f"chunk_size={chunk_size}: evaluated {sizes} before raising"
+
+        # Chunks can only be checked as they arrive: earlier units still come through,
+        # but the chunk with the split Name is rejected before any of it is evaluated
+        chunks = [df.iloc[:3], df.iloc[3:8], pd.concat([df.iloc[8:], df.iloc[2:3]])]
+        results = iter_group_metrics(iter(chunks), TARGETS['MEQ'])
+        assert {r['Name'] for r in [next(results)]} <= {'Eradicators'}
+        try:
+            list(results)
+            raise AssertionError("A Name reappearing in a later chunk should be rejected")
+        except ValueError as e:
+            assert 'Hellblasters' in str(e), e
+        assert sizes == [2, 5], sizes
+
+        # The pending Name may only continue at the very start of the next chunk
+        chunks = [df.iloc[:3], pd.concat([df.iloc[7:8], df.iloc[3:4]])]
+        try:
+            list(iter_group_metrics(iter(chunks), TARGETS['MEQ']))
+            raise AssertionError("The pending Name reappearing mid-chunk should be rejected")
+        except ValueError as e:
+            assert 'Hellblasters' in str(e), e
+    finally:
+        streaming.prepare_roster = original
+    print(f"  DataFrames rejected up front, chunks rejected on arrival ✓")
+
+    print(f"\n  ✅ PASS: Non-contiguous names\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Streaming Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_matches_calculator()
+        test_csv_chunks()
+        test_bounded_and_lazy()
+        test_long_unit()
+        test_non_contiguous()
+
+        print("=" * 60)
+        print("✅ ALL STREAMING TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test stat-space parameter sweeps.
+Verify every sweep cell equals the kernel result for that profile, that
+chunking does not change the numbers, and that large grids stay fast.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from backend.main import app
+from src.data.targets import TARGETS
+from src.engine.calculator import calculate_group_metrics
+from src.engine.kernel import resolve_profile
+from src.engine.sweep import DEFAULT_BASE, sweep_profiles
+
+AXES = {'S': [3, 4, 8, 12], 'AP': [0, -1, -3], 'D': [1, 2, 'D3', 'D6'], 'Lethal': ['N', 'Y']}
+TARGET_KEYS = ('GEQ', 'MEQ', 'TEQ')
+
+
+def test_cells_match_kernel():
+    """Each cell equals resolve_profile() and the calculator's CPK for that profile"""
+    print("=" * 60)
+    print("TEST: Sweep Cells == Kernel")
+    print("=" * 60)
+
+    targets = {key: TARGETS[key] for key in TARGET_KEYS}
+    base = {'A': 'D6', 'BS': '3+', 'Blast': 'Y', 'Pts': 150}
+    cube = sweep_profiles(AXES, targets, base=base, chunk_size=7)
+    assert cube.shape == (4, 3, 4, 2, 3)
+
+    for index in itertools.product(*(range(len(v)) for v in AXES.values())):
+        profile = dict(DEFAULT_BASE, **base, **{name: AXES[name][i] for name, i in zip(AXES, index)})
+        for t, key in enumerate(TARGET_KEYS):
+            kills, damage = resolve_profile(profile, targets[key])
+            assert np.isclose(cube['Kills'][index + (t,)], kills), f"{profile} vs {key}"
+            assert np.isclose(cube['Damage'][index + (t,)], damage), f"{profile} vs {key}"
+
+    row = dict(DEFAULT_BASE, **base, S=8, AP=-1, D='D3', Lethal='N', UnitID='u', Name='u', Qty=1,
+               Weapon='w', **{'Loadout Group': 'Ranged', 'Profile ID': ''})
+    expected = calculate_group_metrics(pd.DataFrame([row]), TARGETS['MEQ'])[0]['CPK']
+    assert np.isclose(cube['CPK'][2, 1, 2, 0, 1], expected)
+    print(f"  {np.prod(cube.shape)} cells checked")
+
+    print(f"\n  ✅ PASS: Cells match the kernel\n")
+
+
+def test_chunking_and_slices():
+    """Chunk size does not change results; to_frame() gives heatmap slices"""
+    print("=" * 60)
+    print("TEST: Chunking and Slices")
+    print("=" * 60)
+
+    targets = [TARGETS[key] for key in TARGET_KEYS]
+    whole = sweep_profiles(AXES, targets, chunk_size=10_000)
+    chunked = sweep_profiles(AXES, targets, chunk_size=5)
+    for metric in ('Kills', 'Damage', 'CPK'):
+        assert np.array_equal(whole[metric], chunked[metric]), metric
+
+    label = whole.targets[1]
+    frame = whole.to_frame('Kills', label, 'AP', 'S', D='D6', Lethal='N')
+    assert frame.shape == (3, 4) and frame.index.tolist() == [0, -1, -3] and frame.columns.tolist() == [3, 4, 8, 12]
+    assert np.isclose(frame.loc[-1, 8], whole['Kills'][2, 1, 3, 0, 1])
+    assert (np.diff(frame.to_numpy(), axis=0) >= 0).all(), "More AP never lowers kills"
+
+    try:
+        whole.to_frame('Kills', label, 'AP', 'S', D='D6')
+        raise AssertionError("Unfixed axes should be rejected")
+    except ValueError:
+        pass
+    try:
+        sweep_profiles({'Ld': [6, 7]}, targets)
+        raise AssertionError("Unknown axes should be rejected")
+    except ValueError:
+        pass
+    print(f"  chunk sizes 5 and 10000 agree")
+
+    print(f"\n  ✅ PASS: Chunking and slices\n")
+
+
+def test_large_sweep_speed():
+    """A ~100k-cell cube against every target finishes in seconds"""
+    print("=" * 60)
+    print("TEST: Large Sweep Speed")
+    print("=" * 60)
+
+    axes = {
+        'S': list(range(3, 15)), 'AP': [0, -1, -2, -3, -4], 'D': [1, 2, 'D3', 'D6'],
+        'A': [1, 2, 'D6', '2D6'], 'BS': [2, 3, 4, 5], 'Sustained': [0, 1, 2], 'Lethal': ['N', 'Y'],
+        'Dev': ['N', 'Y'], 'Blast': ['N', 'Y'],
+    }
+    start = time.perf_counter()
+    cube = sweep_profiles(axes, TARGETS)
+    elapsed = time.perf_counter() - start
+
+    cells = np.prod(cube.shape[:-1])
+    assert cells > 90_000 and cube.shape[-1] == len(TARGETS)
+    assert elapsed < 10, f"Sweep took {elapsed:.1f}s"
+    print(f"  {cells} cells x {len(TARGETS)} targets in {elapsed:.2f}s")
+
+    print(f"\n  ✅ PASS: Large sweep is fast\n")
+
+
+def test_sweep_endpoint():
+    """/sweep returns the cube as nested lists and rejects oversized grids"""
+    print("=" * 60)
+    print("TEST: Sweep Endpoint")
+    print("=" * 60)
+
+    client = TestClient(app)
+    meq = {'Name': 'MEQ', 'Pts': 18, 'T': 4, 'W': 2, 'Sv': '3+', 'UnitSize': 5}
+    body = {'axes': {'S': [4, 8], 'D': [1, 'D6']}, 'targets': [meq], 'base': {'A': 2}}
+    result = client.post('/api/calculator/sweep', json=body).json()
+    assert result['axes'] == body['axes'] and result['targets'] == ['MEQ']
+    expected = sweep_profiles({'S': [4, 8], 'D': [1, 'D6']}, [meq], base={'A': 2})
+    assert np.allclose(result['Kills'], expected['Kills'])
+
+    huge = {'axes': {'S': list(range(1000)), 'AP': list(range(1000))}, 'targets': [meq]}
+    assert client.post('/api/calculator/sweep', json=huge).status_code == 400
+
+    print(f"\n  ✅ PASS: Sweep endpoint\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Sweep Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_cells_match_kernel()
+        test_chunking_and_slices()
+        test_large_sweep_speed()
+        test_sweep_endpoint()
+
+        print("=" * 60)
+        print("✅ ALL SWEEP TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
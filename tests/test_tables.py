@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the precomputed probability tables.
+Verify every table entry against brute-force enumeration of the dice.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+from src.engine import tables
+
+D6 = range(1, 7)
+
+
+def _enumerate(success, crit, reroll):
+    """Exact P(success), P(crit) for one D6 with an optional reroll."""
+    p_success = p_crit = 0.0
+    for first in D6:
+        rerolled = (reroll == tables.REROLL_ONES and first == 1 and not success(first)) or \
+                   (reroll == tables.REROLL_FAILS and not success(first))
+        for roll in (D6 if rerolled else [first]):
+            weight = (1 / 36.0) if rerolled else (1 / 6.0)
+            p_success += weight * success(roll)
+            p_crit += weight * crit(roll)
+    return p_success, p_crit
+
+
+def _wound_target(s, t):
+    if s >= 2 * t: return 2
+    if s > t: return 3
+    if s == t: return 4
+    if s > t / 2: return 5
+    return 6
+
+
+def test_hit_tables():
+    """P_HIT / P_CRIT_HIT match enumeration; critical hits always hit"""
+    print("=" * 60)
+    print("TEST: Hit Tables")
+    print("=" * 60)
+
+    for bs in range(2, tables.MAX_BS + 1):
+        for crit in range(2, 7):
+            for reroll in (tables.REROLL_NONE, tables.REROLL_ONES, tables.REROLL_FAILS):
+                hit, crit_hit = _enumerate(lambda d: d >= bs or d >= crit, lambda d: d >= crit, reroll)
+                assert np.isclose(tables.P_HIT[bs, crit, reroll], hit), f"P_HIT[{bs},{crit},{reroll}]"
+                assert np.isclose(tables.P_CRIT_HIT[bs, crit, reroll], crit_hit), f"P_CRIT_HIT[{bs},{crit},{reroll}]"
+
+    print(f"  P_HIT[3, 6, fails] = {tables.P_HIT[3, 6, tables.REROLL_FAILS]:.4f}")
+    print(f"\n  ✅ PASS: Hit tables exact\n")
+
+
+def test_wound_tables():
+    """P_WOUND / P_CRIT_WOUND match the wound chart plus critical wounds"""
+    print("=" * 60)
+    print("TEST: Wound Tables")
+    print("=" * 60)
+
+    for s in range(1, 25):
+        for t in range(1, 25):
+            target = _wound_target(s, t)
+            assert tables.WOUND_TARGET[s, t] == target, f"WOUND_TARGET[{s},{t}]"
+            for crit in range(2, 7):
+                for reroll in (tables.REROLL_NONE, tables.REROLL_ONES, tables.REROLL_FAILS):
+                    wound, crit_wound = _enumerate(
+                        lambda d: d >= target or d >= crit, lambda d: d >= crit, reroll
+                    )
+                    assert np.isclose(tables.P_WOUND[s, t, crit, reroll], wound), f"P_WOUND[{s},{t},{crit},{reroll}]"
+                    assert np.isclose(tables.P_CRIT_WOUND[s, t, crit, reroll], crit_wound)
+
+    print(f"  S8 vs T4 wounds on {tables.WOUND_TARGET[8, 4]}+, Anti-4+ Twin-Linked: "
+          f"{tables.P_WOUND[4, 8, 4, tables.REROLL_FAILS]:.4f}")
+    print(f"\n  ✅ PASS: Wound tables exact\n")
+
+
+def test_save_and_fnp_tables():
+    """P_FAIL_SAVE covers AP, invulns and cover; P_FNP_FAIL per point"""
+    print("=" * 60)
+    print("TEST: Save + FNP Tables")
+    print("=" * 60)
+
+    for sv in range(2, 8):
+        for ap in range(-tables.MAX_AP, 1):
+            for inv in range(0, 8):
+                for cover in (0, 1):
+                    armor = (sv - 1 if cover and sv > 2 else sv) - ap
+                    target = min(armor, inv) if inv > 0 else armor
+                    p_save = sum(1 for d in D6 if d != 1 and d >= target) / 6.0
+                    idx = (sv, tables.ap_index(ap), inv, cover)
+                    assert tables.SAVE_TARGET[idx] == target
+                    assert np.isclose(tables.P_FAIL_SAVE[idx], 1 - p_save), f"P_FAIL_SAVE[{idx}]"
+
+    for fnp in range(2, 8):
+        assert np.isclose(tables.P_FNP_FAIL[fnp], sum(1 for d in D6 if d < fnp) / 6.0)
+    assert tables.P_FNP_FAIL[0] == tables.P_FNP_FAIL[1] == 1.0, "FNP below 2+ means no FNP"
+
+    # Out-of-range stats are clipped to the table edge
+    assert tables.ap_index(-9) == tables.ap_index(-tables.MAX_AP)
+    assert tables.clip_stat(99) == tables.MAX_STAT
+
+    print(f"\n  ✅ PASS: Save and FNP tables exact\n")
+
+
+def test_probability_ranges():
+    """Every probability table entry lies in [0, 1]"""
+    print("=" * 60)
+    print("TEST: Probability Ranges")
+    print("=" * 60)
+
+    for dtype in (np.float64, np.float32):
+        for name, table in tables.probability_tables(dtype).items():
+            assert table.min() >= 0.0 and table.max() <= 1.0, f"{name} ({np.dtype(dtype)}) outside [0, 1]"
+            print(f"  {name:<14} {np.dtype(dtype)}: [{table.min():.3f}, {table.max():.3f}]")
+
+    print(f"\n  ✅ PASS: Probabilities in range\n")
+
+
+def test_tables_read_only():
+    """Tables are shared module state and cannot be modified"""
+    print("=" * 60)
+    print("TEST: Read-Only Tables")
+    print("=" * 60)
+
+    for name in ('P_HIT', 'P_CRIT_HIT', 'WOUND_TARGET', 'P_WOUND', 'P_CRIT_WOUND',
+                 'SAVE_TARGET', 'P_FAIL_SAVE', 'P_FNP_FAIL'):
+        assert not getattr(tables, name).flags.writeable, f"{name} should be read-only"
+
+    print(f"\n  ✅ PASS: Tables are read-only\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Probability Table Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_hit_tables()
+        test_wound_tables()
+        test_save_and_fnp_tables()
+        test_probability_ranges()
+        test_tables_read_only()
+
+        print("=" * 60)
+        print("✅ ALL TABLE TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test top-K unit queries.
+Verify top_units() returns exactly the head of the fully sorted
+calculate_group_metrics() list, that its kill bounds never undershoot the
+kernel, and that units which cannot make the cut are skipped.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from backend.main import app
+from src.data.targets import TARGETS
+from src.engine import topk
+from src.engine.calculator import calculate_group_metrics, prepare_roster
+from src.engine.kernel import compile_weapons, compile_target, resolve_weapons
+from src.engine.topk import kill_upper_bounds, top_units
+
+UNIT_KEYS = ('UnitID', 'Name', 'Loadout Group', 'Qty')
+
+
+def _row(unit, weapon, **stats):
+    row = {
+        'UnitID': unit, 'Qty': 1, 'Name': unit, 'Loadout Group': 'Ranged', 'Pts': 100,
+        'Range': 24, 'Profile ID': '', 'Keywords': '', 'Weapon': weapon,
+        'A': 2, 'BS': 3, 'S': 4, 'AP': -1, 'D': 1,
+    }
+    row.update(stats)
+    return row
+
+
+def _roster():
+    return pd.DataFrame([
+        _row('Intercessors', 'Bolt Rifle', Qty=5, Pts=80),
+        _row('Intercessors', 'Power Fist', A=3, S=8, AP=-2, D=2, Range='M', Pts=80),
+        _row('Hellblasters', 'Plasma (Std)', A=2, S=7, AP=-2, D=1, Qty=5, Pts=115, **{'Profile ID': 'P1'}),
+        _row('Hellblasters', 'Plasma (Ovr)', A=2, S=8, AP=-3, D=2, Qty=5, Pts=115, **{'Profile ID': 'P1'}),
+        _row('Eradicators', 'Melta Rifle', A=1, S=9, AP=-4, D='D6', Melta=2, Qty=3, Pts=95),
+        _row('Inceptors', 'Assault Bolter', A='D6', BS=2, S=5, AP=0, D=1, Blast='Y', Qty=3, Pts=120),
+        _row('Terminators', 'Chainfist', A=4, S=5, AP=-1, D='D3', Lethal='Y', Dev='Y', Sustained=1,
+             Range='M', Qty=5, Pts=170),
+        _row('Scouts', 'Bolt Pistol', A=1, S=4, AP=0, D=1, Qty=5, Pts=70),
+        _row('Scouts', 'Bolt Pistol', A=1, S=4, AP=0, D=1, Qty=5, Pts=70, Range='M'),
+        _row('Devastators', 'Lascannon', A=1, S=12, AP=-3, D='D6+1', Qty=4, Pts=120, **{'Profile ID': 'H'}),
+        _row('Devastators', 'Missile (Frag)', A='D6', S=4, AP=0, D=1, Blast='Y', Qty=4, Pts=120,
+             **{'Profile ID': 'H'}),
+    ])
+
+
+def _library(n_units=300, seed=0):
+    """A datasheet library of mostly poor single-weapon units"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_units):
+        unit = f"Unit {i}"
+        rows.append(_row(unit, 'Gun', A=int(rng.integers(1, 4)), BS=int(rng.integers(3, 6)),
+                         S=int(rng.integers(3, 6)), AP=0, Pts=int(rng.integers(60, 200))))
+        rows.append(_row(unit, 'Knife', A=1, S=3, AP=0, Range='M', Pts=rows[-1]['Pts']))
+    return pd.DataFrame(rows)
+
+
+def _keys(results):
+    return [tuple(r[k] for k in UNIT_KEYS) for r in results]
+
+
+def test_matches_full_sort():
+    """top_units() == the head of calculate_group_metrics() sorted by the metric"""
+    print("=" * 60)
+    print("TEST: Top-K == Full Sort")
+    print("=" * 60)
+
+    df = _roster()
+    for target_key in ('GEQ', 'MEQ', 'KEQ'):
+        target = TARGETS[target_key]
+        for deduplicate in (True, False):
+            for metric in ('CPK', 'Kills', 'Damage'):
+                full = sorted(calculate_group_metrics(df, target, deduplicate),
+                              key=topk._sort_key(metric))
+                for k in (1, 4, 50):
+                    got = top_units(df, target, k=k, metric=metric, deduplicate=deduplicate, batch_size=2)
+                    assert _keys(got) == _keys(full[:k]), f"{target_key} {metric} k={k}"
+                    for a, b in zip(got, full):
+                        assert np.isclose(a[metric], b[metric])
+    print(f"  3 targets x 2 dedup x 3 metrics x 3 k ✓")
+
+    print(f"\n  ✅ PASS: Top-K matches the full sort\n")
+
+
+def test_pts_variants():
+    """Each Pts variant of a Profile ID adds its own winner to the unit bound"""
+    print("=" * 60)
+    print("TEST: Pts Variants of One Profile ID")
+    print("=" * 60)
+
+    # Devastators carry two priced loadouts of mode 'H', so two winners count
+    devastators = [
+        _row('Devastators', 'Lascannon', A=1, S=12, AP=-3, D='D6+1', Pts=120, **{'Profile ID': 'H'}),
+        _row('Devastators', 'Missile (Frag)', A='D6', S=4, AP=0, D=1, Blast='Y', Pts=120, **{'Profile ID': 'H'}),
+        _row('Devastators', 'Multi-melta', A=2, S=9, AP=-4, D='D6', Pts=140, **{'Profile ID': 'H'}),
+        _row('Devastators', 'Heavy Bolter', A=3, S=5, AP=-1, D=2, Pts=140, **{'Profile ID': 'H'}),
+    ]
+    for attacks in (4, 6, 9, 11):
+        df = pd.DataFrame(devastators + [_row('Intercessors', 'Bolt Rifle', A=attacks, Pts=80)])
+        for target_key in ('GEQ', 'MEQ'):
+            target = TARGETS[target_key]
+            for deduplicate in (True, False):
+                for metric in ('CPK', 'Kills', 'Damage'):
+                    full = sorted(calculate_group_metrics(df, target, deduplicate), key=topk._sort_key(metric))
+                    got = top_units(df, target, k=1, metric=metric, deduplicate=deduplicate, batch_size=1)
+                    assert _keys(got) == _keys(full[:1]), f"A={attacks} {target_key} {metric}"
+    print(f"  4 rivals x 2 targets x 2 dedup x 3 metrics ✓")
+
+    print(f"\n  ✅ PASS: Pts variants\n")
+
+
+def test_bounds_hold():
+    """kill_upper_bounds() is never below the kernel's expected kills / damage"""
+    print("=" * 60)
+    print("TEST: Upper Bounds Hold")
+    print("=" * 60)
+
+    df = _roster()
+    for half_range in (False, True):
+        weapons = compile_weapons(prepare_roster(df, half_range))
+        for key, profile in TARGETS.items():
+            target = compile_target(profile)
+            kills, damage = resolve_weapons(weapons, target, half_range)
+            ub_kills, ub_damage = kill_upper_bounds(weapons, target)
+            assert (kills <= ub_kills + 1e-9).all(), key
+            assert (damage <= ub_damage + 1e-9).all(), key
+    print(f"  {len(TARGETS)} targets x 2 range settings ✓")
+
+    print(f"\n  ✅ PASS: Bounds hold\n")
+
+
+def test_prunes_library():
+    """Units that cannot make the top K are never aggregated"""
+    print("=" * 60)
+    print("TEST: Pruning")
+    print("=" * 60)
+
+    library = pd.concat([_library(), _roster()], ignore_index=True)
+    aggregated = []
+    original = topk.aggregate_unit_metrics
+
+    def counting(temp_df, *args):
+        aggregated.append(temp_df['Name'].nunique())
+        return original(temp_df, *args)
+
+    topk.aggregate_unit_metrics = counting
+    try:
+        got = top_units(library, TARGETS['MEQ'], k=5, metric='CPK')
+    finally:
+        topk.aggregate_unit_metrics = original
+
+    full = sorted(calculate_group_metrics(library, TARGETS['MEQ']), key=topk._sort_key('CPK'))
+    assert _keys(got) == _keys(full[:5])
+    n_names = library['Name'].nunique()
+    assert sum(aggregated) < n_names // 4, f"aggregated {sum(aggregated)} of {n_names} units"
+    print(f"  aggregated {sum(aggregated)} of {n_names} units")
+
+    try:
+        top_units(library, TARGETS['MEQ'], metric='TTK')
+        raise AssertionError("Unknown metrics should be rejected")
+    except ValueError:
+        pass
+
+    print(f"\n  ✅ PASS: Pruning\n")
+
+
+def test_top_units_endpoint():
+    """/top-units returns the K best units, best first"""
+    print("=" * 60)
+    print("TEST: Top Units Endpoint")
+    print("=" * 60)
+
+    client = TestClient(app)
+    meq = {'Name': 'MEQ', 'Pts': 18, 'T': 4, 'W': 2, 'Sv': '3+', 'UnitSize': 5}
+    base = {'Qty': 1, 'Pts': 100, 'Range': 24, 'BS': 3, 'AP': 0, 'D': 1}
+    weapons = [
+        dict(base, UnitID=name, Name=name, Weapon='Gun', A=a, S=s)
+        for name, a, s in (('A', 2, 4), ('B', 6, 5), ('C', 1, 3), ('D', 4, 8), ('E', 3, 4))
+    ]
+
+    response = client.post('/api/calculator/top-units', json={'weapons': weapons, 'target': meq,
+                                                              'k': 3, 'metric': 'Kills'})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    kills = [m['Kills'] for m in result['metrics']]
+    assert len(kills) == 3 and kills == sorted(kills, reverse=True)
+
+    bad = client.post('/api/calculator/top-units', json={'weapons': weapons, 'target': meq, 'metric': 'TTK'})
+    assert bad.status_code == 422
+
+    print(f"\n  ✅ PASS: Top units endpoint\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Top-K Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_matches_full_sort()
+        test_pts_variants()
+        test_bounds_hold()
+        test_prunes_library()
+        test_top_units_endpoint()
+
+        print("=" * 60)
+        print("✅ ALL TOP-K TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the vectorized resolve kernel.
+Verify that the columnar path gives the same (kills, damage) as resolve_single_row.
+"""
+
+import sys
+import os
+
+# Add parent directory to path for src imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+
+# Fix Windows console encoding issues
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from src.data.rosters import DEFAULT_ROSTER
+from src.data.targets import TARGETS
+from src.engine.calculator import resolve_single_row
+from src.engine.kernel import compile_weapons, compile_target, resolve_weapons
+
+# Rows covering every keyword branch of resolve_single_row
+KEYWORD_ROWS = [
+    {'Weapon': 'Heavy Flamer', 'A': 'D6', 'BS': 4, 'S': 5, 'AP': -1, 'D': 1, 'Torrent': 'Y', 'Range': 12},
+    {'Weapon': 'Frag Missile', 'A': 'D6+1', 'BS': '3+', 'S': 4, 'AP': 0, 'D': 1, 'Blast': 'Y', 'Range': 48},
+    {'Weapon': 'Battle Cannon', 'A': '2D6', 'BS': 4, 'S': 10, 'AP': -1, 'D': 3, 'Blast': 'Y', 'Range': 48},
+    {'Weapon': 'Lethal Claws', 'A': 4, 'BS': 3, 'S': 5, 'AP': -2, 'D': 2, 'Lethal': 'Y', 'CritHit': 5, 'Range': 'M'},
+    {'Weapon': 'Dev Rifle', 'A': 3, 'BS': 3, 'S': 6, 'AP': -1, 'D': 'D6+2', 'Dev': 'Y', 'Sustained': 2, 'Range': 24},
+    {'Weapon': 'Twin Guns', 'A': 6, 'BS': 3, 'S': 7, 'AP': -1, 'D': 2, 'TwinLinked': 'Y', 'CritWound': 4, 'Range': 36},
+    {'Weapon': 'Sniper', 'A': 1, 'BS': 2, 'S': 5, 'AP': -2, 'D': 3, 'IgnoresCover': 'Y', 'Range': 36},
+    {'Weapon': 'Reroll Ones', 'A': 5, 'BS': 4, 'S': 4, 'AP': 0, 'D': 1, 'RR_H': '1', 'RR_W': '1', 'Range': 24},
+    {'Weapon': 'Reroll Fails', 'A': 4, 'BS': 3, 'S': 5, 'AP': -1, 'D': 2, 'RR_H': 'Y', 'RR_W': 'F',
+     'Sustained': 1, 'Dev': 'Y', 'CritWound': 5, 'Range': 24},
+    {'Weapon': 'Missing Stats', 'A': '', 'BS': None, 'S': 'x', 'D': '', 'Range': 24},
+]
+
+
+def _assert_parity(df, defender, assume_half_range=False):
+    kills, damage = resolve_weapons(compile_weapons(df), compile_target(defender), assume_half_range)
+    for i, (_, row) in enumerate(df.iterrows()):
+        exp_kills, exp_damage = resolve_single_row(row, defender, assume_half_range)
+        assert np.isclose(kills[i], exp_kills), \
+            f"{row.get('Weapon')} vs {defender.get('Name')}: kills {kills[i]} != {exp_kills}"
+        assert np.isclose(damage[i], exp_damage), \
+            f"{row.get('Weapon')} vs {defender.get('Name')}: damage {damage[i]} != {exp_damage}"
+
+
+def test_kernel_matches_default_roster():
+    """Kernel matches resolve_single_row for the default roster vs every target"""
+    print("=" * 60)
+    print("TEST: Kernel Parity (Default Roster)")
+    print("=" * 60)
+
+    df = pd.DataFrame(DEFAULT_ROSTER)
+
+    for t_key, t_stats in TARGETS.items():
+        for half_range in (False, True):
+            _assert_parity(df, t_stats, half_range)
+
+    print(f"\n  Checked {len(df)} rows x {len(TARGETS)} targets")
+    print(f"\n  ✅ PASS: Kernel matches resolve_single_row\n")
+
+
+def test_kernel_matches_keywords():
+    """Kernel matches resolve_single_row for every keyword branch"""
+    print("=" * 60)
+    print("TEST: Kernel Parity (Keywords, Stealth, Cover)")
+    print("=" * 60)
+
+    df = pd.DataFrame(KEYWORD_ROWS)
+
+    stealthy = dict(TARGETS['MEQ'], Stealth='Y', Name='Stealth Marines')
+    horde = dict(TARGETS['GEQ'], UnitSize=20)
+    mob = dict(TARGETS['GEQ'], UnitSize=8)
+
+    for defender in [stealthy, horde, mob, TARGETS['CUST'], TARGETS['KEQ']]:
+        for half_range in (False, True):
+            _assert_parity(df, defender, half_range)
+
+            covered = df.copy()
+            covered['__assume_cover__'] = True
+            _assert_parity(covered, defender, half_range)
+
+    print(f"\n  Checked {len(df)} keyword rows with stealth, blast and cover")
+    print(f"\n  ✅ PASS: Kernel matches resolve_single_row\n")
+
+
+def test_kernel_empty_roster():
+    """Kernel handles a roster with no rows"""
+    print("=" * 60)
+    print("TEST: Kernel Empty Roster")
+    print("=" * 60)
+
+    kills, damage = resolve_weapons(compile_weapons(pd.DataFrame()), compile_target(TARGETS['MEQ']))
+    assert len(kills) == 0 and len(damage) == 0, "Empty roster should give empty arrays"
+
+    print(f"\n  ✅ PASS: Empty roster gives empty results\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("PyHammer Vectorized Kernel Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_kernel_matches_default_roster()
+        test_kernel_matches_keywords()
+        test_kernel_empty_roster()
+
+        print("=" * 60)
+        print("✅ ALL KERNEL TESTS PASSED")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {e}")
+        import traceback
+        traceback.print_exc()